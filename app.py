@@ -19,8 +19,6 @@ import os
 import sys
 import logging
 import time
-import hashlib
-import re
 
 # Loglama ayarları
 logging.basicConfig(
@@ -36,54 +34,6 @@ logger = logging.getLogger(__name__)
 
 # --- YARDIMCI FONKSİYONLAR ---
 
-def clean_instructor_name(name_str):
-    """
-    Hoca isimlerini Regex ile temizler.
-    Her türlü boşluğu (tab, non-breaking space) tek boşluğa indirir.
-    """
-    if pd.isna(name_str) or str(name_str).strip() == "": 
-        return "Unknown"
-    
-    text = str(name_str).replace('"', '').replace("'", "")
-    
-    parts = text.split(',')
-    
-    cleaned_parts = []
-    for p in parts:
-        clean_name = re.sub(r'\s+', ' ', p).strip()
-        
-        if clean_name:
-            cleaned_parts.append(clean_name)
-            
-    return ", ".join(cleaned_parts)
-
-def extract_program_keywords(data):
-    """
-    JSON verisinden program anahtar kelimelerini (keywords) çıkarır.
-    Hiyerarşik (Faculties -> Programs) yapıyı destekler.
-    """
-    keywords = {}
-    
-    # 1. Durum: Eski Düz Format (Backup)
-    # { "Program Adı": { "keywords": [...] } }
-    if isinstance(data, dict) and "faculties" not in data:
-        for prog, info in data.items():
-            if isinstance(info, dict) and "keywords" in info:
-                keywords[prog] = info["keywords"]
-                
-    # 2. Durum: Yeni Hiyerarşik Format (undergrad_majors.json)
-    # { "faculties": [ { "programs": [ ... ] } ] }
-    elif isinstance(data, dict) and "faculties" in data:
-        for faculty in data["faculties"]:
-            for program in faculty.get("programs", []):
-                p_name = program.get("name")
-                p_kws = program.get("keywords")
-                
-                if p_name and p_kws:
-                    keywords[p_name] = p_kws
-
-    return keywords
-
 def merge_keywords(*maps):
     """Birden fazla keyword sözlüğünü (Major + Minor) birleştirir."""
     final_map = {}
@@ -114,8 +64,16 @@ if SRC_DIR not in sys.path:
     sys.path.append(SRC_DIR)
 
 try:
-    from src.audit_engine import run_fens_audit
-    from src.recommender import get_recommendations_with_stats
+    from src.audit_engine import audit_cache_stats
+    from src.audit_session import AuditSession
+    from src.impact_scan import scan_marginal_impact, impact_to_audit_data
+    from src.multi_audit import run_multi_audit, sweep_programs
+    from src.transcript_import import build_catalog_automaton
+    from src.columnar import load_schedule, load_catalog, load_catalog_text, SCHEDULE_CSV, CATALOG_CSV, parquet_path
+    from src.snapshot import (open_snapshot, catalog_from_fens, prepare_schedule, load_keyword_map, SCHEDULE_COLUMNS,
+                              SNAPSHOT_PATH, SOURCE_FILES as SNAPSHOT_SOURCES, MAJORS_JSON, MINORS_JSON)
+    from src.schedule_history import load_history_index as open_history_index, term_label, INDEX_PATH as HISTORY_INDEX_PATH
+    from src.resources import get_resource, resource_stats
     
     logger.info("Tüm modüller başarıyla yüklendi.")
 
@@ -129,6 +87,10 @@ try:
 except ImportError:
     def generate_prereq_graph(*args): return None
 
+# Ağır bağımlılıklar ilk boyamadan önce import edilmez (cold start bütçesi: src/startup_profile.py):
+# - recommender (ml_engine -> sentence_transformers/torch): "Önerileri Getir" tıklanınca
+# - graphviz: generate_prereq_graph içinde, ilk grafik çiziminde
+
 # -----------------------------------------------------------------------------
 # 2. VERİ YÜKLEME
 # -----------------------------------------------------------------------------
@@ -137,21 +99,13 @@ st.set_page_config(page_title="FENS Smart Advisor", page_icon="🎓", layout="wi
 JSON_PATH = os.path.join(ROOT_DIR, 'data', 'json', 'fens_data_raw.json')
 
 
-def get_file_hash(filepath):
-    """Dosyanın hash değerini al (değişip değişmediğini kontrol etmek için)"""
-    try:
-        with open(filepath, 'rb') as f:
-            return hashlib.md5(f.read()).hexdigest()
-    except Exception as e:
-        logger.warning(f"Hash hesaplanırken hata: {e}")
-        return None
+# Kaynaklar süreç genelinde paylaşılır (src/resources.py): tüm oturumlar aynı
+# salt-okunur nesneyi alır, bağlı dosyaların parmak izi değişince yeniden yüklenir.
+TAB2_SOURCE_FILES = (SCHEDULE_CSV, parquet_path(SCHEDULE_CSV), CATALOG_CSV, parquet_path(CATALOG_CSV), MAJORS_JSON, MINORS_JSON)
 
-    
-@st.cache_data(ttl=3600)
-def load_data():
+def _read_fens_data():
     """JSON dosyasından veri yükle ve DataFrame'e çevir"""
     logger.info("JSON verisi yükleniyor...")
-    current_hash = get_file_hash(JSON_PATH)
     
     if not os.path.exists(JSON_PATH):
         logger.error(f"JSON dosyası bulunamadı: {JSON_PATH}")
@@ -160,122 +114,132 @@ def load_data():
     try:
         with open(JSON_PATH, "r", encoding="utf-8") as f:
             data = json.load(f)
-        logger.info(f"JSON verisi başarıyla yüklendi (Hash: {current_hash[:8] if current_hash else 'N/A'})")
+        logger.info("JSON verisi başarıyla yüklendi")
     except json.JSONDecodeError as e:
         logger.error(f"JSON parse hatası: {e}")
         return None, None
     
     # DataFrame Dönüşümü (Recommender için)
-    courses_list = []
-    for major, info in data.items():
-        reqs = info.get("requirements", {})
-        for cat, clist in reqs.items():
-            for c in clist:
-                try: 
-                    lvl = int(c['code'].split()[1][0]) * 100
-                except: 
-                    lvl = 0
-                
-                courses_list.append({
-                    "Course Code": c.get("code"),
-                    "Course Name": c.get("name", ""),
-                    "ECTS": c.get("ects", 0),
-                    "Term": "Unknown",
-                    "Level": lvl,
-                    "Description": c.get("name", ""), 
-                    "Prerequisites": ""
-                })
-
-    df = pd.DataFrame(courses_list).drop_duplicates(subset=["Course Code"])
+    df = catalog_from_fens(data)
     logger.info(f"DataFrame oluşturuldu: {len(df)} benzersiz ders")
     return data, df
 
-@st.cache_data(ttl=3600)
-def load_tab2_resources():
+def load_data():
+    return get_resource("fens_data", [JSON_PATH], _read_fens_data)
+
+# Keyword JSON'ları yoksa/boşsa uygulama çökmesin diye varsayılanlar
+DEFAULT_KEYWORD_MAP = {
+    "Computer Science & Eng": ["software", "algorithm", "data", "ai", "network", "security"],
+    "Electronics Engineering": ["circuit", "signal", "electronics", "communication", "fpga"],
+    "Industrial Engineering": ["optimization", "supply chain", "production", "system", "stochastic"],
+    "Mechatronics Engineering": ["robotics", "control", "mechanical", "automation"],
+    "Molecular Biology": ["genetics", "cell", "protein", "bioinformatics"],
+    "Economics": ["macroeconomics", "microeconomics", "finance", "policy", "econometrics"],
+    "Psychology": ["cognitive", "behavioral", "social", "clinical", "developmental"],
+    "General Engineering": ["science", "engineering", "math", "physics"]
+}
+
+def _open_app_snapshot():
+    snap = open_snapshot()
+    if snap is None:
+        logger.info("Snapshot yok veya bayat, veriler kaynak dosyalardan yükleniyor.")
+    else:
+        logger.info(f"Snapshot açıldı ({snap.nbytes() / 1e6:.1f} MB, fingerprint: {snap.fingerprint[:8]})")
+    return snap
+
+def load_app_snapshot():
+    """
+    Önceden derlenmiş snapshot (src/snapshot.py). Dosya memory-map edilir
+    (sayfalar süreçler arası paylaşılır); çözülen DataFrame'ler süreç başına
+    heap kopyasıdır, kazanç açılış süresidir. Yoksa veya kaynak
+    dosyalar değiştiyse None döner ve normal yükleyiciler kullanılır.
+    Snapshot yeniden üretilince (veya kaynaklar değişince) yeniden açılır.
+    """
+    return get_resource("snapshot", (SNAPSHOT_PATH,) + SNAPSHOT_SOURCES, _open_app_snapshot)
+
+def _read_tab2_resources():
     logger.info("Tab 2 kaynakları yükleniyor ve optimize ediliyor...")
     
     # 1. SCHEDULE (DERS PROGRAMI)
-    sched_path = os.path.join(ROOT_DIR, 'data', 'csv', 'active_schedule_master.csv')
+    # Tipli kolon katmanı (src/columnar.py): Parquet varsa oradan, yoksa aynı şemayla CSV'den.
+    # Türetilmiş saat kolonları (Start_Min/End_Min) arama/kart görünümünde kullanılmadığı için okunmaz.
     sched_df = pd.DataFrame()
     
-    if os.path.exists(sched_path):
+    if os.path.exists(SCHEDULE_CSV) or os.path.exists(parquet_path(SCHEDULE_CSV)):
         try: 
-            sched_df = pd.read_csv(sched_path)
-            sched_df.columns = [c.strip() for c in sched_df.columns]
-            
-            # --- OPTİMİZASYON 1: Hoca Temizliği ---
-            if 'Instructor' in sched_df.columns:
-                sched_df['Instructor'] = sched_df['Instructor'].apply(clean_instructor_name)
-                
-            # --- OPTİMİZASYON 2: Gün Düzeltme ve Türkçeleştirme ---
-            if 'Days' in sched_df.columns: 
-                sched_df = sched_df.rename(columns={'Days': 'Day'})
-            
-            # [ESKİ KODDAN KORUNAN KISIM]: Günleri Türkçeleştir
-            day_map = {'M': 'Pazartesi', 'T': 'Salı', 'W': 'Çarşamba', 'R': 'Perşembe', 'F': 'Cuma'}
-            if 'Day' in sched_df.columns:
-                for code, name in day_map.items():
-                    sched_df['Day'] = sched_df['Day'].astype(str).str.replace(code, name, regex=False)
-
-            # --- OPTİMİZASYON 3: Ana Ders İşareti ---
-            if 'Course Code' in sched_df.columns:
-                sched_df['Is_Main'] = ~sched_df['Course Code'].astype(str).str.endswith(('R', 'L', 'D'))
+            # Hoca temizliği, Türkçe gün adları ve Is_Main (kategori başına, src/snapshot.py)
+            sched_df = prepare_schedule(load_schedule(SCHEDULE_COLUMNS))
 
             logger.info(f"Schedule yüklendi: {len(sched_df)} satır")
         except Exception as e:
             logger.warning(f"Schedule yükleme hatası: {e}")
 
     # 2. PREREQUISITES (ÖN KOŞULLAR)
-    prereq_path = os.path.join(ROOT_DIR, 'data', 'csv', 'course_data_clean.csv')
+    # Level katmanda int olarak gelir; uzun Description metni burada okunmaz (load_catalog_descriptions).
     prereq_df = pd.DataFrame()
     
-    if os.path.exists(prereq_path):
+    if os.path.exists(CATALOG_CSV) or os.path.exists(parquet_path(CATALOG_CSV)):
         try: 
-            prereq_df = pd.read_csv(prereq_path)
-            prereq_df.columns = [c.strip() for c in prereq_df.columns]
-            
-            # Level hesaplama (Lambda hatasını önlemek için güvenli yöntem)
-            if 'Level' not in prereq_df.columns and 'Course Code' in prereq_df.columns:
-                def fast_extract_level(code):
-                    try: return (int(code.split()[1]) // 100) * 100
-                    except: return 0
-                prereq_df['Level'] = prereq_df['Course Code'].apply(fast_extract_level)
-                
+            prereq_df = load_catalog()
             logger.info(f"Prerequisite yüklendi: {len(prereq_df)} satır")
         except Exception as e:
             logger.warning(f"Prerequisite yükleme hatası: {e}")
 
     # 3. KEYWORDS (YENİLENEN GÜVENLİ KISIM)
-    kws = {}
-    m_path = os.path.join(ROOT_DIR, 'data', 'json', 'undergrad_majors.json')
-    mi_path = os.path.join(ROOT_DIR, 'data', 'json', 'undergrad_minors.json')
-    
     try:
-        if os.path.exists(m_path):
-            with open(m_path, 'r', encoding='utf-8') as f: 
-                kws.update(extract_program_keywords(json.load(f)))
-                
-        if os.path.exists(mi_path):
-            with open(mi_path, 'r', encoding='utf-8') as f: 
-                kws.update(extract_program_keywords(json.load(f)))
+        kws = load_keyword_map()
     except Exception as e:
         logger.warning(f"Keyword dosyası okuma hatası: {e}")
+        kws = {}
 
-    # [YENİ EKLENEN KISIM]: Eğer dosya yoksa/boşsa uygulama çökmesin diye varsayılanlar
     if not kws:
         logger.info("⚠️ JSON verisi bulunamadı, varsayılan keyword listesi devreye giriyor.")
-        kws = {
-            "Computer Science & Eng": ["software", "algorithm", "data", "ai", "network", "security"],
-            "Electronics Engineering": ["circuit", "signal", "electronics", "communication", "fpga"],
-            "Industrial Engineering": ["optimization", "supply chain", "production", "system", "stochastic"],
-            "Mechatronics Engineering": ["robotics", "control", "mechanical", "automation"],
-            "Molecular Biology": ["genetics", "cell", "protein", "bioinformatics"],
-            "Economics": ["macroeconomics", "microeconomics", "finance", "policy", "econometrics"],
-            "Psychology": ["cognitive", "behavioral", "social", "clinical", "developmental"],
-            "General Engineering": ["science", "engineering", "math", "physics"]
-        }
+        kws = DEFAULT_KEYWORD_MAP
 
     return sched_df, prereq_df, kws
+
+def load_tab2_resources():
+    return get_resource("tab2", TAB2_SOURCE_FILES, _read_tab2_resources)
+
+def _read_catalog_descriptions():
+    try:
+        snap = load_app_snapshot()
+        if snap is not None:
+            return snap.table('descriptions')['Description']
+        return load_catalog_text()['Description']
+    except Exception as e:
+        logger.warning(f"Açıklama yükleme hatası: {e}")
+        return pd.Series(dtype=str)
+
+def load_catalog_descriptions():
+    """Katalog açıklamaları (sadece recommender'ın ML skoru için, ilk kullanımda okunur)."""
+    return get_resource("descriptions", (SNAPSHOT_PATH, CATALOG_CSV, parquet_path(CATALOG_CSV)), _read_catalog_descriptions)
+
+def _read_history_index():
+    try:
+        history = open_history_index()
+    except Exception as e:
+        logger.warning(f"Geçmiş indeksi okunamadı: {e}")
+        return None
+    if history is not None:
+        logger.info(f"Ders geçmişi yüklendi: {len(history)} dönem ({history.terms[0]}-{history.terms[-1]})")
+    return history
+
+def load_history_index():
+    """
+    Çok dönemli açılma geçmişi (src/schedule_history.py). Sıklık ve son açılma
+    sözlükleri bir kez kurulur; yoksa None ve tek yıllık schedule kullanılır.
+    """
+    return get_resource("history", [HISTORY_INDEX_PATH], _read_history_index)
+
+def _build_code_automaton():
+    automaton = build_catalog_automaton()
+    logger.info(f"Kod otomatı derlendi: {len(automaton.codes)} kod")
+    return automaton
+
+def load_code_automaton():
+    """Transkript içe aktarma otomatı (katalog kodlarından bir kez derlenir, kopyalanmaz)."""
+    return get_resource("code_automaton", [CATALOG_CSV, JSON_PATH], _build_code_automaton)
           
 
 # Verileri Yükle
@@ -283,8 +247,17 @@ logger.info("="*70)
 logger.info("UYGULAMANIN BAŞLANGIÇ AŞAMASI")
 logger.info("="*70)
 
-raw_data, catalog_df = load_data()
-sched_df, prereq_df, keyword_map = load_tab2_resources()
+snapshot = load_app_snapshot()
+if snapshot is not None:
+    # Paylaşılan salt-okunur yapılar: değiştirecek kod önce .copy() alır
+    raw_data, catalog_df = snapshot.get('raw_data'), snapshot.table('catalog')
+    sched_df, prereq_df = snapshot.table('schedule'), snapshot.table('prereq')
+    keyword_map = snapshot.get('keywords') or DEFAULT_KEYWORD_MAP
+    prereq_index = snapshot.get('dependents')
+else:
+    raw_data, catalog_df = load_data()
+    sched_df, prereq_df, keyword_map = load_tab2_resources()
+    prereq_index = None
 
 if raw_data is None or catalog_df is None:
     st.error("❌ Kritik Veri Hatası: JSON yüklenemedi!")
@@ -293,6 +266,20 @@ if raw_data is None or catalog_df is None:
 else:
     logger.info("Veriler başarıyla hazırlandı.")
 
+def get_audit_report(major_code):
+    """
+    Oturumdaki AuditSession'ı transkript ile eşitleyip AuditResult döndürür.
+    Tek ders ekleme/çıkarmada seçmeli dağıtımı sadece girdisi değişirse yeniden koşturur.
+    """
+    session = st.session_state.get("audit_session")
+    if session is None or session.major_code != major_code:
+        session = AuditSession(major_code, raw_data, sorted(st.session_state.transcript))
+        st.session_state.audit_session = session
+    else:
+        session.sync(st.session_state.transcript)
+    logger.info(f"Audit oturumu: {session.stats}")
+    return session.result
+
 # Dropdown için liste
 all_options = sorted(catalog_df["Course Code"] + " - " + catalog_df["Course Name"])
 
@@ -324,6 +311,12 @@ with st.sidebar:
     with c1: year = st.selectbox("Sınıf:", [1, 2, 3, 4], index=1)
     with c2: term = st.selectbox("Dönem:", ["Fall", "Spring"])
     
+    second_major = st.selectbox(
+        "Çift Anadal (Opsiyonel):",
+        ["Yok"] + [m for m in major_list if m != selected_major],
+        help="İkinci bir FENS programına göre de denetim yapar"
+    )
+    
     logger.info(f"Öğrenci profili - Sınıf: {year}, Dönem: {term}")
     
     st.divider()
@@ -391,6 +384,22 @@ with st.sidebar:
             else:
                 st.warning("Lütfen bir ders kodu girin.")
 
+    # Toplu İçe Aktarma (SUIS transkript metni)
+    with st.expander("📋 Transkript Yapıştır", expanded=False):
+        pasted = st.text_area("SUIS transkript metni:", height=150, placeholder="CS 201 Introduction to Computing A 3.000 ...")
+        if st.button("Toplu Ekle", use_container_width=True):
+            result = load_code_automaton().extract(pasted)
+            new_courses = [c for c in result["courses"] if c not in st.session_state.transcript]
+            if result["unknown"]:
+                st.warning(f"Katalogda bulunamadı: {', '.join(result['unknown'])}")
+            if new_courses:
+                # Tek güncelleme + tek rerun (ders başına rerun yok)
+                st.session_state.transcript |= set(new_courses)
+                logger.info(f"Toplu içe aktarma: {len(new_courses)} ders eklendi")
+                st.rerun()
+            elif not result["unknown"]:
+                st.info("Yeni ders kodu bulunamadı.")
+
     # Çıkarma
     if st.session_state.transcript:
         with st.expander("➖ Ders Çıkar"):
@@ -407,6 +416,21 @@ with st.sidebar:
         height=200
     )
     
+    # ========== PROGRAM YAKINLIĞI (BÖLÜM DEĞİŞTİRME) ==========
+    with st.expander("🧭 Program Yakınlığı", expanded=False):
+        st.caption("Mevcut transkriptle her FENS programında mezuniyete kalan kredi")
+        sweep = sweep_programs(sorted(st.session_state.transcript), raw_data)
+        st.dataframe(
+            pd.DataFrame([{
+                "Program": row["major"],
+                "Kalan Kredi": int(row["remaining_credits"]),
+                "Eksik Şart": row["unmet"],
+                "Eksik Zorunlu": len(row["missing_required"])
+            } for row in sweep]),
+            hide_index=True
+        )
+        logger.info(f"Program yakınlığı: en yakın {sweep[0]['major'] if sweep else '-'}")
+    
     # ========== TEST TRANSKRİPT SENARYOLARI ==========
     st.divider()
     st.subheader("🧪 Test Senaryoları")
@@ -537,17 +561,17 @@ with tab1:
         taken_list = list(st.session_state.transcript)
         logger.info(f"Alınan dersler ({len(taken_list)}): {taken_list}")
         
-        report = run_fens_audit(selected_major, taken_list, raw_data)
+        report = get_audit_report(selected_major)
         
-        if "Error" in report:
-            logger.error(f"Audit hatası: {report['Error']}")
-            st.error(report["Error"])
+        if report.error:
+            logger.error(f"Audit hatası: {report.error}")
+            st.error(report.error)
         else:
             logger.info("Audit başarıyla tamamlandı")
             
             # Yol Haritası
             st.subheader("🗺️ Yol Haritası")
-            for step in report["Roadmap"]:
+            for step in report.roadmap:
                 if "🎉" in step: 
                     st.success(step, icon="🎉")
                 elif "🚨" in step: 
@@ -562,8 +586,8 @@ with tab1:
             # İlerleme Kartları - DÜZELTILMIŞ VERSİYON
             def show_progress(title, data):
                 """İyileştirilmiş ilerleme gösterimi (Nesting hatası çözüldü)"""
-                taken = data.get("credits", 0)
-                target = data.get("target", 1)
+                taken = data.credits
+                target = data.target
                 pct = min(taken/target, 1.0) if target > 0 else 0
                 icon = "✅" if pct >= 1.0 else "⏳"
                 
@@ -586,47 +610,82 @@ with tab1:
                     
                     with left_col:
                         st.markdown("**✅ Alınanlar:**")
-                        if data["taken"]:
+                        if data.taken:
                             # Columns yerine direkt caption kullan
-                            for course in sorted(data["taken"]):
+                            for course in sorted(data.labels()):
                                 st.caption(f"📌 {course}")
                         else:
                             st.caption("-")
                     
                     with right_col:
                         st.markdown("**❌ Eksikler/Notlar:**")
-                        if "missing" in data and data["missing"]:
-                            for m in data["missing"]:
+                        if data.missing:
+                            for m in data.missing:
                                 st.error(f"Eksik: {m}")
                         elif taken < target:
                             st.warning(f"{int(target - taken)} kredi eksiğin var.")
-                        if "note" in data and data["note"]:
-                            st.info(data["note"])
+                        if data.note:
+                            st.info(data.note)
                     
                     logger.debug(f"{title}: %{int(pct*100)} (Alınan: {int(taken)}/{int(target)})")
 
             # Kategorileri 2 sütunla göster (Expander DIŞINDAKi Columns)
+            uni, req, core, area, free = report.categories
             c1, c2 = st.columns(2)
             with c1:
-                show_progress("Zorunlu Dersler", report["Required"])
-                show_progress("Çekirdek (Core)", report["Core"])
+                show_progress("Zorunlu Dersler", req)
+                show_progress("Çekirdek (Core)", core)
             with c2:
-                show_progress("Alan (Area)", report["Area"])
-                show_progress("Üniversite & Serbest", report["University"]) 
+                show_progress("Alan (Area)", area)
+                show_progress("Üniversite & Serbest", uni) 
             
             # Serbest Seçmeliler - tam genişlik
-            show_progress("Serbest Seçmeliler (Free)", report["Free"])
+            show_progress("Serbest Seçmeliler (Free)", free)
 
             # Fakülte Kontrolü
-            if "FacultyCheck" in report:
-                fc = report["FacultyCheck"]
-                if fc["status"] != "OK":
-                    st.error(f"Fakülte Kuralı: {fc['message']}")
-                    logger.warning(f"Fakülte kuralı uyarısı: {fc['message']}")
+            if report.faculty is not None:
+                fc = report.faculty
+                if fc.status != "OK":
+                    st.error(f"Fakülte Kuralı: {fc.message}")
+                    logger.warning(f"Fakülte kuralı uyarısı: {fc.message}")
                 else:
                     st.success("Fakülte Dağılımı: Uygun")
                     logger.info("Fakülte dağılımı uygun")
 
+            # Çift Anadal Denetimi (Ortak ön hesaplama ile tek çağrı)
+            if second_major != "Yok":
+                st.divider()
+                st.subheader(f"🎓 Çift Anadal: {second_major}")
+                
+                multi = run_multi_audit(
+                    [selected_major, second_major],
+                    st.session_state.audit_session.courses,
+                    raw_data
+                )
+                second_report = multi["reports"].get(second_major)
+                
+                if second_report is None or second_report.error:
+                    st.error(multi["skipped"].get(second_major, "Çift anadal denetlenemedi."))
+                else:
+                    cols = st.columns(5)
+                    for col, data in zip(cols, second_report.categories):
+                        with col:
+                            st.metric(data.category.value, f"{int(data.credits)}/{int(data.target)}")
+                    
+                    for step in second_report.roadmap:
+                        st.info(step, icon="👉")
+                    
+                    if multi["double_counted"]:
+                        st.markdown("**🔁 İki Programda Birden Sayılan Dersler:**")
+                        st.dataframe(
+                            pd.DataFrame([
+                                {"Ders": code, **progs} for code, progs in sorted(multi["double_counted"].items())
+                            ]),
+                            hide_index=True,
+                            use_container_width=True
+                        )
+                    logger.info(f"Çift anadal ({second_major}) çift sayım: {len(multi['double_counted'])} ders")
+
 # --- TAB 2: AKILLI ÖNERİ ---
 with tab2:
     st.subheader(f"📅 {term} Dönemi Tavsiyeleri")
@@ -712,11 +771,20 @@ with tab2:
                     filtered_catalog = prereq_df.copy()
                     logger.info(f"Fallback aktivasyon - katalog boyutu: {len(filtered_catalog)}")
 
+                # Açıklamalar ML skoru için burada eklenir (index katalog satır numarasıdır)
+                filtered_catalog['Description'] = load_catalog_descriptions().reindex(filtered_catalog.index)
+
                 # --- AÇILMA SIKLIĞI (NADİR DERS) HESABI ---
                 logger.info("\nADIM 3: Açılma sıklığı hesabı")
                 
-                if not sched_df.empty and 'Term' in sched_df.columns:
-                    counts = sched_df.groupby('Course Code')['Term'].nunique()
+                history = load_history_index()
+                if history is not None:
+                    # Çok yıllık kanıt: yılda ortalama kaç Fall/Spring döneminde açıldığı
+                    opening = history.opening_terms(filtered_catalog['Course Code'].to_numpy())
+                    filtered_catalog['Opening_Terms'] = opening.fillna(2).to_numpy()
+                    logger.info(f"Opening_Terms geçmişten hesaplandı ({len(history)} dönem)")
+                elif not sched_df.empty and 'Term' in sched_df.columns:
+                    counts = sched_df.groupby('Course Code', observed=True)['Term'].nunique()
                     filtered_catalog['Opening_Terms'] = filtered_catalog['Course Code'].map(counts).fillna(2)
                     logger.info("Opening_Terms hesaplandı")
                 else:
@@ -726,7 +794,7 @@ with tab2:
                 # ADIM 4: AUDIT & 5 KATEGORİYİ AYIRMA (GÜNCELLENMIŞ)
                 logger.info("\nADIM 4: Audit çalıştırma ve 5 kategoriyi ayırma")
                 
-                curr_audit = run_fens_audit(selected_major, list(st.session_state.transcript), raw_data)
+                curr_audit = get_audit_report(selected_major)
                 
                 # 5 kategoriyi ayır
                 audit_data = {
@@ -736,27 +804,21 @@ with tab2:
                     'area': set(),          # Alan (Area) dersler
                 }
                 
-                if "Error" not in curr_audit:
-                    # Required (Zorunlu) - eksik zorunlu dersler
-                    audit_data['required'].update(curr_audit['Required'].get('missing', []))
-                    logger.info(f"Required dersler: {len(audit_data['required'])}")
-                    
-                    # University (Üniversite şartı) - üniversite şartı dersler
-                    audit_data['university'].update(curr_audit['University'].get('missing', []))
-                    logger.info(f"University dersler: {len(audit_data['university'])}")
-                    
-                    # Core (Çekirdek) - çekirdek/core electives
-                    core_list = raw_data[selected_major].get('requirements', {}).get('core_electives', [])
-                    audit_data['core'].update([c['code'] for c in core_list])
-                    logger.info(f"Core dersler: {len(audit_data['core'])}")
-                    
-                    # Area (Alan) - alan seçmelileri
-                    area_list = raw_data[selected_major].get('requirements', {}).get('area_electives', [])
-                    audit_data['area'].update([c['code'] for c in area_list])
-                    logger.info(f"Area dersler: {len(audit_data['area'])}")
+                if not curr_audit.error:
+                    # Her aday dersin gerçek mezuniyet katkısı (tek vektörize tarama)
+                    impacts = scan_marginal_impact(
+                        selected_major,
+                        st.session_state.audit_session.courses,
+                        raw_data,
+                        candidates=filtered_catalog['Course Code'],
+                        base_report=curr_audit
+                    )
+                    audit_data = impact_to_audit_data(impacts)
+                    for key, codes in audit_data.items():
+                        logger.info(f"{key} dersler: {len(codes)}")
                     
                 else:
-                    logger.warning(f"Audit hatası: {curr_audit['Error']}")
+                    logger.warning(f"Audit hatası: {curr_audit.error}")
                     logger.info("Audit başarısız, dersler Free kategorisine atandı")
 
                 # ADIM 5: RECOMMENDER
@@ -767,6 +829,7 @@ with tab2:
                     normalized_kw = active_keys if isinstance(active_keys, str) else normalize_keywords(active_keys)
                     logger.info(f"Keywords normalize edildi: {normalized_kw}")
                     
+                    from src.recommender import get_recommendations_with_stats
                     recs, stats = get_recommendations_with_stats(
                         catalog_df=filtered_catalog, 
                         student_params={
@@ -979,6 +1042,13 @@ with tab2:
             st.write(f"Prereq Satır: `{len(prereq_df) if not prereq_df.empty else 0}`")
             st.write(f"Katalog Satır: `{len(catalog_df)}`")
             st.write(f"Audit Major: `{selected_major}`")
+            cache = audit_cache_stats()
+            st.write(f"Audit Önbelleği: `{cache['size']}/{cache['limit']}` kayıt, isabet `%{int(cache['hit_rate']*100)}`")
+            st.markdown("**📦 Paylaşılan Kaynaklar**")
+            st.dataframe(pd.DataFrame(resource_stats())
+                         .assign(heap_MB=lambda d: (d['nbytes'] / 1e6).round(2), mmap_MB=lambda d: (d['mmap_nbytes'] / 1e6).round(2))
+                         .drop(columns=['nbytes', 'mmap_nbytes']),
+                         hide_index=True, use_container_width=True)
         
         with c2:
             st.markdown("**🗓️ Dönem Bilgisi**")
@@ -1114,7 +1184,7 @@ with tab3:
             with tab_viz:
                 if not prereq_df.empty:
                     try:
-                        graph = generate_prereq_graph(selected_course_code, prereq_df)
+                        graph = generate_prereq_graph(selected_course_code, prereq_df, prereq_index)
                         if graph: st.graphviz_chart(graph, use_container_width=True)
                         else: st.info("Zincir grafiği oluşturulamadı.")
                     except: st.error("Grafik hatası.")
@@ -1174,7 +1244,7 @@ with tab3:
                         # Gruplama
                         grouped = details.groupby(
                             ['Term', 'Course Code', 'Section', 'CRN', 'Instructor'], 
-                            as_index=False
+                            as_index=False, observed=True
                         ).agg({
                             'Line_Str': lambda x: sorted(list(set(x)))
                         })
@@ -1215,5 +1285,15 @@ with tab3:
                             st.info(f"**🔑 Ön Koşullar:** {raw_prereq}")
                         else:
                             pass
+
+                # Açılma Geçmişi (çok dönemli indeks varsa)
+                history = load_history_index()
+                info = history.lookup(selected_course_code) if history is not None else None
+                if info:
+                    st.caption(
+                        f"🗓️ Son açıldığı dönem: **{term_label(info['last_offered'])}** · "
+                        f"{len(history)} dönemde {info['offerings']} kez açıldı "
+                        f"(yılda ~{info['openings_per_year']:.1f} dönem)"
+                    )
         else:
             st.info("👈 Analiz için soldan ders seçin.")
\ No newline at end of file
@@ -0,0 +1,259 @@
+"""
+=============================================================================
+PROJE: SABANCI UNIVERSITY SMART ADVISOR
+DOSYA: src/allocation.py
+TANIM: Kesin (Optimal) Seçmeli Ders Dağıtım Motoru.
+       Greedy şelale, dersleri transkript sırasıyla Core -> Area -> Free'ye
+       yerleştirir; sonuç liste sırasına bağlıdır ve ilerlemeyi eksik
+       sayabilir. Bu motor aynı kısıtlar altında (req + 2 kapasite sınırı,
+       overflow_chain, alt kurallar, fakülte dağılımı) en iyi atamayı
+       sınırlı bir Dinamik Programlama (DP) ile hesaplar.
+
+       Amaç (sözlüksel sıra ile):
+         1. Sağlanan alt kural sayısı (core_sub_rule, area_sub_rule, core_distribution)
+         2. Hedefe sayılan toplam kredi: Σ min(hedef, kredi) (Core + Area + Free)
+         3. Core, sonra Area'ya sayılan kredi (eşitlikte şelale tercihi)
+
+       Çalışma Süresi Garantisi:
+         DP durumu (core_kr, area_kr, alt_kural_sayaçları). Free kredisi
+         toplamdan türetildiği için durumda tutulmaz. Core/Area kredileri
+         kapasiteyle (hedef + 2), sayaçlar ihtiyaçla sınırlanır. Böylece
+         katman başına en fazla (Tc + 3) x (Ta + 3) x S durum olur.
+         Toplam iş O(m x (Tc + 3) x (Ta + 3) x S x 3)'tür. m, Core/Area'ya
+         girebilen ders sayısıdır; sadece Free'ye girebilen dersler DP'ye
+         girmez. FENS kurallarında Tc <= 34, Ta <= 12 ve S <= 64 (DSA
+         fakülte sayaçları) olduğundan üst sınır transkript boyundan
+         bağımsız olarak doğrusaldır.
+
+YOL HARİTASI (ROADMAP):
+1. RULE COMPILER .......... Alt kuralları sayaç (counter) tanımlarına çevirme
+2. DP SOLVER .............. Durum uzayında dağıtım ve geri izleme
+3. BENCHMARK .............. Greedy ile karşılaştırmalı hız/kazanç testi
+=============================================================================
+"""
+
+import re
+
+FACULTY_ORDER = ("FENS", "FASS", "SBS")
+
+# =============================================================================
+# 1. RULE COMPILER (ALT KURAL SAYAÇLARI)
+# =============================================================================
+
+def compile_sub_rule(rule):
+    """
+    Bir alt kuralı [(ders -> bool, ihtiyaç)] sayaç listesine çevirir.
+    Kural, tüm sayaçları ihtiyaca ulaştığında sağlanmış sayılır.
+    Sayım mantığı rule_engine alt kural değerlendiricileri ile aynıdır.
+    """
+    if not rule: return []
+    rtype = rule["type"]
+
+    if rtype == "MIN_CREDITS":
+        # rule_engine MIN_CREDITS ders başına 3 kredi sayar
+        rx = re.compile(rule["filter_regex"])
+        return [(lambda c: bool(rx.match(c)), -(-rule["min_value"] // 3))]
+
+    if rtype == "MIN_COURSE_COUNT":
+        valid = set(rule.get("valid_list", []))
+        rx = re.compile(rule["valid_regex"]) if rule.get("valid_regex") else None
+        return [(lambda c: c in valid or bool(rx and rx.match(c)), rule["min_value"])]
+
+    if rtype == "FACULTY_DISTRIBUTION":
+        # rule_engine.compile_faculty_counter: ders ilk eşleştiği havuza sayılır (FENS > FASS > SBS)
+        pools = {fac: set(rule["pools"].get(fac, [])) for fac in FACULTY_ORDER}
+        def first_pool(c):
+            return next((fac for fac in FACULTY_ORDER if c in pools[fac]), None)
+        return [(lambda c, f=fac: first_pool(c) == f, rule["min_each"]) for fac in FACULTY_ORDER]
+
+    return []
+
+def compile_category_rules(constraints):
+    """Core ve Area için (kural_listesi) yapıları: her kural bir sayaç grubu."""
+    core_rules = [r for r in (
+        compile_sub_rule(constraints.get("core_sub_rule")),
+        compile_sub_rule(constraints.get("core_distribution")),
+    ) if r]
+    area_rules = [r for r in (compile_sub_rule(constraints.get("area_sub_rule")),) if r]
+    return core_rules, area_rules
+
+# =============================================================================
+# 2. DP SOLVER (DAĞITIM)
+# =============================================================================
+
+def allocate_electives(pool, core_codes, area_codes, credit_map, rules):
+    """
+    Kalan havuzdaki dersleri Core / Area / Free'ye en iyi şekilde dağıtır.
+
+    Args:
+        pool: Üniversite/Zorunlu/Math sonrası kalan dersler (transkript sırası).
+        core_codes, area_codes: Bölümün seçmeli havuzları.
+        credit_map: {KOD: KREDI}
+        rules: FENS_RULES[major] (credits + constraints)
+
+    Returns:
+        (taken_core, taken_area, taken_free): Her ders tam olarak bir listede,
+        listeler içinde transkript sırası korunur.
+    """
+    pool = list(dict.fromkeys(pool))
+    targets = rules["credits"]
+    cap = {"core": targets["core"] + 2, "area": targets["area"] + 2}
+    core_rules, area_rules = compile_category_rules(rules["constraints"])
+    core_counters = [ctr for r in core_rules for ctr in r]
+    area_counters = [ctr for r in area_rules for ctr in r]
+
+    # Ders başına ön hesap: kredi, uygun kategoriler, sayaç artışları
+    chain = rules["constraints"].get("overflow_chain", ["core", "area", "free"])
+    eligible, free_only = split_pool(pool, core_codes, area_codes, chain)
+    items = []
+    for c, start in eligible:
+        cr = int(round(credit_map.get(c, 3.0)))
+        options = [cat for cat in chain[chain.index(start):] if cat in ("core", "area", "free")]
+        core_hits = tuple(1 if match(c) else 0 for match, _ in core_counters)
+        area_hits = tuple(1 if match(c) else 0 for match, _ in area_counters)
+        # Sayaç vektörü [core sayaçları | area sayaçları] düzenindedir
+        core_inc = core_hits + tuple(0 for _ in area_hits)
+        area_inc = tuple(0 for _ in core_hits) + area_hits
+        items.append((c, cr, options, core_inc, area_inc))
+
+    needs = tuple(need for _, need in core_counters) + tuple(need for _, need in area_counters)
+    zero_ctr = tuple(0 for _ in needs)
+
+    # Katman DP: durum -> (önceki durum, seçim). Free durumda tutulmaz.
+    layer = {(0, 0, zero_ctr): None}
+    history = []
+    for c, cr, options, core_inc, area_inc in items:
+        nxt = {}
+        for state in layer:
+            core_cr, area_cr, ctr = state
+            for cat in options:
+                if cat == "core":
+                    if core_cr + cr > cap["core"]: continue
+                    new_state = (core_cr + cr, area_cr, _bump(ctr, core_inc, needs))
+                elif cat == "area":
+                    if area_cr + cr > cap["area"]: continue
+                    new_state = (core_cr, area_cr + cr, _bump(ctr, area_inc, needs))
+                else:
+                    new_state = state
+                if new_state not in nxt:
+                    nxt[new_state] = (state, cat)
+        history.append(nxt)
+        layer = nxt
+
+    total_cr = sum(cr for _, cr, _, _, _ in items) + sum(int(round(credit_map.get(c, 3.0))) for c in free_only)
+    rule_spans = _rule_spans(core_rules, area_rules)
+
+    def score(state):
+        core_cr, area_cr, ctr = state
+        satisfied = sum(all(ctr[i] >= needs[i] for i in span) for span in rule_spans)
+        free_cr = total_cr - core_cr - area_cr
+        counted = (min(core_cr, targets["core"]) + min(area_cr, targets["area"])
+                   + min(free_cr, targets["free"]))
+        return (satisfied, counted, min(core_cr, targets["core"]), min(area_cr, targets["area"]))
+
+    best = max(layer, key=score)
+
+    # Geri izleme (backtrack)
+    choice = {}
+    state = best
+    for (c, _, _, _, _), nxt in zip(reversed(items), reversed(history)):
+        prev, cat = nxt[state]
+        choice[c] = cat
+        state = prev
+
+    taken_core = [c for c in pool if choice.get(c) == "core"]
+    taken_area = [c for c in pool if choice.get(c) == "area"]
+    taken_free = [c for c in pool if choice.get(c, "free") == "free"]
+    return taken_core, taken_area, taken_free
+
+def split_pool(pool, core_codes, area_codes, chain):
+    """
+    Havuzu DP'ye giren (Core/Area'ya girebilen) ve sadece Free'ye girebilen
+    derslere ayırır.
+
+    Returns:
+        (eligible, free_only): eligible [(ders, başlangıç kategorisi)], free_only [ders]
+    """
+    eligible, free_only = [], []
+    for c in pool:
+        if c in core_codes: start = "core"
+        elif c in area_codes: start = "area"
+        else: start = None
+        if start is None or start not in chain: free_only.append(c)
+        else: eligible.append((c, start))
+    return eligible, free_only
+
+def allocation_key(pool, core_codes, area_codes, credit_map, rules):
+    """
+    allocate_electives'in Core/Area atamasının bağlı olduğu tüm girdi.
+    Sadece Free'ye girebilen dersler amaca yalnızca min(Free kredisi, hedef)
+    üzerinden girer; kredileri Free hedefine kırpılarak anahtara katılır.
+    Anahtar aynıysa Core/Area aynıdır, Free havuzun geri kalanıdır
+    (AuditSession bu sayede DP'yi tekrar koşturmaz).
+    """
+    chain = rules["constraints"].get("overflow_chain", ["core", "area", "free"])
+    eligible, free_only = split_pool(list(dict.fromkeys(pool)), core_codes, area_codes, chain)
+    free_only_cr = sum(int(round(credit_map.get(c, 3.0))) for c in free_only)
+    return tuple(eligible), min(free_only_cr, rules["credits"]["free"])
+
+def _bump(ctr, inc, needs):
+    """Sayaçları artırır; ihtiyacın üstü durum uzayını büyütmesin diye kırpılır."""
+    if not any(inc): return ctr
+    return tuple(min(v + d, need) for v, d, need in zip(ctr, inc, needs))
+
+def _rule_spans(core_rules, area_rules):
+    """Her kuralın sayaç vektöründeki indeks aralığı."""
+    spans, i = [], 0
+    for rule in core_rules + area_rules:
+        spans.append(range(i, i + len(rule)))
+        i += len(rule)
+    return spans
+
+# =============================================================================
+# 3. BENCHMARK (STANDALONE TEST MODE)
+# =============================================================================
+if __name__ == "__main__":
+    import os
+    import sys
+    import json
+    import time
+    import random
+
+    sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+    from audit_engine import run_fens_audit
+    from major_rules import FENS_RULES
+
+    base_dir = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    with open(os.path.join(base_dir, 'data', 'json', 'fens_data_raw.json'), 'r', encoding='utf-8') as f:
+        raw = json.load(f)
+
+    def counted(report):
+        return sum(min(report[c]["target"], report[c]["credits"]) for c in ("Core", "Area", "Free"))
+
+    def unmet(report):
+        return ("⚠️" in report["Core"]["note"]) + ("⚠️" in report["Area"]["note"])
+
+    print("--- Optimal Dağıtım Benchmark (35-55 derslik gerçekçi transkriptler) ---")
+    random.seed(42)
+    runs = 50
+    for major in FENS_RULES:
+        reqs = raw[major]["requirements"]
+        pools = {k: [c['code'] for c in v] for k, v in reqs.items()}
+        times = {"greedy": [], "optimal": []}
+        gained, fixed = 0, 0
+        for _ in range(runs):
+            transcript = (pools["university_courses"] + pools["required_courses"]
+                          + random.sample(pools["core_electives"], random.randint(4, 14))
+                          + random.sample(pools["area_electives"], random.randint(1, 6))
+                          + random.sample(pools["free_electives"], random.randint(0, 6)))
+            random.shuffle(transcript)
+            reports = {}
+            for mode in times:
+                t0 = time.perf_counter()
+                reports[mode] = run_fens_audit(major, transcript, raw, allocation=mode)
+                times[mode].append((time.perf_counter() - t0) * 1000)
+            gained += counted(reports["optimal"]) - counted(reports["greedy"])
+            fixed += unmet(reports["greedy"]) - unmet(reports["optimal"])
+        print(f"   {major:4s} | greedy ort: {sum(times['greedy'])/runs:5.2f} ms | "
+              f"optimal ort: {sum(times['optimal'])/runs:5.2f} ms (maks {max(times['optimal']):5.2f} ms) | "
+              f"Core+Area+Free ek kredi: {gained/runs:+.2f} | çözülen alt kural: {fixed}")
@@ -8,23 +8,38 @@ TANIM: FENS Fakültesi Mezuniyet Denetim Motoru (Audit Engine).
 
 YOL HARİTASI (ROADMAP):
 1. UTILS .................. Dinamik kredi haritası ve havuz ayrıştırma araçları
-2. LOGIC GATES ............ Math seçimi ve Fakülte dağılım kontrolleri
-3. REPORTING .............. Raporlama ve Yol Haritası (Roadmap) üretimi
-4. CORE AUDIT ............. Ana denetim döngüsü ve Şelale (Waterfall) mantığı
+2. LOGIC GATES ............ Derlenmiş kurallarla (rule_engine) Zorunlu/Math kapıları
+3. REPORTING .............. Raporlama, Yol Haritası ve Şelale dağıtımı
+4. CORE AUDIT ............. Denetim aşamaları ve ana döngü (audit_fens -> AuditResult, run_fens_audit -> sözlük)
+5. MEMO CACHE ............. Kanonik transkript anahtarlı, sınırlı sonuç önbelleği
 =============================================================================
 """
 
-import re
 import sys
 import os
+import json
+import hashlib
+import threading
+from collections import OrderedDict
 
 # Path ayarı (src modüllerini bulabilmesi için)
 sys.path.append(os.path.dirname(os.path.abspath(__file__)))
 
 try:
     from major_rules import FENS_RULES
+    from allocation import allocate_electives, allocation_key
+    from rule_engine import get_compiled_rules
+    from audit_types import Category, CategoryResult, FacultyResult, AuditResult
 except ImportError:
     from src.major_rules import FENS_RULES
+    from src.allocation import allocate_electives, allocation_key
+    from src.rule_engine import get_compiled_rules
+    from src.audit_types import Category, CategoryResult, FacultyResult, AuditResult
+
+# Çift import yolu (audit_engine / src.audit_engine) modülü iki kez yüklemesin:
+# sonuç önbelleği süreç genelinde tek olmalı, iki isim de bu modüle bağlanır.
+sys.modules.setdefault("audit_engine", sys.modules[__name__])
+sys.modules.setdefault("src.audit_engine", sys.modules[__name__])
 
 # =============================================================================
 # 1. UTILS (YARDIMCI ARAÇLAR)
@@ -56,102 +71,124 @@ def create_course_credit_map(raw_data_json, major_code):
         if k not in credit_map: credit_map[k] = v
     return credit_map
 
-def get_credits(course_list, credit_map):
-    """Listeki derslerin toplam kredisini hesaplar."""
+# Derlenmiş bölüm yapıları: (id(raw_data), major) -> (raw_data, program)
+# raw_data referansı tutulur; böylece id() başka bir nesneye geçemez.
+_PROGRAM_CACHE = {}
+PROGRAM_CACHE_LIMIT = 64
+
+def compile_program(raw_data_json, major_code):
+    """
+    Bölümün transkriptten bağımsız yapılarını (kredi haritası, havuz listeleri,
+    derlenmiş kurallar) bir kez hazırlar. Aynı raw_data ile yapılan tüm
+    denetimler bunu paylaşır. Dönen yapı salt okunurdur, değiştirilmemelidir.
+    """
+    key = (id(raw_data_json), major_code)
+    entry = _PROGRAM_CACHE.get(key)
+    if entry is not None and entry[0] is raw_data_json:
+        return entry[1]
+
+    compiled = get_compiled_rules(major_code)
+    reqs = raw_data_json.get(major_code, {}).get("requirements", {})
+    hum_excluded = compiled["hum_excluded"]
+
+    # Üniversite havuzu (HUM kısıtı: örn. HUM 3xx üniversite sayılmaz, Free'ye düşer)
+    uni_pool = [c['code'] for c in reqs.get("university_courses", []) if not hum_excluded(c['code'])]
+    uni_set = frozenset(uni_pool)
+
+    # Zorunlu havuzu: Math kapısının dersleri, Üniversite ile çakışanlar (Overlap Fix)
+    # ve HUM kısıtına takılanlar çıkarılır
+    required = tuple(c['code'] for c in reqs.get("required_courses", []))
+    pure_reqs = tuple(
+        c for c in required
+        if c not in compiled["math_courses"] and c not in uni_set and not hum_excluded(c)
+    )
+
+    program = {
+        "credit_map": create_course_credit_map(raw_data_json, major_code),
+        "rules": compiled,
+        "university_courses": tuple(c['code'] for c in reqs.get("university_courses", [])),
+        "required_courses": required,
+        "std_university": tuple(c for c in uni_pool if not c.startswith("HUM")),
+        "pure_required": pure_reqs,
+        "core_codes": frozenset([c['code'] for c in reqs.get("core_electives", [])]) | compiled["overflow_courses"],
+        "area_codes": frozenset(c['code'] for c in reqs.get("area_electives", [])),
+    }
+    if len(_PROGRAM_CACHE) >= PROGRAM_CACHE_LIMIT: _PROGRAM_CACHE.clear()
+    _PROGRAM_CACHE[key] = (raw_data_json, program)
+    return program
+
+def sum_credits(codes, credit_map):
+    """Saf ders kodlarının toplam kredisi (etiketli "KOD (etiket)" string'leri kabul etmez)."""
     total = 0
-    for c in course_list:
-        clean_code = c.split(" (")[0]
-        total += credit_map.get(clean_code, 3.0)
+    for c in codes:
+        total += credit_map.get(c, 3.0)
     return total
 
-def get_faculty_counts(taken_courses, pools):
-    """DSA için Fakülte (FENS, FASS, SBS) dağılımını sayar."""
-    counts = {"FENS": 0, "FASS": 0, "SBS": 0}
-    for course_raw in taken_courses:
-        course = course_raw.split(" (")[0]
-        if course in pools["FENS"]: counts["FENS"] += 1
-        elif course in pools["FASS"]: counts["FASS"] += 1
-        elif course in pools["SBS"]: counts["SBS"] += 1
-    return counts
+def collect_rule_courses(node, out=None):
+    """Kural sözlüğündeki tüm ders kodlarını (options, pools, valid_list...) toplar."""
+    if out is None: out = set()
+    if isinstance(node, dict):
+        for v in node.values(): collect_rule_courses(v, out)
+    elif isinstance(node, (list, tuple)):
+        for v in node: collect_rule_courses(v, out)
+    elif isinstance(node, str):
+        out.add(node)
+    return out
 
 # =============================================================================
 # 2. LOGIC GATES (MANTIK KAPILARI)
 # =============================================================================
 
-def check_math_requirement(taken_set, constraints):
-    """Matematik kuralını kontrol eder (Bundle/Discard)."""
-    logic = constraints.get("math_logic", {}).get("type")
-    options = constraints.get("math_logic", {}).get("options", [])
-    if not logic: return True, [], [] 
-
-    if logic == "ONE_OF_DISCARD":
-        found = [opt for opt in options if opt in taken_set]
-        if found: return True, [found[0]], found[1:]
-        return False, [], []
-
-    elif logic == "BUNDLE_OR_DISCARD":
-        for bundle in options:
-            if len(bundle["courses"]) == 1 and bundle["courses"][0] in taken_set:
-                 other_courses = []
-                 for other_b in options:
-                     if other_b != bundle: other_courses.extend(other_b["courses"])
-                 discard = [c for c in other_courses if c in taken_set]
-                 return True, bundle["courses"], discard
-        for bundle in options:
-            required = bundle["courses"]
-            if set(required).issubset(taken_set):
-                return True, required, []     
-    return False, [], []
-
-def check_sub_rules(taken_subset, rule, pools=None):
-    """Alt kuralları kontrol eder."""
-    if not rule: return True, ""
-    if rule["type"] == "MIN_CREDITS":
-        matches = [c for c in taken_subset if re.match(rule["filter_regex"], c)]
-        total_cr = len(matches) * 3 
-        if total_cr >= rule["min_value"]: return True, "✅ Kural Sağlandı"
-        return False, f"⚠️ {rule['message']} (Şu an: {total_cr} kr)"
-    elif rule["type"] == "MIN_COURSE_COUNT":
-        count = 0
-        for c in taken_subset:
-            if c in rule.get("valid_list", []) or (rule.get("valid_regex") and re.match(rule["valid_regex"], c)):
-                count += 1
-        if count >= rule["min_value"]: return True, "✅ Kural Sağlandı"
-        return False, f"⚠️ {rule['message']}"
-    elif rule["type"] == "FACULTY_DISTRIBUTION":
-        counts = get_faculty_counts(taken_subset, rule["pools"])
-        min_req = rule["min_each"]
-        missing = []
-        for fac, count in counts.items():
-            if count < min_req: missing.append(f"{fac} ({count}/{min_req})")
-        if missing: return False, f"⚠️ Dağılım Eksik: {', '.join(missing)}"
-        return True, "✅ Fakülte Dağılımı Tamam"
-    return True, ""
-
-def check_global_faculty_requirement(all_taken, rule):
-    """DSA Global Fakülte Kuralı."""
-    if not rule: return {}
-    counts = get_faculty_counts(all_taken, rule["pools"])
-    total = sum(counts.values())
-    is_ok = True
-    status_msg = []
-    if total < rule["min_total"]:
-        status_msg.append(f"Toplam Eksik ({total}/{rule['min_total']})")
-        is_ok = False
-    for fac, count in counts.items():
-        if count < rule["min_each"]:
-            status_msg.append(f"{fac} Eksik")
-            is_ok = False
-    return {
-        "status": "OK" if is_ok else "Eksik",
-        "message": ", ".join(status_msg) if status_msg else "Tamamlandı",
-        "detail": f"{counts} (Top: {total})"
-    }
+def evaluate_required(program, taken_set):
+    """
+    Zorunlu dersleri derlenmiş kurallarla değerlendirir.
+    Sıra: bölüm kapıları (örn. IE: CS 201/DSA 201, DSA: DSA 210/CS 210),
+    kalan zorunlu dersler, son olarak Math kapısı.
+
+    Returns:
+        (taken_r, tags_r, missing_r, math_taken, math_discard, special_overflow)
+        taken_r saf ders kodlarıdır; Math kapısından gelenler tags_r'de "Math" etiketlidir
+        (hiç etiket yoksa tags_r boş tuple'dır).
+    """
+    compiled = program["rules"]
+    if compiled["math"]: math_ok, math_taken, math_discard = compiled["math"](taken_set)
+    else: math_ok, math_taken, math_discard = True, [], []
+
+    pure_reqs = list(program["pure_required"])
+    taken_r, missing_r = [], []
+    special_overflow = None
+    for gate in compiled["gates"]:
+        special_overflow = gate(taken_set, pure_reqs, taken_r, missing_r) or special_overflow
+
+    for c in pure_reqs:
+        if c in taken_set: taken_r.append(c)
+        else: missing_r.append(c)
+
+    tags_r = ()
+    if math_ok:
+        if math_taken: tags_r = ("",) * len(taken_r) + ("Math",) * len(math_taken)
+        taken_r.extend(math_taken)
+    else: missing_r.append(compiled["math_message"])
+    return taken_r, tags_r, missing_r, math_taken, math_discard, special_overflow
 
 # =============================================================================
 # 3. REPORTING (RAPORLAMA VE YOL HARİTASI)
 # =============================================================================
 
+AUDIT_CATEGORIES = ("University", "Required", "Core", "Area", "Free")
+
+def remaining_credits(report):
+    """Tüm kategorilerdeki toplam kredi açığı."""
+    return sum(max(0, report[c]["target"] - report[c]["credits"]) for c in AUDIT_CATEGORIES)
+
+def count_unmet(report):
+    """Sağlanmamış şart sayısı: eksik dersler + uyarılı alt kurallar + fakülte kuralı."""
+    unmet = len(report["University"]["missing"]) + len(report["Required"]["missing"])
+    unmet += ("⚠️" in report["Core"]["note"]) + ("⚠️" in report["Area"]["note"])
+    if "FacultyCheck" in report and report["FacultyCheck"]["status"] != "OK":
+        unmet += 1
+    return unmet
+
 def generate_roadmap(report):
     """Rapor sonuçlarına göre öğrenciye adım adım yol haritası çıkarır."""
     roadmap = []
@@ -183,128 +220,18 @@ def generate_roadmap(report):
         roadmap.append("🎉 **Tebrikler!** Mezuniyet için tüm akademik şartları sağladın.")
     return roadmap
 
-# =============================================================================
-# 4. CORE AUDIT (ANA DENETİM DÖNGÜSÜ)
-# =============================================================================
-
-def run_fens_audit(major_code, taken_courses, raw_data_json):
-    """Tüm kuralları ve verileri birleştirip hesap yapan ana fonksiyon."""
-    if major_code not in FENS_RULES:
-        return {"Error": "Bölüm kuralları bulunamadı."}
-        
-    rules = FENS_RULES[major_code]
-    reqs_data = raw_data_json.get(major_code, {}).get("requirements", {})
-    credit_map = create_course_credit_map(raw_data_json, major_code)
-    taken_set = set(taken_courses)
-    
-    # --- YENİ: Kural Dosyasından HUM Kısıtlamasını Oku ---
-    hum_rule = rules["constraints"].get("hum_restriction", None)
-
-    # --- A. ÜNİVERSİTE DERSLERİ ---
-    raw_uni_pool = [c['code'] for c in reqs_data.get("university_courses", [])]
-    
-    # HUM FİLTRESİ (HUM 3xx Üniversite sayılmasın!)
-    uni_pool = []
-    for c in raw_uni_pool:
-        # Eğer FENS kuralı aktifse (ONLY_2XX) ve ders HUM ise:
-        if hum_rule == "ONLY_2XX" and c.startswith("HUM") and not c.startswith("HUM 2"):
-            continue # HUM 3xx, 4xx gibi dersleri üniversite havuzuna ALMA. (Free'ye düşsün)
-        uni_pool.append(c)
-            
-    uni_set = set(uni_pool) # Kesişim kontrolü için set yap
-    
-    std_uni = [c for c in uni_pool if not c.startswith("HUM")]
-    
-    taken_u = [c for c in std_uni if c in taken_set]
-    missing_u = [c for c in std_uni if c not in taken_set]
-    
-    # HUM 2xx Kontrolü (Özel Slot: Sadece 1 tane HUM 2xx sayılır)
-    taken_hums = [c for c in taken_courses if c.startswith("HUM 2")]
-    if taken_hums: taken_u.append(f"{taken_hums[0]} (HUM)")
-    else: missing_u.append("HUM 2xx")
-    
-    u_credits = get_credits(taken_u, credit_map)
-    report_u = {
-        "taken": taken_u, "missing": missing_u, 
-        "credits": u_credits, "target": rules["credits"]["university"]
-    }
-
-    # --- B. ZORUNLU DERSLER ---
-    math_ok, math_taken, math_discard = check_math_requirement(taken_set, rules["constraints"])
-    raw_reqs = [c['code'] for c in reqs_data.get("required_courses", [])]
-    math_excludes = {"MATH 201", "MATH 202", "MATH 212"}
-    
-    # --- ZORUNLU FİLTRESİ (Çakışma Önleyici) ---
-    pure_reqs = []
-    for c in raw_reqs:
-        # Math zaten özel hesaplanıyor, atla
-        if c in math_excludes: continue
-        
-        # Eğer ders zaten Üniversite havuzunda varsa, Zorunlu'da gösterme (Overlap Fix)
-        if c in uni_set: continue
-        
-        # HUM KURALI (Buraya da sızmış olabilir, temizle)
-        if hum_rule == "ONLY_2XX" and c.startswith("HUM") and not c.startswith("HUM 2"):
-            continue
-            
-        pure_reqs.append(c)
-    
-    taken_r = []
-    missing_r = []
-    special_overflow = None
-    
-    # IE Kuralı: CS 201 vs DSA 201
-    if major_code == "IE":
-        if "CS 201" in taken_set and "DSA 201" in taken_set:
-            special_overflow = "CS 201"
-            if "CS 201" in pure_reqs: pure_reqs.remove("CS 201")
-            taken_r.append("DSA 201")
-        elif "DSA 201" in taken_set and "CS 201" not in taken_set:
-            if "CS 201" in pure_reqs: pure_reqs.remove("CS 201")
-            taken_r.append("DSA 201")
-    
-    # DSA Kuralı: CS 210 vs DSA 210
-    if major_code == "DSA":
-        # Manuel Kontrol: JSON'dan eksik gelse bile düzelt
-        has_dsa = "DSA 210" in taken_set
-        has_cs = "CS 210" in taken_set
-        
-        if "DSA 210" in pure_reqs: pure_reqs.remove("DSA 210")
-        if "CS 210" in pure_reqs: pure_reqs.remove("CS 210")
-        
-        if has_dsa: taken_r.append("DSA 210")
-        elif has_cs: taken_r.append("CS 210")
-        else: missing_r.append("DSA 210 / CS 210")
-
-    for c in pure_reqs:
-        if c in taken_set: taken_r.append(c)
-        else: missing_r.append(c)
-        
-    if math_ok: taken_r.extend([f"{m} (Math)" for m in math_taken])
-    else: missing_r.append(rules["constraints"]["math_logic"]["message"])
-    
-    r_credits = get_credits(taken_r, credit_map)
-    report_r = {
-        "taken": taken_r, "missing": missing_r,
-        "credits": r_credits, "target": rules["credits"]["required"]
-    }
-
-    # --- C. SEÇMELİLER ---
-    used = set(taken_u) | set(taken_r) | set(math_taken) | set(math_discard)
-    used = {c.split(" (")[0] for c in used}
-    
-    if special_overflow and special_overflow in used: used.remove(special_overflow)
-    remaining_pool = [c for c in taken_courses if c not in used]
-    
+def greedy_electives(remaining_pool, core_codes, area_codes, credit_map, rules, special_overflow=None):
+    """
+    Şelale (Waterfall) dağıtımı: Dersleri havuz sırasıyla (audit_fens'te kanonik,
+    sıralı düzen) Core -> Area -> Free'ye yerleştirir.
+    Kategori 'hedef + 2' krediyi aşınca kalan dersler bir sonraki kategoriye taşar.
+    """
     # C.1 Core
-    core_codes = {c['code'] for c in reqs_data.get("core_electives", [])}
-    if major_code == "IE": core_codes.add("CS 201")
-    
     taken_core = [c for c in remaining_pool if c in core_codes]
-    if special_overflow == "CS 201" and special_overflow not in taken_core:
+    if special_overflow and special_overflow not in taken_core:
         taken_core.append(special_overflow)
 
-    curr_core_cr = get_credits(taken_core, credit_map)
+    curr_core_cr = sum_credits(taken_core, credit_map)
     req_core_cr = rules["credits"]["core"]
     
     core_overflow = []
@@ -320,25 +247,14 @@ def run_fens_audit(major_code, taken_courses, raw_data_json):
         taken_core = keep_core
         curr_core_cr = accumulated
 
-    sub_status, sub_msg = check_sub_rules(taken_core, rules["constraints"].get("core_sub_rule"))
-    if "core_distribution" in rules["constraints"]:
-        sub_status, sub_msg = check_sub_rules(taken_core, rules["constraints"]["core_distribution"], rules["constraints"]["core_distribution"].get("pools"))
-
-    report_core = {
-        "taken": taken_core, "credits": curr_core_cr, "target": req_core_cr,
-        "note": sub_msg, "status": "OK" if sub_status else "Eksik"
-    }
-
     # C.2 Area
     used_in_core = set(taken_core)
     remaining_pool = [c for c in remaining_pool if c not in used_in_core] 
-    area_codes = {c['code'] for c in reqs_data.get("area_electives", [])}
     
     taken_area = [c for c in remaining_pool if c in area_codes or c in core_overflow]
-    curr_area_cr = get_credits(taken_area, credit_map)
+    curr_area_cr = sum_credits(taken_area, credit_map)
     req_area_cr = rules["credits"]["area"]
     
-    area_overflow = []
     if curr_area_cr > req_area_cr:
         accumulated = 0
         keep_area = []
@@ -347,36 +263,245 @@ def run_fens_audit(major_code, taken_courses, raw_data_json):
             if accumulated + cr <= req_area_cr + 2:
                 accumulated += cr
                 keep_area.append(c)
-            else: area_overflow.append(c)
         taken_area = keep_area
         curr_area_cr = accumulated
-        
-    sub_status_area, sub_msg_area = check_sub_rules(taken_area, rules["constraints"].get("area_sub_rule"))
-    report_area = {
-        "taken": taken_area, "credits": curr_area_cr, "target": req_area_cr,
-        "note": sub_msg_area
-    }
 
     # C.3 Free
+    # Area'ya sığmayan dersler kalan havuzda kalır ve Free'ye bir kez düşer
+    # (her ders tam olarak bir kategoride sayılır).
     used_in_area = set(taken_area)
-    remaining_pool = [c for c in remaining_pool if c not in used_in_area] 
-    taken_free = remaining_pool + area_overflow
-    curr_free_cr = get_credits(taken_free, credit_map)
+    taken_free = [c for c in remaining_pool if c not in used_in_area]
+    curr_free_cr = sum_credits(taken_free, credit_map)
+
+    return taken_core, curr_core_cr, taken_area, curr_area_cr, taken_free, curr_free_cr
+
+# =============================================================================
+# 4. CORE AUDIT (ANA DENETİM DÖNGÜSÜ)
+# =============================================================================
+
+def audit_fixed(program, rules, taken_set):
+    """
+    Seçmeliler öncesi aşamalar: Üniversite ve Zorunlu (Math kapısı dahil).
+
+    Returns:
+        (report_u, report_r, remaining_pool, special_overflow, math_discard)
+        remaining_pool seçmelilere kalan derslerdir (kanonik, sıralı düzen).
+    """
+    targets = rules["credits"]
+    credit_map = program["credit_map"]
+    taken_courses = sorted(taken_set)  # Kanonik sıra (şelale sıraya bağlı)
+
+    # --- A. ÜNİVERSİTE DERSLERİ ---
+    # Havuz compile_program'da HUM kısıtına göre süzülmüştür (HUM 3xx Free'ye düşer)
+    std_uni = program["std_university"]
     
-    report_free = {
-        "taken": taken_free, "credits": curr_free_cr, "target": rules["credits"]["free"]
-    }
+    taken_u = [c for c in std_uni if c in taken_set]
+    missing_u = [c for c in std_uni if c not in taken_set]
+    tags_u = ()
+    
+    # HUM 2xx Kontrolü (Özel Slot: Sadece 1 tane HUM 2xx sayılır)
+    for c in taken_courses:
+        if c.startswith("HUM 2"):
+            tags_u = ("",) * len(taken_u) + ("HUM",)
+            taken_u.append(c)
+            break
+    else: missing_u.append("HUM 2xx")
+    
+    report_u = CategoryResult(
+        Category.UNIVERSITY, tuple(taken_u), sum_credits(taken_u, credit_map), targets["university"],
+        tags=tags_u, missing=tuple(missing_u)
+    )
 
-    # --- RAPOR TOPLAMA ---
-    final_report = {
-        "University": report_u, "Required": report_r,
-        "Core": report_core, "Area": report_area, "Free": report_free
-    }
+    # --- B. ZORUNLU DERSLER ---
+    # Bölüme özel eşdeğerlikler (IE: CS 201/DSA 201, DSA: DSA 210/CS 210)
+    # major_rules'taki kural verisinden derlenen kapılarla işlenir
+    taken_r, tags_r, missing_r, math_taken, math_discard, special_overflow = evaluate_required(program, taken_set)
+    
+    report_r = CategoryResult(
+        Category.REQUIRED, tuple(taken_r), sum_credits(taken_r, credit_map), targets["required"],
+        tags=tags_r, missing=tuple(missing_r)
+    )
+
+    used = set(taken_u)
+    used.update(taken_r, math_taken, math_discard)
     
-    if major_code == "DSA" and "faculty_requirement" in rules["constraints"]:
-        valid_all = set(taken_courses) - set(math_discard)
-        fac_rep = check_global_faculty_requirement(list(valid_all), rules["constraints"]["faculty_requirement"])
-        final_report["FacultyCheck"] = fac_rep
+    if special_overflow and special_overflow in used: used.remove(special_overflow)
+    remaining_pool = [c for c in taken_courses if c not in used]
+    return report_u, report_r, remaining_pool, special_overflow, math_discard
+
+def elective_key(program, rules, remaining_pool, special_overflow, allocation="optimal"):
+    """
+    Core/Area dağıtımının bağlı olduğu girdi. İki transkriptte anahtar aynıysa
+    Core ve Area aynıdır; Free kalan havuzdan free_category ile türetilir.
+    Greedy'de sadece Core/Area havuzlarındaki dersler, optimal'de
+    allocation_key (Free hedefine kırpılmış sadece-Free kredisi dahil) kullanılır.
+    """
+    core_codes = program["core_codes"]
+    area_codes = program["area_codes"]
+    if allocation == "optimal":
+        key = allocation_key(remaining_pool, core_codes, area_codes, program["credit_map"], rules)
+    else:
+        key = tuple(c for c in remaining_pool if c in core_codes or c in area_codes)
+    return allocation, special_overflow, key
+
+def free_category(program, rules, remaining_pool, report_core, report_area):
+    """Core/Area'ya yerleşmeyen dersler (havuz sırasıyla) Free'ye düşer."""
+    used = set(report_core.taken)
+    used.update(report_area.taken)
+    taken_free = tuple(c for c in remaining_pool if c not in used)
+    return CategoryResult(Category.FREE, taken_free, sum_credits(taken_free, program["credit_map"]), rules["credits"]["free"])
+
+def audit_electives(program, rules, remaining_pool, special_overflow, allocation="optimal"):
+    """
+    --- C. SEÇMELİLER ---
+    Returns:
+        (report_core, report_area, report_free)
+    """
+    targets = rules["credits"]
+    compiled = program["rules"]
+    credit_map = program["credit_map"]
+    core_codes = program["core_codes"]
+    area_codes = program["area_codes"]
+
+    if allocation == "optimal":
+        # Kesin (DP) dağıtım: sıradan bağımsız, kredi maksimize eden atama
+        taken_core, taken_area, taken_free = allocate_electives(remaining_pool, core_codes, area_codes, credit_map, rules)
+        curr_core_cr = sum_credits(taken_core, credit_map)
+        curr_area_cr = sum_credits(taken_area, credit_map)
+        curr_free_cr = sum_credits(taken_free, credit_map)
+    else:
+        (taken_core, curr_core_cr, taken_area, curr_area_cr,
+         taken_free, curr_free_cr) = greedy_electives(remaining_pool, core_codes, area_codes, credit_map, rules, special_overflow)
+
+    sub_status, sub_msg = compiled["core_check"](taken_core)
+    report_core = CategoryResult(
+        Category.CORE, tuple(taken_core), curr_core_cr, targets["core"],
+        note=sub_msg, status="OK" if sub_status else "Eksik"
+    )
+
+    sub_status_area, sub_msg_area = compiled["area_check"](taken_area)
+    report_area = CategoryResult(
+        Category.AREA, tuple(taken_area), curr_area_cr, targets["area"],
+        note=sub_msg_area
+    )
+
+    report_free = CategoryResult(Category.FREE, tuple(taken_free), curr_free_cr, targets["free"])
+    return report_core, report_area, report_free
+
+def assemble_audit(major_code, program, categories, taken_set, math_discard):
+    """Kategorilere fakülte kontrolü ve yol haritasını ekleyip AuditResult kurar."""
+    compiled = program["rules"]
+    summary = {c.category.value: c for c in categories}
+
+    faculty = None
+    if compiled["faculty_check"]:
+        valid_all = taken_set - set(math_discard)
+        faculty = FacultyResult(**compiled["faculty_check"](valid_all))
+        summary["FacultyCheck"] = faculty
+
+    return AuditResult(major_code, tuple(categories), faculty, tuple(generate_roadmap(summary)))
+
+def audit_fens(major_code, taken_courses, raw_data_json, allocation="optimal"):
+    """
+    Tüm kuralları ve verileri birleştirip hesap yapan ana fonksiyon.
+    allocation: "optimal" (allocation.py DP motoru, varsayılan) veya "greedy"
+                (eski şelale; sıraya bağlı, karşılaştırma için tutulur).
+
+    Transkript küme olarak ele alınır: şelale sıraya bağlı olduğundan dersler
+    burada tekrarsız ve sıralı (kanonik) düzene getirilir. Böylece her giriş
+    noktası (run_fens_audit, cached_fens_audit, batch_audit, multi_audit,
+    AuditSession) aynı ders kümesi için aynı sonucu verir.
+
+    Aşamalar: audit_fixed (University, Required) -> audit_electives
+    (Core, Area, Free) -> assemble_audit (fakülte kontrolü, yol haritası).
+
+    Returns:
+        AuditResult: Ders kodları ve etiketleri ayrı tutulan sabit sonuç.
+    """
+    if major_code not in FENS_RULES:
+        return AuditResult(major_code, error="Bölüm kuralları bulunamadı.")
+        
+    rules = FENS_RULES[major_code]
+    program = compile_program(raw_data_json, major_code)
+    taken_set = set(taken_courses)
+
+    report_u, report_r, remaining_pool, special_overflow, math_discard = audit_fixed(program, rules, taken_set)
+    electives = audit_electives(program, rules, remaining_pool, special_overflow, allocation)
+    return assemble_audit(major_code, program, (report_u, report_r, *electives), taken_set, math_discard)
+
+def run_fens_audit(major_code, taken_courses, raw_data_json, allocation="optimal"):
+    """
+    audit_fens sonucunu eski sözlük formatında döndürür
+    ({"University": {"taken": [...], ...}, ..., "Roadmap": [...]}).
+    """
+    return audit_fens(major_code, taken_courses, raw_data_json, allocation).to_dict()
+
+# =============================================================================
+# 5. MEMO CACHE (SONUÇ ÖNBELLEĞİ)
+# =============================================================================
 
-    final_report["Roadmap"] = generate_roadmap(final_report)
-    return final_report
\ No newline at end of file
+# Streamlit her etkileşimde betiği baştan çalıştırır; aynı transkript için
+# denetim tekrar tekrar hesaplanmasın diye süreç genelinde LRU önbellek.
+# Anahtar: (bölüm, frozenset(dersler), veri/kural parmak izi, dağıtım modu)
+AUDIT_CACHE_LIMIT = 1024
+_AUDIT_CACHE = OrderedDict()
+_AUDIT_CACHE_LOCK = threading.Lock()  # Streamlit oturumları ayrı thread'lerde koşar
+_AUDIT_CACHE_STATS = {"hits": 0, "misses": 0, "evictions": 0}
+
+def program_fingerprint(raw_data_json, major_code):
+    """
+    Bölümün müfredat verisi + FENS_RULES kuralının içerik özeti (SHA-1).
+    raw_data nesnesi başına bir kez hesaplanır (compile_program yapısında saklanır);
+    st.cache_data kopyaları farklı nesne olsa da aynı parmak izini üretir.
+    """
+    program = compile_program(raw_data_json, major_code)
+    fp = program.get("fingerprint")
+    if fp is None:
+        payload = json.dumps(
+            [raw_data_json.get(major_code, {}), FENS_RULES.get(major_code, {})],
+            sort_keys=True, ensure_ascii=False, default=str
+        )
+        fp = hashlib.sha1(payload.encode("utf-8")).hexdigest()
+        program["fingerprint"] = fp
+    return fp
+
+def cached_fens_audit(major_code, taken_courses, raw_data_json, allocation="optimal"):
+    """
+    audit_fens'in önbellekli hali. audit_fens transkripti zaten kanonik
+    (sıralı) düzende denetlediği için anahtar olarak ders kümesi yeterlidir.
+    Dönen AuditResult sabittir (frozen), güvenle paylaşılır.
+    """
+    taken = frozenset(taken_courses)
+    key = (major_code, taken, program_fingerprint(raw_data_json, major_code), allocation)
+
+    with _AUDIT_CACHE_LOCK:
+        report = _AUDIT_CACHE.get(key)
+        if report is not None:
+            _AUDIT_CACHE.move_to_end(key)
+            _AUDIT_CACHE_STATS["hits"] += 1
+            return report
+        _AUDIT_CACHE_STATS["misses"] += 1
+
+    report = audit_fens(major_code, taken, raw_data_json, allocation)
+
+    with _AUDIT_CACHE_LOCK:
+        _AUDIT_CACHE[key] = report
+        _AUDIT_CACHE.move_to_end(key)
+        while len(_AUDIT_CACHE) > AUDIT_CACHE_LIMIT:
+            _AUDIT_CACHE.popitem(last=False)
+            _AUDIT_CACHE_STATS["evictions"] += 1
+    return report
+
+def audit_cache_stats():
+    """Önbellek istatistikleri: hits / misses / evictions / size / limit / hit_rate."""
+    with _AUDIT_CACHE_LOCK:
+        stats = dict(_AUDIT_CACHE_STATS, size=len(_AUDIT_CACHE), limit=AUDIT_CACHE_LIMIT)
+    total = stats["hits"] + stats["misses"]
+    stats["hit_rate"] = round(stats["hits"] / total, 3) if total else 0.0
+    return stats
+
+def clear_audit_cache():
+    """Önbelleği ve istatistikleri sıfırlar (müfredat verisi güncellenince)."""
+    with _AUDIT_CACHE_LOCK:
+        _AUDIT_CACHE.clear()
+        for k in _AUDIT_CACHE_STATS: _AUDIT_CACHE_STATS[k] = 0
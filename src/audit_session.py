@@ -0,0 +1,217 @@
+"""
+=============================================================================
+PROJE: SABANCI UNIVERSITY SMART ADVISOR
+DOSYA: src/audit_session.py
+TANIM: Artımlı (Incremental) Mezuniyet Denetim Oturumu.
+       Sidebar'dan tek ders eklenip çıkarıldığında denetimin pahalı kısmını
+       (Core/Area seçmeli dağıtımı, varsayılan olarak allocation.py DP'si)
+       tekrar koşturmak yerine önceki dağıtımı yeniden kullanır.
+
+       Her değişiklikte ucuz aşamalar (University, Required + Math kapısı,
+       fakülte kontrolü, yol haritası) yeniden hesaplanır. Dağıtım ise
+       sadece girdisi (elective_key: Core/Area'ya girebilen kalan dersler,
+       özel taşma dersi ve Free hedefine kırpılmış sadece-Free kredisi)
+       değiştiğinde yeniden çalışır; aksi halde Core/Area aynen korunur,
+       Free kalan havuzdan türetilir. Böylece Üniversite / Zorunlu havuzu,
+       Math kapısı, HUM ve bölüm dışı dersler dağıtımı tetiklemez.
+       Core/Area havuzundaki bir dersin eklenmesi / çıkarılması dağıtımı
+       yeniden koşturur: optimal dağıtımda tek bir ders tüm seçmelileri
+       yeniden karıştırabilir (req + 2 sınırı, alt kurallar).
+       Sonuç her zaman audit_fens(major, session.courses, raw) ile
+       birebir aynıdır.
+
+       Kontrol (rastgele transkript + ekle/çıkar dizileri):
+           python src/audit_session.py --check
+=============================================================================
+"""
+
+import sys
+import os
+
+# Path ayarı (src modüllerini bulabilmesi için)
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+try:
+    from audit_engine import (
+        audit_fens, compile_program, audit_fixed, elective_key,
+        audit_electives, free_category, assemble_audit,
+    )
+    from major_rules import FENS_RULES
+except ImportError:
+    from src.audit_engine import (
+        audit_fens, compile_program, audit_fixed, elective_key,
+        audit_electives, free_category, assemble_audit,
+    )
+    from src.major_rules import FENS_RULES
+
+
+class AuditSession:
+    """
+    Tek bir öğrencinin (bölüm + transkript) denetim durumunu tutar.
+
+    Kullanım:
+        session = AuditSession("CS", raw_data, ["MATH 101", "CS 201"])
+        session.add("ECON 201")
+        session.result  # audit_fens("CS", session.courses, raw_data) ile aynı
+        session.report  # run_fens_audit ile aynı eski sözlük formatı
+    """
+
+    def __init__(self, major_code, raw_data_json, taken_courses=(), allocation="optimal"):
+        self.major_code = major_code
+        self.raw_data = raw_data_json
+        self.allocation = allocation
+        self.rules = FENS_RULES.get(major_code)
+        self.program = compile_program(raw_data_json, major_code) if self.rules else None
+        self.stats = {"incremental": 0, "full": 0}
+        self._key = None
+        self.reset(taken_courses)
+
+    # --- DURUM YÖNETİMİ ---
+
+    @property
+    def course_set(self):
+        return self._course_set
+
+    @property
+    def report(self):
+        """Eski sözlük formatı (run_fens_audit ile aynı)."""
+        return self.result.to_dict()
+
+    def reset(self, taken_courses):
+        """Transkripti baştan kurar ve tam denetim çalıştırır (sıra korunur, tekrarlar atılır)."""
+        self.courses = list(dict.fromkeys(taken_courses))
+        self._course_set = set(self.courses)
+        self._key = None
+        self._update()
+        return self.result
+
+    def _update(self):
+        """Ucuz aşamaları yeniden hesaplar; dağıtımı sadece girdisi değiştiyse koşturur."""
+        if self.rules is None:
+            self.result = audit_fens(self.major_code, self.courses, self.raw_data, self.allocation)
+            self.stats["full"] += 1
+            return
+
+        program, rules, taken_set = self.program, self.rules, self._course_set
+        report_u, report_r, pool, special_overflow, math_discard = audit_fixed(program, rules, taken_set)
+        key = elective_key(program, rules, pool, special_overflow, self.allocation)
+
+        if key == self._key:
+            _, _, core, area, _ = self.result.categories
+            electives = (core, area, free_category(program, rules, pool, core, area))
+            self.stats["incremental"] += 1
+        else:
+            electives = audit_electives(program, rules, pool, special_overflow, self.allocation)
+            self._key = key
+            self.stats["full"] += 1
+
+        self.result = assemble_audit(self.major_code, program, (report_u, report_r, *electives), taken_set, math_discard)
+
+    # --- TEKİL DEĞİŞİKLİKLER ---
+
+    def add(self, code):
+        """Transkriptin sonuna ders ekler."""
+        if code in self._course_set: return self.result
+        self.courses.append(code)
+        self._course_set.add(code)
+        self._update()
+        return self.result
+
+    def remove(self, code):
+        """Transkriptten ders çıkarır."""
+        if code not in self._course_set: return self.result
+        self.courses.remove(code)
+        self._course_set.discard(code)
+        self._update()
+        return self.result
+
+    def sync(self, taken_courses):
+        """
+        Oturumu verilen ders kümesine eşitler (Streamlit session_state için).
+        Önce çıkarmalar, sonra (deterministik olması için sıralı) eklemeler uygulanır.
+        """
+        target = set(taken_courses)
+        for code in [c for c in self.courses if c not in target]:
+            self.remove(code)
+        for code in sorted(target - self._course_set):
+            self.add(code)
+        return self.result
+
+
+def check_equivalence(raw_data_json, sessions=200, steps=25, seed=42):
+    """
+    Rastgele transkript + rastgele ekle/çıkar dizileriyle özellik testi:
+    her adımda session.result, audit_fens(major, session.courses, raw)
+    ile birebir aynı olmalıdır. sync() da aynı şekilde doğrulanır.
+    Oturumlar optimal ve greedy dağıtım arasında dönüşümlüdür.
+
+    Returns:
+        (sorunlar listesi, stats): Sorun yoksa liste boştur.
+    """
+    import random
+
+    rng = random.Random(seed)
+    majors = sorted(m for m in raw_data_json if m in FENS_RULES)
+    # Tüm bölümlerin havuzları: bir bölüm için diğerlerinin dersleri çoğunlukla nötrdür
+    universe = sorted(
+        {c['code'] for m in raw_data_json.values() for lst in m.get("requirements", {}).values() for c in lst}
+        | {"HUM 201", "HUM 312", "ECON 201", "PSY 201"}
+    )
+    problems = []
+    stats = {"incremental": 0, "full": 0}
+
+    for i in range(sessions):
+        major = rng.choice(majors)
+        allocation = ("optimal", "greedy")[i % 2]
+        courses = rng.sample(universe, rng.randint(0, 45))
+        session = AuditSession(major, raw_data_json, courses, allocation)
+        for step in range(steps):
+            if session.courses and rng.random() < 0.4:
+                code = rng.choice(session.courses)
+                session.remove(code)
+                op = f"remove {code}"
+            else:
+                code = rng.choice(universe)
+                session.add(code)
+                op = f"add {code}"
+            if session.result != audit_fens(major, session.courses, raw_data_json, allocation):
+                problems.append(f"oturum {i} ({major}, {allocation}), adım {step}: {op}")
+                break
+        else:
+            target = rng.sample(universe, rng.randint(0, 45))
+            session.sync(target)
+            if session.course_set != set(target) or session.result != audit_fens(major, target, raw_data_json, allocation):
+                problems.append(f"oturum {i} ({major}, {allocation}): sync")
+        for k in stats:
+            stats[k] += session.stats[k]
+    return problems, stats
+
+
+if __name__ == "__main__":
+    import json
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Artımlı denetim oturumu (AuditSession).")
+    parser.add_argument("--check", action="store_true", help="Rastgele ekle/çıkar dizileri audit_fens ile aynı mı?")
+    parser.add_argument("--sessions", type=int, default=200, help="Rastgele oturum sayısı")
+    parser.add_argument("--steps", type=int, default=25, help="Oturum başına ekle/çıkar adımı")
+    parser.add_argument("--seed", type=int, default=42)
+    args = parser.parse_args()
+
+    base_dir = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    with open(os.path.join(base_dir, 'data', 'json', 'fens_data_raw.json'), 'r', encoding='utf-8') as f:
+        raw = json.load(f)
+
+    if not args.check:
+        parser.print_help()
+        sys.exit(0)
+
+    problems, stats = check_equivalence(raw, args.sessions, args.steps, args.seed)
+    total = stats["incremental"] + stats["full"]
+    print(f"🔁 {args.sessions} oturum x {args.steps} adım | dağıtım yeniden kullanıldı: {stats['incremental']} "
+          f"/ dağıtım koşturuldu: {stats['full']} ({stats['incremental'] / max(total, 1):.0%} artımlı)")
+    for p in problems:
+        print(f"❌ {p}")
+    if problems:
+        sys.exit(1)
+    print("✅ AuditSession her adımda audit_fens ile aynı.")
@@ -0,0 +1,160 @@
+"""
+=============================================================================
+PROJE: SABANCI UNIVERSITY SMART ADVISOR
+DOSYA: src/audit_types.py
+TANIM: Yapılandırılmış Denetim Sonuç Tipleri.
+       run_fens_audit'in iç içe sözlük + etiketli string listeleri
+       ("HUM 202 (HUM)", "MATH 201 (Math)") yerine, ders kodlarını ve
+       etiketleri ayrı tutan sabit (NamedTuple, __slots__ = ()) tipler.
+       Kredi hesabı ve çift sayım gibi adımlar string'leri tekrar
+       ayrıştırmaz; eski sözlük formatı gerektiğinde to_dict() ile üretilir.
+
+       Okuma uyumluluğu: result["Core"]["credits"] gibi sözlük erişimi de
+       çalışır; böylece remaining_credits / count_unmet / generate_roadmap
+       hem eski sözlük raporlarıyla hem de bu tiplerle kullanılabilir.
+
+YOL HARİTASI (ROADMAP):
+1. CATEGORY ............... Kategori enum'u
+2. RESULT TYPES ........... CategoryResult, FacultyResult, AuditResult
+3. SERIALIZATION .......... Eski sözlük formatı ve kompakt JSON
+=============================================================================
+"""
+
+import json
+from enum import Enum
+from typing import NamedTuple
+
+# =============================================================================
+# 1. CATEGORY (KATEGORİLER)
+# =============================================================================
+
+class Category(str, Enum):
+    UNIVERSITY = "University"
+    REQUIRED = "Required"
+    CORE = "Core"
+    AREA = "Area"
+    FREE = "Free"
+
+CATEGORY_NAMES = tuple(cat.value for cat in Category)
+_CATEGORY_INDEX = {name: i for i, name in enumerate(CATEGORY_NAMES)}
+
+# =============================================================================
+# 2. RESULT TYPES (SONUÇ TİPLERİ)
+# =============================================================================
+# NamedTuple: değiştirilemez, örnek başına __dict__ yok ve tek tuple.__new__
+# ile kurulur (frozen dataclass'ın alan başına object.__setattr__ maliyeti
+# yok). String anahtarla erişim eski sözlük okuyucuları içindir; sayı ile
+# erişim normal tuple davranışıdır.
+
+def _field_lookup(self, key):
+    if isinstance(key, str):
+        try: return getattr(self, key)
+        except AttributeError: raise KeyError(key) from None
+    return tuple.__getitem__(self, key)
+
+def _field_get(self, key, default=None):
+    return getattr(self, key, default)
+
+def _field_contains(self, key):
+    return key in self._fields
+
+class CategoryResult(NamedTuple):
+    """
+    Tek kategori sonucu.
+    taken: Ders kodları (şelale sırası). tags: Boş () ise hiçbir ders
+    etiketli değildir; değilse taken ile aynı uzunluktadır ve etiketsiz
+    dersler için "" içerir (örn. University'de HUM slotu için "HUM").
+    """
+    category: Category
+    taken: tuple
+    credits: float
+    target: float
+    tags: tuple = ()
+    missing: tuple = ()
+    note: str = ""
+    status: str = ""
+
+    __getitem__ = _field_lookup
+    __contains__ = _field_contains
+    get = _field_get
+
+    def labels(self):
+        """Eski formattaki etiketli ders listesi ("HUM 202 (HUM)")."""
+        if not self.tags: return list(self.taken)
+        return [f"{c} ({t})" if t else c for c, t in zip(self.taken, self.tags)]
+
+class FacultyResult(NamedTuple):
+    status: str
+    message: str
+    detail: str
+
+    __getitem__ = _field_lookup
+    __contains__ = _field_contains
+    get = _field_get
+
+class AuditResult(NamedTuple):
+    """
+    Tam denetim sonucu. result["Core"] -> CategoryResult,
+    result["FacultyCheck"] -> FacultyResult, result["Roadmap"] -> tuple.
+    Bilinmeyen bölümde sadece error dolu olur.
+    """
+    major: str
+    categories: tuple = ()
+    faculty: FacultyResult = None
+    roadmap: tuple = ()
+    error: str = ""
+
+    def __getitem__(self, key):
+        if not isinstance(key, str): return tuple.__getitem__(self, key)
+        idx = _CATEGORY_INDEX.get(key)
+        if idx is not None and self.categories: return self.categories[idx]
+        if key == "FacultyCheck" and self.faculty is not None: return self.faculty
+        if key == "Roadmap" and not self.error: return self.roadmap
+        if key == "Error" and self.error: return self.error
+        raise KeyError(key)
+
+    def __contains__(self, key):
+        try: self[key]
+        except KeyError: return False
+        return True
+
+    def get(self, key, default=None):
+        try: return self[key]
+        except KeyError: return default
+
+    # --- 3. SERIALIZATION (SERİLEŞTİRME) ---
+
+    def to_dict(self):
+        """run_fens_audit'in eski sözlük formatı (etiketli string listeleri, alan sırası korunur)."""
+        if self.error: return {"Error": self.error}
+        uni, req, core, area, free = self.categories
+        report = {
+            "University": {"taken": uni.labels(), "missing": list(uni.missing), "credits": uni.credits, "target": uni.target},
+            "Required": {"taken": req.labels(), "missing": list(req.missing), "credits": req.credits, "target": req.target},
+            "Core": {"taken": list(core.taken), "credits": core.credits, "target": core.target, "note": core.note, "status": core.status},
+            "Area": {"taken": list(area.taken), "credits": area.credits, "target": area.target, "note": area.note},
+            "Free": {"taken": list(free.taken), "credits": free.credits, "target": free.target},
+        }
+        if self.faculty is not None:
+            report["FacultyCheck"] = self.faculty._asdict()
+        report["Roadmap"] = list(self.roadmap)
+        return report
+
+    def to_json_dict(self):
+        """Kompakt JSON yapısı: kodlar ve etiketler ayrı, boş alanlar atlanır."""
+        if self.error: return {"major": self.major, "error": self.error}
+        cats = {}
+        for name, r in zip(CATEGORY_NAMES, self.categories):
+            entry = {"taken": r.taken, "credits": r.credits, "target": r.target}
+            if r.tags: entry["tags"] = {c: t for c, t in zip(r.taken, r.tags) if t}
+            if r.missing: entry["missing"] = r.missing
+            if r.note: entry["note"] = r.note
+            if r.status: entry["status"] = r.status
+            cats[name] = entry
+        out = {"major": self.major, "categories": cats, "roadmap": self.roadmap}
+        if self.faculty is not None:
+            out["faculty"] = self.faculty._asdict()
+        return out
+
+    def to_json(self):
+        return json.dumps(self.to_json_dict(), ensure_ascii=False, separators=(",", ":"))
@@ -0,0 +1,241 @@
+"""
+=============================================================================
+PROJE: SABANCI UNIVERSITY SMART ADVISOR
+DOSYA: src/batch_audit.py
+TANIM: Toplu (Cohort) Mezuniyet Denetimi.
+       Transkript dosyasını (CSV/JSONL) satır satır okur, denetimleri bir
+       işlem havuzuna (process pool) dağıtır ve sonuçları JSONL/CSV olarak
+       akış halinde (streaming) yazar. Bellek kullanımı, havuzda aynı anda
+       bekleyen iş sayısı ile sınırlıdır; dosyanın boyutundan bağımsızdır.
+
+YOL HARİTASI (ROADMAP):
+1. INPUT .................. CSV/JSONL transkript okuyucuları
+2. WORKER ................. Havuz başlatıcı ve paket (chunk) denetim görevi
+3. OUTPUT ................. JSONL/CSV akış yazıcıları
+4. RUNNER ................. Sınırlı bellekli dağıtım döngüsü ve istatistik
+5. MAIN EXECUTION ......... Komut satırı arayüzü
+=============================================================================
+"""
+
+import os
+import sys
+import csv
+import json
+import time
+import argparse
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from itertools import islice
+
+# Path ayarı (src modüllerini bulabilmesi için)
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+try:
+    from audit_engine import audit_fens
+    from audit_types import Category
+except ImportError:
+    from src.audit_engine import audit_fens
+    from src.audit_types import Category
+
+# --- AYARLAR ---
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+JSON_PATH = os.path.join(BASE_DIR, 'data', 'json', 'fens_data_raw.json')
+
+CHUNK_SIZE = 64          # Bir görevde (task) denetlenen öğrenci sayısı
+IN_FLIGHT_PER_WORKER = 4 # İşçi başına havuzda bekleyebilecek paket sayısı
+
+# =============================================================================
+# 1. INPUT (TRANSKRİPT OKUYUCULARI)
+# =============================================================================
+
+def split_courses(raw):
+    """'CS 201; MATH 201' veya liste halindeki dersleri temiz listeye çevirir."""
+    if isinstance(raw, (list, tuple)):
+        items = raw
+    else:
+        items = str(raw or "").replace("|", ";").split(";")
+    return [" ".join(str(c).upper().split()) for c in items if str(c).strip()]
+
+def iter_transcripts(input_path):
+    """
+    Transkript dosyasını satır satır okur (dosya belleğe alınmaz).
+    CSV: student,major,courses (dersler ';' ile ayrılır)
+    JSONL: {"student": ..., "major": ..., "courses": [...]}
+    Okunamayan satırlar 'error' alanı ile döner, runner bunları hata sayar.
+    """
+    is_jsonl = input_path.lower().endswith((".jsonl", ".ndjson"))
+    with open(input_path, "r", encoding="utf-8-sig", newline="") as f:
+        if is_jsonl:
+            for line_no, line in enumerate(f, 1):
+                if not line.strip(): continue
+                try:
+                    rec = json.loads(line)
+                    yield {
+                        "student": str(rec.get("student", line_no)),
+                        "major": str(rec.get("major", "")).upper(),
+                        "courses": split_courses(rec.get("courses", []))
+                    }
+                except (ValueError, AttributeError) as e:
+                    yield {"student": str(line_no), "major": "", "courses": [], "error": f"Satır okunamadı: {e}"}
+        else:
+            for line_no, row in enumerate(csv.DictReader(f), 2):
+                yield {
+                    "student": str(row.get("student") or line_no),
+                    "major": str(row.get("major") or "").strip().upper(),
+                    "courses": split_courses(row.get("courses"))
+                }
+
+# =============================================================================
+# 2. WORKER (HAVUZ İŞÇİLERİ)
+# =============================================================================
+
+# Her işçi süreçte bir kez yüklenir; tüm denetimler aynı veriyi paylaşır.
+_RAW_DATA = None
+
+def _init_worker(json_path):
+    """Havuz başlatıcı: Müfredat JSON'unu işçi başına tek sefer yükler."""
+    global _RAW_DATA
+    with open(json_path, "r", encoding="utf-8") as f:
+        _RAW_DATA = json.load(f)
+
+def summarize_report(record, result):
+    """AuditResult'ı, dosyaya yazılacak düz (flat) özet kayda çevirir."""
+    summary = {"student": record["student"], "major": record["major"]}
+    if result.error:
+        summary.update({"status": "ERROR", "error": result.error})
+        return summary
+
+    summary["status"] = "OK"
+    remaining = 0.0
+    for cat in result.categories:
+        key = cat.category.value.lower()
+        summary[f"{key}_credits"] = cat.credits
+        summary[f"{key}_target"] = cat.target
+        remaining += max(0, cat.target - cat.credits)
+
+    summary.update({
+        "remaining_credits": remaining,
+        "missing_required": list(result["Required"].missing),
+        "missing_university": list(result["University"].missing),
+        "faculty_check": result.faculty.status if result.faculty else "",
+        "roadmap": list(result.roadmap)
+    })
+    return summary
+
+def audit_chunk(records, allocation="optimal"):
+    """Bir paket transkripti denetler. Tekil hata tüm paketi düşürmez."""
+    results = []
+    for rec in records:
+        if "error" in rec:
+            results.append({"student": rec["student"], "major": rec["major"], "status": "ERROR", "error": rec["error"]})
+            continue
+        try:
+            result = audit_fens(rec["major"], rec["courses"], _RAW_DATA, allocation)
+            results.append(summarize_report(rec, result))
+        except Exception as e:
+            results.append({"student": rec["student"], "major": rec["major"], "status": "ERROR", "error": f"{type(e).__name__}: {e}"})
+    return results
+
+# =============================================================================
+# 3. OUTPUT (AKIŞ YAZICILARI)
+# =============================================================================
+
+CSV_FIELDS = (
+    ["student", "major", "status", "remaining_credits"]
+    + [f"{cat.value.lower()}_{k}" for cat in Category for k in ("credits", "target")]
+    + ["missing_required", "missing_university", "faculty_check", "error"]
+)
+
+class JsonlWriter:
+    def __init__(self, f):
+        self.f = f
+
+    def write(self, row):
+        self.f.write(json.dumps(row, ensure_ascii=False) + "\n")
+
+class CsvWriter:
+    def __init__(self, f):
+        self.writer = csv.DictWriter(f, fieldnames=CSV_FIELDS, extrasaction="ignore")
+        self.writer.writeheader()
+
+    def write(self, row):
+        flat = dict(row)
+        for key in ("missing_required", "missing_university"):
+            if isinstance(flat.get(key), list):
+                flat[key] = "; ".join(flat[key])
+        self.writer.writerow(flat)
+
+# =============================================================================
+# 4. RUNNER (DAĞITIM DÖNGÜSÜ)
+# =============================================================================
+
+def _chunked(iterable, size):
+    it = iter(iterable)
+    while True:
+        chunk = list(islice(it, size))
+        if not chunk: return
+        yield chunk
+
+def run_batch(input_path, output_path, workers=None, json_path=JSON_PATH, chunk_size=CHUNK_SIZE, allocation="optimal"):
+    """
+    Tüm transkriptleri denetler ve sonuçları giriş sırasıyla yazar.
+    Havuzda en fazla (workers * IN_FLIGHT_PER_WORKER) paket bekler; böylece
+    on binlerce öğrencilik dosyalarda da bellek sabit kalır.
+
+    Returns:
+        dict: total / ok / failed / elapsed_sec / per_sec istatistikleri.
+    """
+    workers = workers or os.cpu_count() or 1
+    stats = {"total": 0, "ok": 0, "failed": 0}
+    start = time.perf_counter()
+
+    def consume(rows, writer):
+        for row in rows:
+            writer.write(row)
+            stats["total"] += 1
+            if row["status"] == "OK": stats["ok"] += 1
+            else: stats["failed"] += 1
+
+    with open(output_path, "w", encoding="utf-8", newline="") as out:
+        writer = CsvWriter(out) if output_path.lower().endswith(".csv") else JsonlWriter(out)
+        chunks = _chunked(iter_transcripts(input_path), chunk_size)
+
+        if workers == 1:
+            # Tek işçi: Havuz maliyeti olmadan aynı süreçte çalış
+            _init_worker(json_path)
+            for chunk in chunks:
+                consume(audit_chunk(chunk, allocation), writer)
+        else:
+            max_in_flight = workers * IN_FLIGHT_PER_WORKER
+            with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker, initargs=(json_path,)) as pool:
+                pending = deque()
+                for chunk in chunks:
+                    pending.append(pool.submit(audit_chunk, chunk, allocation))
+                    if len(pending) >= max_in_flight:
+                        consume(pending.popleft().result(), writer)
+                while pending:
+                    consume(pending.popleft().result(), writer)
+
+    elapsed = time.perf_counter() - start
+    stats["elapsed_sec"] = round(elapsed, 3)
+    stats["per_sec"] = round(stats["total"] / elapsed, 1) if elapsed > 0 else 0.0
+    return stats
+
+# =============================================================================
+# 5. MAIN EXECUTION (KOMUT SATIRI)
+# =============================================================================
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="FENS toplu mezuniyet denetimi")
+    parser.add_argument("input", help="Transkript dosyası (.csv veya .jsonl)")
+    parser.add_argument("output", help="Sonuç dosyası (.jsonl veya .csv)")
+    parser.add_argument("--workers", type=int, default=None, help="İşçi süreç sayısı (varsayılan: CPU sayısı)")
+    parser.add_argument("--chunk-size", type=int, default=CHUNK_SIZE, help="Görev başına öğrenci sayısı")
+    parser.add_argument("--rules-json", default=JSON_PATH, help="Müfredat JSON dosyası")
+    parser.add_argument("--allocation", choices=["optimal", "greedy"], default="optimal", help="Seçmeli dağıtım motoru")
+    args = parser.parse_args()
+
+    print(f"🏭 Toplu Denetim Başlıyor: {args.input}")
+    result = run_batch(args.input, args.output, args.workers, args.rules_json, args.chunk_size, args.allocation)
+    print(f"✅ Tamamlandı: {result['total']} öğrenci | OK: {result['ok']} | Hatalı: {result['failed']}")
+    print(f"⏱️ Süre: {result['elapsed_sec']} sn | Hız: {result['per_sec']} öğrenci/sn")
+    print(f"💾 Çıktı: {args.output}")
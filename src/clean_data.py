@@ -1,6 +1,8 @@
 import pandas as pd
 import os
 import re
+import time
+from concurrent.futures import ProcessPoolExecutor
 
 # ---------------------------------------------------------
 # 1. AYARLAR VE DOSYA YOLLARI
@@ -10,56 +12,96 @@ RAW_CSV_PATH = os.path.join(BASE_DIR, 'data', 'csv', 'course_full_data_v2.csv')
 LINKS_CSV_PATH = os.path.join(BASE_DIR, 'data', 'csv', 'course_links_master.csv')    # Güvenilir dönem verisi
 OUTPUT_PATH = os.path.join(BASE_DIR, 'data', 'csv', 'course_data_clean.csv')         # ÇIKTI (Temiz)
 
+# Temizlenecek sütunlar
+TEXT_COLS = ['Description', 'Restrictions', 'Prerequisites', 'Corequisites']
+
+# Paralel temizlik: dosya CHUNK_SIZE satırlık parçalar halinde işçilere dağıtılır
+CHUNK_SIZE = 1000
+WORKERS = os.cpu_count() or 1
+
+# ---------------------------------------------------------
+# DESENLER (BİR KEZ DERLENİR)
+# ---------------------------------------------------------
+# Üst çöp: "...find available classes for the course." cümlesinin SON geçtiği
+# yere kadar her şey. Eski r".*?...\s*" deseni her başlangıç pozisyonundan
+# metin sonuna kadar tarıyordu (cümle yoksa karesel); rpartition tek geçiştir.
+# Cümleden sonraki boşluklar 3. adımda zaten silinir.
+GARBAGE_START_MARKER = "find available classes for the course."
+# Alt çöp: "Must be enrolled...", "Return to Previous", "Release: 8.x" gibi teknik yazılar.
+GARBAGE_END_RE = re.compile(r"(Must be enrolled in one of the following Levels:|Return to Previous|Skip to top of page|Release: \d+\.\d+).*", re.DOTALL)
+LEVEL_RE = re.compile(r"(\d+)")
+
 def clean_html_garbage(text):
     """
     HTML'den kalan 'Detailed Course Information', 'Return to Previous' gibi
-    çöp metinleri temizler.
+    çöp metinleri temizler (tek hücre; toplu iş için clean_text_series).
     """
     if pd.isna(text) or text == "":
         return ""
     
-    text = str(text)
-    
-    # 1. Üst Kısımdaki Çöpü Temizle
-    # Genelde "...find available classes for the course." cümlesinden sonra asıl metin başlar.
-    garbage_start_pattern = r".*?find available classes for the course\.\s*"
-    text = re.sub(garbage_start_pattern, "", text, flags=re.DOTALL)
-    
+    text = str(text).rpartition(GARBAGE_START_MARKER)[2]
+    text = GARBAGE_END_RE.sub("", text)
+    return " ".join(text.split())
+
+def clean_text_series(series):
+    """clean_html_garbage'ın vektörel karşılığı (pandas .str işlemleri)."""
+    text = series.where(series.notna(), "").astype(str)
+    # 1. Üst Kısımdaki Çöpü Temizle (bulunamazsa rpartition metnin tamamını döndürür)
+    text = text.str.rpartition(GARBAGE_START_MARKER)[2]
     # 2. Alt Kısımdaki Çöpü Temizle
-    # "Must be enrolled...", "Return to Previous", "Release: 8.x" gibi teknik yazılar.
-    garbage_end_pattern = r"(Must be enrolled in one of the following Levels:|Return to Previous|Skip to top of page|Release: \d+\.\d+).*"
-    text = re.sub(garbage_end_pattern, "", text, flags=re.DOTALL)
-    
-    # 3. HTML Entity ve Fazla Boşluk Temizliği
-    text = text.replace('\n', ' ').replace('\r', ' ').replace('\t', ' ')
-    text = re.sub(r'\s+', ' ', text).strip()
-    
-    return text
+    text = text.str.replace(GARBAGE_END_RE, "", regex=True)
+    # 3. HTML Entity ve Fazla Boşluk Temizliği: split() tüm boşluk dizilerini (\n, \r, \t dahil)
+    # ayırır ve baş/sondakileri atar; tek " " ile birleştirmek r'\s+' -> ' ' + strip() ile aynıdır
+    return text.str.split().str.join(" ")
 
-def main():
+def clean_chunk(chunk):
+    """İşçi görevi: Bir parçanın metin sütunlarını temizler."""
+    for col in TEXT_COLS:
+        if col in chunk.columns:
+            chunk[col] = clean_text_series(chunk[col])
+    return chunk
+
+def extract_levels(codes):
+    """Ders kodundaki ilk sayı (Örn: 'CS 201' -> 201), yoksa 0."""
+    return codes.astype(str).str.extract(LEVEL_RE, expand=False).fillna(0).astype(int)
+
+def clean_chunks(raw_path, workers=None, chunk_size=CHUNK_SIZE):
+    """
+    Ham CSV'yi parça parça okur ve parçaları işlem havuzunda temizler.
+    Okuma ile temizlik üst üste biner; sonuç giriş sırasıyla birleştirilir.
+    """
+    workers = workers or WORKERS
+    reader = pd.read_csv(raw_path, chunksize=chunk_size, dtype=str)
+    if workers <= 1:
+        parts = [clean_chunk(chunk) for chunk in reader]
+    else:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            parts = list(pool.map(clean_chunk, reader))
+    if not parts:
+        return pd.read_csv(raw_path, dtype=str)
+    return pd.concat(parts, ignore_index=True)
+
+def main(raw_path=None, links_path=None, output_path=None, workers=None, chunk_size=CHUNK_SIZE):
+    raw_path = raw_path or RAW_CSV_PATH
+    links_path = links_path or LINKS_CSV_PATH
+    output_path = output_path or OUTPUT_PATH
     print("🧹 Veri Temizleme İşlemi Başlıyor...")
     
     # -----------------------------------------------------
     # 2. DOSYALARI YÜKLE
     # -----------------------------------------------------
-    if not os.path.exists(RAW_CSV_PATH):
-        print(f"HATA: {RAW_CSV_PATH} bulunamadı!")
+    if not os.path.exists(raw_path):
+        print(f"HATA: {raw_path} bulunamadı!")
         return
 
-    df = pd.read_csv(RAW_CSV_PATH)
-    print(f"📥 Ham veri yüklendi: {len(df)} satır")
-
     # -----------------------------------------------------
     # 3. METİN TEMİZLİĞİ (TEXT CLEANING)
     # -----------------------------------------------------
-    print("🧼 Metin sütunları (Description, Restrictions vb.) temizleniyor...")
-    
-    # Temizlenecek sütunlar
-    text_cols = ['Description', 'Restrictions', 'Prerequisites', 'Corequisites']
-    
-    for col in text_cols:
-        if col in df.columns:
-            df[col] = df[col].apply(clean_html_garbage)
+    print("🧼 Metin sütunları (Description, Restrictions vb.) parça parça temizleniyor...")
+    t0 = time.perf_counter()
+    df = clean_chunks(raw_path, workers, chunk_size)
+    elapsed = time.perf_counter() - t0
+    print(f"📥 Ham veri yüklendi ve temizlendi: {len(df)} satır, {elapsed:.2f} s ({len(df) / max(elapsed, 1e-9):,.0f} satır/s)")
 
     # -----------------------------------------------------
     # 4. 'TERM' VERİSİNİ DÜZELTME (DATA MERGING)
@@ -71,8 +113,8 @@ def main():
         df = df.drop(columns=['Term'])
     
     # Link dosyasını yükle
-    if os.path.exists(LINKS_CSV_PATH):
-        links_df = pd.read_csv(LINKS_CSV_PATH)
+    if os.path.exists(links_path):
+        links_df = pd.read_csv(links_path)
         
         # Sütun isimlerini standartlaştır (Büyük Harf)
         links_df.columns = [c.strip().upper() for c in links_df.columns]
@@ -108,17 +150,9 @@ def main():
     # -----------------------------------------------------
     # 5. EKSTRA ÖZELLİK ÇIKARIMI (FEATURE EXTRACTION)
     # -----------------------------------------------------
-    print("u2699 Seviye (Level) bilgisi çıkarılıyor...")
+    print("⚙️ Seviye (Level) bilgisi çıkarılıyor...")
     
-    def extract_level(code):
-        import re
-        try:
-            match = re.search(r"(\d+)", str(code))
-            return int(match.group(1)) if match else 0
-        except:
-            return 0
-
-    df['Level'] = df['Course Code'].apply(extract_level)
+    df['Level'] = extract_levels(df['Course Code'])
 
     # -----------------------------------------------------
     # 6. KAYDET
@@ -129,10 +163,15 @@ def main():
     
     df = df[final_cols]
     
-    df.to_csv(OUTPUT_PATH, index=False, encoding='utf-8-sig')
-    print(f"\n✅ BAŞARILI! Temizlenmiş dosya kaydedildi: {OUTPUT_PATH}")
+    df.to_csv(output_path, index=False, encoding='utf-8-sig')
+    print(f"\n✅ BAŞARILI! Temizlenmiş dosya kaydedildi: {output_path}")
     print(f"📊 Toplam Ders Sayısı: {len(df)}")
     print("-" * 50)
 
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    import argparse
+    parser = argparse.ArgumentParser(description="Ham ders verisini temizler")
+    parser.add_argument("--workers", type=int, default=None, help="İşlem sayısı (1 = sıralı, varsayılan: CPU sayısı)")
+    parser.add_argument("--chunk-size", type=int, default=CHUNK_SIZE, help="Parça başına satır sayısı")
+    args = parser.parse_args()
+    main(workers=args.workers, chunk_size=args.chunk_size)
\ No newline at end of file
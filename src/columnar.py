@@ -0,0 +1,323 @@
+"""
+=============================================================================
+PROJE: SABANCI UNIVERSITY SMART ADVISOR
+DOSYA: src/columnar.py
+TANIM: Kolon Bazlı (Parquet/Arrow) Veri Katmanı.
+       ETL'in ürettiği CSV'lerin yanına tipli Parquet kopyaları yazar ve
+       uygulama yükleyicilerine sadece istedikleri kolonları okutur.
+
+       Tipler: Tekrarlayan kısa metinler (Term, Course Code, Instructor,
+       Location...) category, CRN ve Level tam sayı, "9:40 am - 11:30 am"
+       saatleri Start_Min / End_Min (gece yarısından dakika) olarak
+       ayrıştırılır. Uzun metinler (Description) varsayılan kolon
+       kümesinde yoktur; sadece gereken yerde (recommender) okunur.
+
+       Her Parquet dosyası kaynak CSV'nin boyut + SHA-256 kaydını metadata
+       olarak taşır. pyarrow yoksa veya CSV sonradan değiştiyse (parse_*
+       elle çalıştırıldı) aynı şema ile CSV'den okunur (usecols + dtype);
+       uygulama her iki durumda da aynı tipli DataFrame'i alır.
+
+       Kullanım:
+           python src/columnar.py            # Mevcut CSV'lerden Parquet üret
+           python src/columnar.py --bench    # CSV vs Parquet soğuk yükleme
+
+YOL HARİTASI (ROADMAP):
+1. SCHEMAS ................ Tablo şemaları ve varsayılan kolon kümeleri
+2. TYPING ................. CSV DataFrame'ini şemaya çevirme (saat ayrıştırma)
+3. WRITE .................. Parquet yazımı (ETL adımları için)
+4. READ ................... Kolon seçmeli okuma (Parquet, yoksa CSV)
+5. BENCHMARK .............. Soğuk yükleme süresi ve bellek karşılaştırması
+=============================================================================
+"""
+
+import os
+import re
+import json
+import hashlib
+
+import numpy as np
+import pandas as pd
+
+# pyarrow opsiyonel: yoksa tipli CSV okumaya düşülür
+try:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+    HAS_PARQUET = True
+except ImportError:
+    HAS_PARQUET = False
+
+# --- AYARLAR ---
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+CSV_DIR = os.path.join(BASE_DIR, 'data', 'csv')
+SCHEDULE_CSV = os.path.join(CSV_DIR, 'active_schedule_master.csv')
+CATALOG_CSV = os.path.join(CSV_DIR, 'course_data_clean.csv')
+
+# =============================================================================
+# 1. SCHEMAS (ŞEMALAR)
+# =============================================================================
+# Kolon -> pandas dtype. "str" pandas 3'te string dtype'ı, eski sürümlerde object'tir.
+
+SCHEDULE_SCHEMA = {
+    "Term": "category",
+    "Course Code": "category",
+    "Section": "category",
+    "CRN": "int32",
+    "Course Name": "category",
+    "Time": "category",
+    "Days": "category",
+    "Location": "category",
+    "Instructor": "category",
+    "Start_Min": "Int16",   # Türetilmiş: Time başlangıcı (dakika), saatsiz derste <NA>
+    "End_Min": "Int16",
+}
+SCHEDULE_DERIVED = ("Start_Min", "End_Min")
+
+CATALOG_SCHEMA = {
+    "Course Code": "str",
+    "Course Name": "str",
+    "Level": "int32",   # Ders numarası (5 haneli kodlar var: BIO 58002)
+    "Term": "category",
+    "Description": "str",
+    "Prerequisites": "str",
+    "Restrictions": "str",
+    "Corequisites": "str",
+}
+
+# Uzun metin kolonları: varsayılan okumada atlanır (3 MB'lık katalogun ~%85'i Description)
+CATALOG_TEXT_COLUMNS = ("Description",)
+CATALOG_DEFAULT_COLUMNS = tuple(c for c in CATALOG_SCHEMA if c not in CATALOG_TEXT_COLUMNS)
+
+SOURCE_META_KEY = b"smart_advisor.source"
+
+TIME_RE = r"(\d{1,2}):(\d{2})\s*([ap]m)\s*-\s*(\d{1,2}):(\d{2})\s*([ap]m)"
+
+def parquet_path(csv_path):
+    return os.path.splitext(csv_path)[0] + ".parquet"
+
+# =============================================================================
+# 2. TYPING (TİPLEME)
+# =============================================================================
+
+def _to_minutes(hour, minute, ampm):
+    hour = hour.astype(int) % 12 + np.where(ampm.str.lower() == "pm", 12, 0)
+    return hour * 60 + minute.astype(int)
+
+def parse_time_ranges(times):
+    """
+    "9:40 am - 11:30 am" -> (580, 690). Ayrıştırılamayan/boş saatler <NA>.
+    Benzersiz saat sayısı azdır (~55); ayrıştırma kategoriler üzerinde yapılır.
+    """
+    times = times.astype("category")
+    cats = pd.Series(times.cat.categories.astype(str))
+    parts = cats.str.extract(TIME_RE, flags=re.IGNORECASE)
+    ok = parts.notna().all(axis=1)
+    start = pd.Series(pd.NA, index=cats.index, dtype="Int16")
+    end = pd.Series(pd.NA, index=cats.index, dtype="Int16")
+    if ok.any():
+        p = parts[ok]
+        start[ok] = _to_minutes(p[0], p[1], p[2]).astype("int16")
+        end[ok] = _to_minutes(p[3], p[4], p[5]).astype("int16")
+    codes = times.cat.codes.to_numpy()
+    valid = codes >= 0
+    out_start = pd.array([pd.NA] * len(codes), dtype="Int16")
+    out_end = pd.array([pd.NA] * len(codes), dtype="Int16")
+    out_start[valid] = start.to_numpy()[codes[valid]]
+    out_end[valid] = end.to_numpy()[codes[valid]]
+    return pd.Series(out_start, index=times.index), pd.Series(out_end, index=times.index)
+
+def apply_schema(df, schema):
+    """Ham (CSV) DataFrame'i şemadaki tiplere çevirir; türetilmiş kolonları ekler."""
+    df = df.copy()
+    df.columns = [c.strip() for c in df.columns]
+    if "Start_Min" in schema and "Time" in df.columns:
+        df["Start_Min"], df["End_Min"] = parse_time_ranges(df["Time"])
+    for col, dtype in schema.items():
+        if col in df.columns:
+            df[col] = df[col].astype(dtype)
+    return df[[c for c in schema if c in df.columns]]
+
+def map_categories(series, func):
+    """
+    Kategorik kolona fonksiyonu satır başına değil kategori başına uygular
+    (Örn: 3.7k satırda 482 hoca ismi). Eksik değerler de func'tan geçer.
+    """
+    if not isinstance(series.dtype, pd.CategoricalDtype):
+        return series.apply(func)
+    mapped = np.array([func(c) for c in series.cat.categories] + [func(np.nan)], dtype=object)
+    return pd.Series(mapped[series.cat.codes.to_numpy()], index=series.index, name=series.name).astype("category")
+
+# =============================================================================
+# 3. WRITE (YAZMA)
+# =============================================================================
+
+def source_fingerprint(csv_path):
+    """Kaynak CSV kaydı {size, sha256} (3 MB için birkaç ms)."""
+    with open(csv_path, "rb") as f:
+        data = f.read()
+    return {"size": len(data), "sha256": hashlib.sha256(data).hexdigest()}
+
+def write_table(csv_path, schema, out_path=None):
+    """CSV'yi şemaya göre tipleyip Parquet olarak yazar. Yazılan yol (pyarrow yoksa None)."""
+    if not HAS_PARQUET:
+        return None
+    out_path = out_path or parquet_path(csv_path)
+    df = apply_schema(pd.read_csv(csv_path, dtype=str, encoding="utf-8-sig"), schema)
+    table = pa.Table.from_pandas(df, preserve_index=False)
+    meta = dict(table.schema.metadata or {})
+    meta[SOURCE_META_KEY] = json.dumps(source_fingerprint(csv_path)).encode()
+    tmp = f"{out_path}.tmp"
+    pq.write_table(table.replace_schema_metadata(meta), tmp)
+    os.replace(tmp, out_path)
+    return out_path
+
+def write_schedule_table(csv_path=SCHEDULE_CSV, out_path=None):
+    return write_table(csv_path, SCHEDULE_SCHEMA, out_path)
+
+def write_catalog_table(csv_path=CATALOG_CSV, out_path=None):
+    return write_table(csv_path, CATALOG_SCHEMA, out_path)
+
+# =============================================================================
+# 4. READ (OKUMA)
+# =============================================================================
+
+def parquet_is_fresh(csv_path):
+    """
+    Parquet, diskteki CSV'den üretilmişse True. Sadece dosya metadata'sı okunur;
+    boyut farklıysa hash'e gerek kalmaz. CSV hiç yoksa Parquet tek kaynaktır.
+    """
+    path = parquet_path(csv_path)
+    if not HAS_PARQUET or not os.path.exists(path):
+        return False
+    if not os.path.exists(csv_path):
+        return True
+    try:
+        source = json.loads((pq.read_schema(path).metadata or {}).get(SOURCE_META_KEY, b"{}"))
+    except (OSError, ValueError, pa.ArrowException):
+        return False
+    if source.get("size") != os.path.getsize(csv_path):
+        return False
+    return source.get("sha256") == source_fingerprint(csv_path)["sha256"]
+
+def read_table(csv_path, schema, columns=None, source=None):
+    """
+    Tablonun sadece istenen kolonlarını tipli okur.
+    source: None (otomatik), "parquet" veya "csv".
+    """
+    columns = list(columns or schema)
+    unknown = [c for c in columns if c not in schema]
+    if unknown:
+        raise KeyError(f"Şemada olmayan kolon: {', '.join(unknown)}")
+    if source is None:
+        source = "parquet" if parquet_is_fresh(csv_path) else "csv"
+
+    if source == "parquet":
+        return pd.read_parquet(parquet_path(csv_path), columns=columns, engine="pyarrow")
+
+    # CSV: türetilmiş kolonlar için kaynak kolon (Time) da okunur, sonra atılır
+    wanted = set(columns)
+    if wanted & set(SCHEDULE_DERIVED) and "Time" in schema:
+        wanted.add("Time")
+    raw = pd.read_csv(
+        csv_path, encoding="utf-8-sig",
+        usecols=lambda c: c.strip() in wanted,
+        dtype={c: "str" for c in wanted if c not in SCHEDULE_DERIVED},
+    )
+    return apply_schema(raw, schema)[columns]
+
+def load_schedule(columns=None, csv_path=SCHEDULE_CSV, source=None):
+    return read_table(csv_path, SCHEDULE_SCHEMA, columns, source)
+
+def load_catalog(columns=CATALOG_DEFAULT_COLUMNS, csv_path=CATALOG_CSV, source=None):
+    return read_table(csv_path, CATALOG_SCHEMA, columns, source)
+
+def load_catalog_text(columns=CATALOG_TEXT_COLUMNS, csv_path=CATALOG_CSV, source=None):
+    """Tembel metin kolonları; index load_catalog ile aynı satır numaralarıdır."""
+    return read_table(csv_path, CATALOG_SCHEMA, columns, source)
+
+# =============================================================================
+# 5. BENCHMARK (KARŞILAŞTIRMA)
+# =============================================================================
+# Her varyant ayrı bir Python sürecinde ölçülür (soğuk başlangıç: modül ve
+# dosya önbellekleri sıfır, RSS sadece o yüklemeye ait).
+
+BENCH_VARIANTS = {
+    # app.py'nin eski yolu: tüm kolonlar, dtype yok
+    "csv-raw": lambda: (pd.read_csv(SCHEDULE_CSV), pd.read_csv(CATALOG_CSV)),
+    # Aynı şema, CSV'den
+    "csv-typed": lambda: (load_schedule(source="csv"), load_catalog(source="csv")),
+    # Uygulamanın yolu: tazelik kontrolü (CSV hash'i) + Parquet
+    "parquet": lambda: (load_schedule(), load_catalog()),
+}
+
+def _rss_kb():
+    """Anlık RSS (Linux /proc), yoksa tepe RSS."""
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE") // 1024
+    except (OSError, ValueError):
+        import resource
+        return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+
+def bench_one(variant):
+    import time
+    rss0 = _rss_kb()
+    t0 = time.perf_counter()
+    frames = BENCH_VARIANTS[variant]()
+    seconds = time.perf_counter() - t0
+    return {
+        "variant": variant,
+        "seconds": seconds,
+        "rss_mb": (_rss_kb() - rss0) / 1024,
+        "frame_mb": sum(df.memory_usage(deep=True).sum() for df in frames) / 1e6,
+    }
+
+def run_bench(repeats=3):
+    import sys
+    import subprocess
+    results = {}
+    for variant in BENCH_VARIANTS:
+        if variant == "parquet" and not (parquet_is_fresh(SCHEDULE_CSV) and parquet_is_fresh(CATALOG_CSV)):
+            print("⚠️ Parquet dosyaları yok/eski, önce: python src/columnar.py")
+            continue
+        runs = []
+        for _ in range(repeats):
+            out = subprocess.run([sys.executable, os.path.abspath(__file__), "--bench-one", variant],
+                                 capture_output=True, text=True, check=True)
+            runs.append(json.loads(out.stdout.strip().splitlines()[-1]))
+        results[variant] = min(runs, key=lambda r: r["seconds"])
+    return results
+
+# =============================================================================
+# MAIN EXECUTION (STANDALONE)
+# =============================================================================
+if __name__ == "__main__":
+    import sys
+    import argparse
+
+    parser = argparse.ArgumentParser(description="CSV -> tipli Parquet dönüşümü ve yükleme karşılaştırması.")
+    parser.add_argument("--bench", action="store_true", help="CSV vs Parquet soğuk yükleme süresi ve bellek")
+    parser.add_argument("--bench-one", choices=list(BENCH_VARIANTS), help=argparse.SUPPRESS)
+    parser.add_argument("--repeats", type=int, default=3)
+    args = parser.parse_args()
+
+    if args.bench_one:
+        print(json.dumps(bench_one(args.bench_one)))
+        sys.exit(0)
+
+    if args.bench:
+        results = run_bench(args.repeats)
+        print(f"\n📊 Soğuk yükleme (schedule + katalog, {args.repeats} süreçte en iyisi)")
+        print(f"   {'varyant':<10} {'süre':>9} {'RSS artışı':>11} {'DataFrame':>10}")
+        for r in results.values():
+            print(f"   {r['variant']:<10} {r['seconds'] * 1000:7.1f} ms {r['rss_mb']:8.1f} MB {r['frame_mb']:7.2f} MB")
+        sys.exit(0)
+
+    if not HAS_PARQUET:
+        print("❌ pyarrow kurulu değil (pip install pyarrow); uygulama CSV'den okumaya devam eder.")
+        sys.exit(1)
+    for csv_path, writer in ((SCHEDULE_CSV, write_schedule_table), (CATALOG_CSV, write_catalog_table)):
+        if not os.path.exists(csv_path):
+            print(f"⚠️ Atlandı, CSV yok: {csv_path}")
+            continue
+        out = writer(csv_path)
+        print(f"✅ {os.path.basename(out)}: {os.path.getsize(csv_path) / 1e6:.2f} MB CSV -> {os.path.getsize(out) / 1e6:.2f} MB Parquet")
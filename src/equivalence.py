@@ -0,0 +1,128 @@
+"""
+=============================================================================
+PROJE: SABANCI UNIVERSITY SMART ADVISOR
+DOSYA: src/equivalence.py
+TANIM: Ders Eşdeğerlik ve Çapraz Listeleme Çözücüsü.
+       major_rules.COURSE_EQUIVALENCES tablosundan yükleme anında bir kez
+       Union-Find (Disjoint Set) ile eşdeğerlik sınıfları kurulur ve
+       düz bir {kod: kanonik_kod} sözlüğüne indirgenir. Ön koşul kontrolü,
+       ön koşul grafiği ve denetim yardımcıları dersleri O(1) sözlük
+       erişimiyle kanonik temsilcisine çevirir.
+
+YOL HARİTASI (ROADMAP):
+1. UNION-FIND ............. Yol sıkıştırmalı, boyuta göre birleştirme
+2. INDEX .................. Kanonik eşleme ve sınıf üyeleri
+3. LOAD TIME .............. Tablonun yükleme anında derlenmesi
+=============================================================================
+"""
+
+import sys
+import os
+
+# Path ayarı (src modüllerini bulabilmesi için)
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+try:
+    from major_rules import COURSE_EQUIVALENCES
+except ImportError:
+    from src.major_rules import COURSE_EQUIVALENCES
+
+# =============================================================================
+# 1. UNION-FIND (AYRIK KÜMELER)
+# =============================================================================
+
+class UnionFind:
+    """Ders kodları üzerinde ayrık küme yapısı."""
+    __slots__ = ("parent", "size")
+
+    def __init__(self):
+        self.parent = {}
+        self.size = {}
+
+    def find(self, x):
+        parent = self.parent
+        if x not in parent:
+            parent[x] = x
+            self.size[x] = 1
+            return x
+        while parent[x] != x:
+            parent[x] = parent[parent[x]]  # Yol yarılama (path halving)
+            x = parent[x]
+        return x
+
+    def union(self, a, b):
+        ra, rb = self.find(a), self.find(b)
+        if ra == rb: return ra
+        if self.size[ra] < self.size[rb]: ra, rb = rb, ra
+        self.parent[rb] = ra
+        self.size[ra] += self.size[rb]
+        return ra
+
+# =============================================================================
+# 2. INDEX (KANONİK EŞLEME)
+# =============================================================================
+
+def _normalize(code):
+    return " ".join(str(code).upper().split())
+
+class EquivalenceIndex:
+    """
+    Derlenmiş eşdeğerlik indeksi. Tabloda olmayan dersler kendi kanonik kodudur.
+
+    Kullanım:
+        EQUIVALENCES.canonical("CS 210")        # "DSA 210"
+        EQUIVALENCES.members("DSA 210")         # ("CS 210", "DSA 210")
+        EQUIVALENCES.canonical_set(transcript)  # ön koşul kontrolü için
+    """
+    __slots__ = ("_canonical", "_members")
+
+    def __init__(self, groups):
+        uf = UnionFind()
+        first_seen = {}
+        for group in groups:
+            codes = [_normalize(c) for c in group if str(c).strip()]
+            for i, code in enumerate(codes):
+                first_seen.setdefault(code, len(first_seen))
+                uf.find(code)
+                if i: uf.union(codes[0], code)
+
+        classes = {}
+        for code in first_seen:
+            classes.setdefault(uf.find(code), []).append(code)
+
+        # Kanonik temsilci: sınıfta tabloya ilk yazılan ders (union sırasından bağımsız)
+        self._canonical = {}
+        self._members = {}
+        for members in classes.values():
+            if len(members) < 2: continue
+            members.sort(key=first_seen.__getitem__)
+            canon = members[0]
+            for code in members:
+                self._canonical[code] = canon
+            self._members[canon] = tuple(sorted(members))
+
+    def canonical(self, code):
+        return self._canonical.get(code, code)
+
+    def members(self, code):
+        """Dersin eşdeğerlik sınıfı (kendisi dahil, sıralı)."""
+        return self._members.get(self._canonical.get(code), (code,))
+
+    def same(self, a, b):
+        return self.canonical(a) == self.canonical(b)
+
+    def canonical_set(self, codes):
+        get = self._canonical.get
+        return {get(c, c) for c in codes}
+
+    def all_members(self):
+        """Herhangi bir eşdeğerlik sınıfına giren tüm dersler."""
+        return frozenset(self._canonical)
+
+# =============================================================================
+# 3. LOAD TIME (YÜKLEME ANINDA DERLEME)
+# =============================================================================
+
+EQUIVALENCES = EquivalenceIndex(COURSE_EQUIVALENCES)
+canonical_code = EQUIVALENCES.canonical
+canonical_set = EQUIVALENCES.canonical_set
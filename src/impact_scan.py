@@ -0,0 +1,209 @@
+"""
+=============================================================================
+PROJE: SABANCI UNIVERSITY SMART ADVISOR
+DOSYA: src/impact_scan.py
+TANIM: Marjinal Etki Taraması (Marginal Impact Scan).
+       "Hangi tek ders beni mezuniyete en çok yaklaştırır?" sorusunu, her
+       aday ders için ayrı run_fens_audit çağırmadan cevaplar.
+
+       Temel denetim bir kez çalıştırılır. Aday ders şelalede havuzun
+       sonundaymış gibi değerlendirilir; kategori kümeleri ve kalan
+       kapasiteler (req + 2 sınırı dahil) üzerinden tek bir Numpy geçişiyle
+       kazanılan kredi hesaplanır. Özel kurallara (Math paketi, CS/DSA
+       eşdeğerlikleri, alt kurallar, fakülte havuzları, HUM slotu) dokunan
+       az sayıdaki aday için tam denetim yapılır. Optimal (DP) dağıtımda
+       (varsayılan) Core/Area'ya girebilen her aday seçmelileri yeniden
+       dağıtabileceği için tam denetime gider; vektörize yol University,
+       Required ve sadece Free'ye düşen adaylar içindir. Greedy şelalede
+       dolu Core/Area'ya taşan aday ancak o havuzdaki derslerden sonra
+       sıralanıyorsa vektörize yoldan hesaplanır.
+
+YOL HARİTASI (ROADMAP):
+1. COMPILE ................ Bölüm bazlı kategori kümeleri ve kapasiteler
+2. SCAN ................... Vektörize marjinal etki hesabı
+3. RECOMMENDER BRIDGE ..... Sonucu öneri motorunun audit_data formatına çevirme
+=============================================================================
+"""
+
+import re
+import sys
+import os
+import numpy as np
+
+# Path ayarı (src modüllerini bulabilmesi için)
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+try:
+    from audit_engine import audit_fens, compile_program, collect_rule_courses, remaining_credits, count_unmet
+    from major_rules import FENS_RULES
+    from equivalence import EQUIVALENCES
+except ImportError:
+    from src.audit_engine import audit_fens, compile_program, collect_rule_courses, remaining_credits, count_unmet
+    from src.major_rules import FENS_RULES
+    from src.equivalence import EQUIVALENCES
+
+CATEGORIES = ["University", "Required", "Core", "Area", "Free"]
+# Landing kodları (Numpy dizilerinde kategori indeksi)
+UNI, REQ, CORE, AREA, FREE = range(5)
+
+# Eşdeğerlik sınıflarına giren dersler (CS 210 ≡ DSA 210 vb.). Bölüm kuralında
+# geçmeseler de tam denetime gitmeleri için güvenli üst küme.
+SPECIAL_COURSES = EQUIVALENCES.all_members()
+
+# =============================================================================
+# 1. COMPILE (KATEGORİ YAPILARI)
+# =============================================================================
+
+def _rule_regexes(constraints):
+    """Alt kurallardaki regex filtreleri (bu kalıba uyan adaylar tam denetime gider)."""
+    patterns = []
+    for rule in constraints.values():
+        if isinstance(rule, dict):
+            for key in ("filter_regex", "valid_regex"):
+                if rule.get(key): patterns.append(re.compile(rule[key]))
+    return patterns
+
+def _needs_exact(code, exact_codes, patterns):
+    return code in exact_codes or code.startswith("HUM") or any(p.match(code) for p in patterns)
+
+# =============================================================================
+# 2. SCAN (VEKTÖRİZE MARJİNAL ETKİ)
+# =============================================================================
+
+def scan_marginal_impact(major_code, taken_courses, raw_data_json, candidates=None, base_report=None, allocation="optimal"):
+    """
+    Her aday dersin tek başına eklenmesiyle kazanılacak ilerlemeyi hesaplar.
+
+    Args:
+        candidates: Değerlendirilecek ders kodları. Verilmezse bölümün tüm havuzları.
+        base_report: Aynı transkript için hazır AuditResult (varsa tekrar hesaplanmaz).
+        allocation: Denetimin seçmeli dağıtım modu (base_report ile aynı olmalı).
+
+    Returns:
+        list[dict]: code, category, credits, credits_gained, constraints_resolved,
+                    remaining_after. Kazanca göre azalan sırada.
+    """
+    if major_code not in FENS_RULES:
+        return []
+
+    taken_courses = list(taken_courses)
+    taken_set = set(taken_courses)
+    report = base_report if base_report is not None else audit_fens(major_code, taken_courses, raw_data_json, allocation)
+    rules = FENS_RULES[major_code]
+    reqs = raw_data_json.get(major_code, {}).get("requirements", {})
+    program = compile_program(raw_data_json, major_code)
+    credit_map = program["credit_map"]
+
+    if candidates is None:
+        candidates = {c['code'] for lst in reqs.values() for c in lst}
+    codes = sorted({c for c in candidates if c not in taken_set})
+    if not codes:
+        return []
+
+    # --- Kategori kümeleri ---
+    uni_missing = set(report.categories[UNI].missing)
+    req_missing = set(report.categories[REQ].missing)
+    core_codes = program["core_codes"]  # Core'a taşabilen dersler dahil (örn. IE: CS 201)
+    area_codes = program["area_codes"]
+
+    exact_codes = collect_rule_courses(rules["constraints"], set(SPECIAL_COURSES))
+    patterns = _rule_regexes(rules["constraints"])
+    for options in program["rules"]["overflow_options"]:
+        # Taşan ders Core'a sonradan eklendiğinde aday artık Core'un son dersi değildir
+        if options <= taken_set:
+            exact_codes |= core_codes
+
+    targets = np.array([c.target for c in report.categories], dtype=float)
+    current = np.array([c.credits for c in report.categories], dtype=float)
+    deficit = np.maximum(targets - current, 0)
+
+    # --- Vektörize geçiş ---
+    credits = np.array([credit_map.get(c, 3.0) for c in codes], dtype=float)
+    exact = np.array([_needs_exact(c, exact_codes, patterns) for c in codes])
+    landing = np.select(
+        [
+            np.array([c in uni_missing for c in codes]),
+            np.array([c in req_missing for c in codes]),
+            np.array([c in core_codes for c in codes]),
+            np.array([c in area_codes for c in codes]),
+        ],
+        [UNI, REQ, CORE, AREA],
+        default=FREE
+    )
+
+    if allocation == "optimal":
+        # DP, eklenen seçmeliyle tüm Core/Area atamasını değiştirebilir
+        exact |= (landing == CORE) | (landing == AREA)
+
+    # Core taşması (req + 2 sınırı) Area'ya, Area taşması Free'ye düşer.
+    # Şelale sıralı düzende çalışır: taşan aday havuzdaki son ders değilse
+    # kendisi kalıp başka bir dersi taşırabilir; bu adaylar tam denetime gider.
+    last_core = max((c for c in taken_set if c in core_codes), default="")
+    last_area = max((c for c in taken_set if c in core_codes or c in area_codes), default="")
+    codes_arr = np.array(codes)
+    core_fits = current[CORE] + credits <= targets[CORE] + 2
+    core_overflow = (landing == CORE) & ~core_fits
+    exact |= core_overflow & (codes_arr <= last_core)
+    landing = np.where(core_overflow, AREA, landing)
+    area_fits = current[AREA] + credits <= targets[AREA] + 2
+    area_overflow = (landing == AREA) & ~area_fits
+    exact |= area_overflow & (codes_arr <= last_area)
+    landing = np.where(area_overflow, FREE, landing)
+
+    gained = np.minimum(credits, deficit[landing])
+    resolved = ((landing == UNI) | (landing == REQ)).astype(int)
+
+    base_remaining = remaining_credits(report)
+    base_unmet = count_unmet(report)
+    results = []
+    for i, code in enumerate(codes):
+        if exact[i]:
+            new_report = audit_fens(major_code, taken_courses + [code], raw_data_json, allocation)
+            after = remaining_credits(new_report)
+            results.append({
+                "code": code,
+                "category": _landing_category(report, new_report),
+                "credits": float(credits[i]),
+                "credits_gained": float(base_remaining - after),
+                "constraints_resolved": base_unmet - count_unmet(new_report),
+                "remaining_after": float(after),
+            })
+        else:
+            results.append({
+                "code": code,
+                "category": CATEGORIES[landing[i]],
+                "credits": float(credits[i]),
+                "credits_gained": float(gained[i]),
+                "constraints_resolved": int(resolved[i]),
+                "remaining_after": float(base_remaining - gained[i]),
+            })
+
+    results.sort(key=lambda r: (-r["credits_gained"], -r["constraints_resolved"], r["code"]))
+    return results
+
+def _landing_category(old_report, new_report):
+    """Tam denetimde krediyi en çok artan kategori (eşitlikte şelale sırası)."""
+    best, best_delta = "Free", 0.0
+    for cat, old, new in zip(CATEGORIES, old_report.categories, new_report.categories):
+        delta = new.credits - old.credits
+        if delta > best_delta:
+            best, best_delta = cat, delta
+    return best
+
+# =============================================================================
+# 3. RECOMMENDER BRIDGE (ÖNERİ MOTORU KÖPRÜSÜ)
+# =============================================================================
+
+def impact_to_audit_data(impacts):
+    """
+    Tarama sonucunu recommender.get_recommendations'ın beklediği audit_data
+    kümelerine çevirir. Sadece gerçekten ilerleme sağlayan dersler ilgili
+    kümeye girer (dolu Core havuzundaki bir ders artık 'core' sayılmaz).
+    """
+    audit_data = {'required': set(), 'university': set(), 'core': set(), 'area': set()}
+    key_map = {"Required": 'required', "University": 'university', "Core": 'core', "Area": 'area'}
+    for imp in impacts:
+        key = key_map.get(imp["category"])
+        if key and (imp["credits_gained"] > 0 or imp["constraints_resolved"] > 0):
+            audit_data[key].add(imp["code"])
+    return audit_data
@@ -20,6 +20,18 @@ FASS_POOL = [
 
 SBS_POOL = ["ACC 201", "MKTG 301", "ORG 301"]
 
+# --- DERS EŞDEĞERLİKLERİ (Ön koşul ve çapraz listeleme için) ---
+# Her grup bir eşdeğerlik sınıfıdır; ilk ders kanonik temsilcidir.
+# Ortak dersi olan gruplar birleşir (çapraz listelemeler ikili yazılabilir).
+# Sadece gerçek çapraz listelemeler (aynı ders, farklı kod) yazılır: tablo
+# globaldir ve ön koşul kontrolü / ön koşul grafiğinde her yönde geçerlidir.
+# Yönlü veya bölüme özel ikameler (CS 201 / DSA 201: katalogda "CS 201 or
+# DSA 201" olarak ayrıca yazılır; MATH 212 = MATH 201 + MATH 202 paketi)
+# burada DEĞİL, FENS_RULES kapılarında (cs_logic, math_logic) tutulur.
+COURSE_EQUIVALENCES = [
+    ["DSA 210", "CS 210"],     # Veri Bilimine Giriş (CS 210 eski kod)
+]
+
 FENS_RULES = {
     "CS": {
         "credits": {"total_su": 125, "university": 41, "required": 30, "core": 31, "area": 9, "free": 15},
@@ -3,24 +3,35 @@
 MODÜL: AI / ML Engine
 DOSYA: src/ml_engine.py
 TANIM: Ders açıklamaları ile ilgi alanı arasındaki benzerliği hesaplar.
+       sentence_transformers (torch) ve model ağırlıkları import anında
+       değil, ilk skor hesabında yüklenir: uygulamanın ilk açılışı
+       (cold start) bu maliyeti ödemez.
 =============================================================================
 """
 
-try:
-    from sentence_transformers import SentenceTransformer, util
-    MODEL_AVAILABLE = True
-except ImportError:
-    MODEL_AVAILABLE = False
+import importlib.util
 
 import pandas as pd
 
-# Modeli global yükle (Performans için tek sefer)
+# Kütüphane var mı? (find_spec import etmez, torch yüklenmez)
+MODEL_AVAILABLE = importlib.util.find_spec("sentence_transformers") is not None
+MODEL_NAME = 'all-MiniLM-L6-v2'
+
+# Model ilk kullanımda bir kez yüklenir (Performans için tek sefer)
 model = None
-if MODEL_AVAILABLE:
-    try:
-        model = SentenceTransformer('all-MiniLM-L6-v2')
-    except:
-        MODEL_AVAILABLE = False
+util = None
+
+def get_model():
+    """Modeli ilk çağrıda yükler; kütüphane/model yoksa None."""
+    global model, util, MODEL_AVAILABLE
+    if model is None and MODEL_AVAILABLE:
+        try:
+            from sentence_transformers import SentenceTransformer, util as st_util
+            model = SentenceTransformer(MODEL_NAME)
+            util = st_util
+        except Exception:
+            MODEL_AVAILABLE = False
+    return model
 
 def calculate_ml_scores(df, user_query):
     """
@@ -28,8 +39,8 @@ def calculate_ml_scores(df, user_query):
     """
     if df.empty or not user_query:
         return [0] * len(df)
-    
-    if not MODEL_AVAILABLE or model is None:
+
+    if get_model() is None:
         # Fallback: Kütüphane yoksa basit kelime sayımı yap
         scores = []
         q_tokens = set(user_query.lower().split())
@@ -38,16 +49,16 @@ def calculate_ml_scores(df, user_query):
             match_count = sum(1 for t in q_tokens if t in text)
             scores.append(min(match_count * 20, 100))
         return scores
-    
+
     # Hedef metinleri hazırla
     corpus = df.apply(
-        lambda x: str(x['Description']) if pd.notna(x.get('Description')) and len(str(x.get('Description'))) > 5 
+        lambda x: str(x['Description']) if pd.notna(x.get('Description')) and len(str(x.get('Description'))) > 5
         else str(x['Course Name']), axis=1
     ).tolist()
-    
+
     # Embedding & Benzerlik
     query_embedding = model.encode(user_query, convert_to_tensor=True)
     corpus_embeddings = model.encode(corpus, convert_to_tensor=True)
     cosine_scores = util.cos_sim(query_embedding, corpus_embeddings)[0]
-    
+
     return [round(score.item() * 100, 1) for score in cosine_scores]
\ No newline at end of file
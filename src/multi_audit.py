@@ -0,0 +1,185 @@
+"""
+=============================================================================
+PROJE: SABANCI UNIVERSITY SMART ADVISOR
+DOSYA: src/multi_audit.py
+TANIM: Çoklu Program Denetimi (Çift Anadal + Yandal).
+       Tek transkripti birden fazla programa karşı tek çağrıda denetler.
+       Transkript bir kez normalize edilir (intern), bölüm yapıları
+       (kredi haritası, havuzlar) audit_engine.compile_program ile
+       önbellekten paylaşılır. Böylece ikinci programın maliyeti neredeyse
+       sadece şelalenin kendisidir.
+
+       Yandallar: undergrad_minors.json şu an sadece anahtar kelime içerir.
+       Bir yandal programında "courses" listesi (ve isteğe bağlı
+       "min_credits") varsa denetlenir, yoksa "skipped" listesine düşer.
+
+YOL HARİTASI (ROADMAP):
+1. SHARED PREP ............ Transkript normalizasyonu ve ortak kredi bilgisi
+2. MINOR AUDIT ............ Ders listeli yandal denetimi
+3. MULTI AUDIT ............ Program döngüsü ve çift sayım (double counting) raporu
+4. FACULTY SWEEP .......... Tüm FENS programlarına yakınlık sıralaması
+=============================================================================
+"""
+
+import sys
+import os
+
+# Path ayarı (src modüllerini bulabilmesi için)
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+try:
+    from audit_engine import audit_fens, cached_fens_audit, compile_program, sum_credits, remaining_credits, count_unmet
+    from major_rules import FENS_RULES
+except ImportError:
+    from src.audit_engine import audit_fens, cached_fens_audit, compile_program, sum_credits, remaining_credits, count_unmet
+    from src.major_rules import FENS_RULES
+
+# Çift sayım kontrolünde dikkate alınan kategoriler.
+# University dersleri tüm FENS bölümlerinde ortak şart olduğu için hariç tutulur.
+COUNTED_CATEGORIES = ("Required", "Core", "Area", "Minor")
+
+# =============================================================================
+# 1. SHARED PREP (ORTAK HAZIRLIK)
+# =============================================================================
+
+def intern_transcript(taken_courses):
+    """Ders kodlarını normalize edip intern eder (sıra korunur, tekrarlar atılır)."""
+    seen = {}
+    for c in taken_courses:
+        code = sys.intern(" ".join(str(c).upper().split()))
+        if code: seen.setdefault(code, None)
+    return list(seen)
+
+def shared_credit_map(raw_data_json, majors):
+    """Programlar arası ortak kredi bilgisi (derlenmiş bölüm haritalarının birleşimi)."""
+    merged = {}
+    for major in majors:
+        for code, cr in compile_program(raw_data_json, major)["credit_map"].items():
+            merged.setdefault(code, cr)
+    return merged
+
+def find_minor(minor_data, minor_id):
+    """undergrad_minors.json içinde id veya isim ile yandal programını bulur."""
+    for faculty in (minor_data or {}).get("faculties", []):
+        for program in faculty.get("programs", []):
+            if minor_id in (program.get("id"), program.get("name")):
+                return program
+    return None
+
+# =============================================================================
+# 2. MINOR AUDIT (YANDAL DENETİMİ)
+# =============================================================================
+
+def audit_minor(program, taken_courses, credit_map):
+    """
+    Ders listeli yandal denetimi.
+    Beklenen şema: {"courses": ["CS 201", ...] veya [{"code", "su_credit"}], "min_credits": 18}
+    """
+    courses = []
+    local_credits = dict(credit_map)
+    for c in program.get("courses", []):
+        if isinstance(c, dict):
+            courses.append(c["code"])
+            if "su_credit" in c: local_credits[c["code"]] = float(c["su_credit"])
+        else:
+            courses.append(c)
+
+    taken_set = set(taken_courses)
+    taken = [c for c in courses if c in taken_set]
+    missing = [c for c in courses if c not in taken_set]
+    credits = sum_credits(taken, local_credits)
+    target = program.get("min_credits", sum_credits(courses, local_credits))
+
+    roadmap = []
+    if credits < target:
+        roadmap.append(f"📘 **Yandal ({program.get('name', '')}):** {int(target - credits)} kredi eksiğin var.")
+    else:
+        roadmap.append(f"🎉 **Tebrikler!** {program.get('name', '')} yandal şartlarını sağladın.")
+
+    return {
+        "Minor": {"taken": taken, "missing": missing if credits < target else [], "credits": credits, "target": target},
+        "Roadmap": roadmap
+    }
+
+# =============================================================================
+# 3. MULTI AUDIT (ÇOKLU PROGRAM)
+# =============================================================================
+
+def run_multi_audit(majors, taken_courses, raw_data_json, minors=(), minor_data=None, allocation="optimal"):
+    """
+    Transkripti birden fazla anadal (ve ders listeli yandal) için denetler.
+
+    Args:
+        majors: FENS bölüm kodları (Örn: ["CS", "IE"]).
+        minors: Yandal id/isimleri (undergrad_minors.json içinden).
+        minor_data: undergrad_minors.json içeriği.
+
+    Returns:
+        dict: {
+            "reports": {program: AuditResult (anadal) veya sözlük (yandal)},
+            "double_counted": {ders: {program: kategori}},  # 2+ programda sayılan
+            "skipped": {program: sebep}
+        }
+    """
+    taken = intern_transcript(taken_courses)
+    reports, skipped = {}, {}
+
+    valid_majors = [m for m in majors if m in FENS_RULES]
+    for major in majors:
+        if major not in FENS_RULES:
+            skipped[major] = "Bölüm kuralları bulunamadı."
+            continue
+        reports[major] = audit_fens(major, taken, raw_data_json, allocation)
+
+    if minors:
+        credit_map = shared_credit_map(raw_data_json, valid_majors or list(FENS_RULES))
+        for minor_id in minors:
+            program = find_minor(minor_data, minor_id)
+            if program is None:
+                skipped[minor_id] = "Yandal bulunamadı."
+            elif not program.get("courses"):
+                skipped[minor_id] = "Yandal ders listesi yok."
+            else:
+                reports[minor_id] = audit_minor(program, taken, credit_map)
+
+    # Çift sayım: Aynı ders birden fazla programda bir kategoriye sayılıyor mu?
+    usage = {}
+    for prog, report in reports.items():
+        for cat in COUNTED_CATEGORIES:
+            for code in report.get(cat, {}).get("taken", ()):
+                usage.setdefault(code, {})[prog] = cat
+    double_counted = {c: progs for c, progs in usage.items() if len(progs) > 1}
+
+    return {"reports": reports, "double_counted": double_counted, "skipped": skipped}
+
+# =============================================================================
+# 4. FACULTY SWEEP (PROGRAM YAKINLIĞI)
+# =============================================================================
+
+def sweep_programs(taken_courses, raw_data_json, majors=None, allocation="optimal"):
+    """
+    Transkripti tüm FENS programlarına (CS, EE, IE, ME, MAT, BIO, DSA) karşı
+    denetler ve mezuniyete kalan mesafeye göre sıralar (bölüm değiştirme analizi).
+    Transkript bir kez normalize edilir; denetimler cached_fens_audit ile
+    önbellekten gelir (Streamlit rerun'larında aynı transkript yeniden
+    denetlenmez).
+
+    Returns:
+        list[dict]: major, remaining_credits, unmet, missing_required,
+                    missing_university, credits. En yakın program ilk sırada.
+    """
+    taken = intern_transcript(taken_courses)
+    rows = []
+    for major in (majors or FENS_RULES):
+        if major not in FENS_RULES or major not in raw_data_json: continue
+        report = cached_fens_audit(major, taken, raw_data_json, allocation)
+        rows.append({
+            "major": major,
+            "remaining_credits": remaining_credits(report),
+            "unmet": count_unmet(report),
+            "missing_required": list(report["Required"].missing),
+            "missing_university": list(report["University"].missing),
+            "credits": {c.category.value: c.credits for c in report.categories},
+        })
+    rows.sort(key=lambda r: (r["remaining_credits"], r["unmet"], r["major"]))
+    return rows
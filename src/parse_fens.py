@@ -1,7 +1,8 @@
 import os
 import re
 import json
-from bs4 import BeautifulSoup
+from concurrent.futures import ProcessPoolExecutor
+from bs4 import BeautifulSoup, NavigableString
 
 # --- AYARLAR ---
 BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
@@ -12,9 +13,12 @@ def clean_text(text):
     if not text: return ""
     return " ".join(text.replace('\xa0', ' ').split()).strip()
 
+COURSE_CODE_RE = re.compile(r"^[A-Z]{2,5}\s+\d{3,4}[A-Z]*$")
+NUMBER_RE = re.compile(r"^\d+(\.\d+)?$")
+
 def is_course_code(text):
     # Regex: 2-5 harf, boşluk, 3-4 rakam
-    return bool(re.match(r"^[A-Z]{2,5}\s+\d{3,4}[A-Z]*$", text))
+    return bool(COURSE_CODE_RE.match(text))
 
 def parse_course_row(tr):
     cols = tr.find_all('td')
@@ -24,24 +28,22 @@ def parse_course_row(tr):
     course_name = ""
     ects = 0.0
     su_credit = 0.0
+
+    # Hücre metinleri bir kez çıkarılır (kod ve kredi aramaları aynı listeyi kullanır)
+    texts = [clean_text(col.get_text()) for col in cols]
     
     # 1. Ders Kodunu Bul
-    for idx, col in enumerate(cols):
-        txt = clean_text(col.get_text())
+    for idx, txt in enumerate(texts):
         if is_course_code(txt):
             course_code = txt
-            if idx + 1 < len(cols):
-                course_name = clean_text(cols[idx+1].get_text())
+            if idx + 1 < len(texts):
+                course_name = texts[idx+1]
             break
             
     if not course_code: return None
 
     # 2. Kredileri Bul
-    nums = []
-    for col in cols:
-        txt = clean_text(col.get_text())
-        if re.match(r"^\d+(\.\d+)?$", txt):
-            nums.append(float(txt))
+    nums = [float(txt) for txt in texts if NUMBER_RE.match(txt)]
             
     if len(nums) >= 2:
         ects = nums[0]
@@ -56,62 +58,159 @@ def parse_course_row(tr):
         "su_credit": su_credit
     }
 
+class TableIndex:
+    """
+    Belge başına bir kez kurulan tablo indeksi.
+    - Tablolar belge sırasıyla tutulur; satırları ilk ihtiyaçta bir kez
+      ayrıştırılır (parse_course_row) ve ders listesi + kod kümesi saklanır.
+      İç içe tablolarda aynı satır bir kez ayrıştırılır.
+    - Her düğümün belge sırası (position) tutulur, böylece "başlıktan sonraki
+      tablolar" find_all_next gezintisi yerine pozisyon karşılaştırmasıyla bulunur.
+    - Bölüm anahtar kelimeleri tüm metin düğümleri üzerinde tek geçişte aranır.
+    """
+
+    def __init__(self, soup):
+        self.soup = soup
+        self.position = {}
+        self.strings = []
+        self.tables = []
+        for i, node in enumerate(soup.descendants):
+            self.position[id(node)] = i
+            if isinstance(node, NavigableString):
+                self.strings.append(node)
+            elif node.name == 'table':
+                self.tables.append(node)
+        self._parsed_tables = {}
+        self._parsed_rows = {}
+
+    def table_courses(self, tbl):
+        """(ders listesi, kod kümesi) — tablo başına bir kez hesaplanır."""
+        key = id(tbl)
+        if key not in self._parsed_tables:
+            courses = []
+            for tr in tbl.find_all('tr'):
+                row_key = id(tr)
+                if row_key not in self._parsed_rows:
+                    self._parsed_rows[row_key] = parse_course_row(tr)
+                if self._parsed_rows[row_key]: courses.append(self._parsed_rows[row_key])
+            self._parsed_tables[key] = (courses, {c['code'] for c in courses})
+        return self._parsed_tables[key]
+
+    def find_headers(self, section_keywords):
+        """Her anahtar kelimenin eşleştiği ilk metin düğümü (tek geçiş)."""
+        patterns = [(kw, re.compile(kw, re.IGNORECASE)) for kw in section_keywords]
+        hits = {}
+        for node in self.strings:
+            for kw, pattern in patterns:
+                if kw not in hits and pattern.search(node):
+                    hits[kw] = node
+            if len(hits) == len(patterns): break
+        return hits
+
+    def tables_after(self, node):
+        """node'dan (ve alt elemanlarından) sonra gelen tablolar, belge sırasıyla."""
+        pos = self.position[id(node)]
+        return [t for t in self.tables if self.position[id(t)] > pos]
+
 def find_courses_in_html(soup, section_keywords=None, forbidden_codes=None):
     """
     Tabloları tarar. 
     forbidden_codes: Eğer tabloda bu kodlardan biri varsa, o tabloyu atla (Yanlış tabloyu almamak için).
+    soup: BeautifulSoup veya aynı belge için önceden kurulmuş TableIndex.
     """
-    courses = []
-    
-    # Sayfadaki tüm tabloları al
-    all_tables = soup.find_all('table')
-    
+    index = soup if isinstance(soup, TableIndex) else TableIndex(soup)
     target_table = None
     
     # Eğer keyword varsa, o keyword'e en yakın tabloyu bulmaya çalış
     if section_keywords:
-        # Önce keywordleri içeren elementi bul
-        header_node = None
-        for kw in section_keywords:
-            header_node = soup.find(string=re.compile(kw, re.IGNORECASE))
-            if header_node: break
+        # Önce keywordleri içeren elementi bul (listede önce gelen keyword öncelikli)
+        hits = index.find_headers(section_keywords)
+        header_node = next((hits[kw] for kw in section_keywords if kw in hits), None)
         
         if header_node:
             # O başlıktan sonra gelen tabloları incele
             current = header_node.find_parent()
             if current:
-                next_tables = current.find_all_next('table')
-                for tbl in next_tables:
-                    # Tabloyu geçici parse et
-                    temp_courses = []
-                    rows = tbl.find_all('tr')
-                    for tr in rows:
-                        c = parse_course_row(tr)
-                        if c: temp_courses.append(c['code'])
-                    
+                forbidden = set(forbidden_codes or ())
+                for tbl in index.tables_after(current):
+                    table_courses, table_codes = index.table_courses(tbl)
+
                     # KONTROL: Bu tablo yasaklı kod içeriyor mu?
                     # (Örn: Required ararken AL 102 bulursan, bu Üniversite tablosudur, ATLA)
-                    if forbidden_codes and any(fc in temp_courses for fc in forbidden_codes):
+                    if forbidden & table_codes:
                         continue # Pas geç, sonraki tabloya bak
                     
-                    if temp_courses: # Eğer geçerli ve yasaksız ders varsa
+                    if table_courses: # Eğer geçerli ve yasaksız ders varsa
                         target_table = tbl
                         break # Bulduk!
     
     # Eğer spesifik hedef tablo yoksa veya bulunamadıysa (Pool dosyaları için)
-    tables_to_scan = [target_table] if target_table else all_tables
+    tables_to_scan = [target_table] if target_table else index.tables
     
+    courses, seen = [], set()
     for tbl in tables_to_scan:
-        rows = tbl.find_all('tr')
-        for tr in rows:
-            course = parse_course_row(tr)
-            if course:
-                if not any(c['code'] == course['code'] for c in courses):
-                    courses.append(course)
+        for course in index.table_courses(tbl)[0]:
+            if course['code'] not in seen:
+                seen.add(course['code'])
+                courses.append(course)
                     
     return courses
 
-def main():
+# --- PARALEL İŞ DAĞITIMI ---
+# Her HTML dosyası bağımsız bir iştir (7 bölüm x 4 dosya). İşler bir process
+# havuzuna dağıtılır; sonuçlar iş listesinin sırasıyla birleştirilir, böylece
+# çıktı JSON'u sıralı çalıştırmayla bayt bayt aynıdır.
+FILE_KINDS = ("main", "core", "area", "free")
+ELECTIVE_KEYS = {"core": "core_electives", "area": "area_electives", "free": "free_electives"}
+
+def parse_degree_detail(soup):
+    """Ana dosyadan (degree_detail) Üniversite ve Zorunlu ders tablolarını çeker (tek tablo indeksiyle)."""
+    index = TableIndex(soup)
+
+    # 1. Önce Üniversite Derslerini Çek
+    uni_keys = ["University Courses", "Üniversite Dersleri"]
+    university = find_courses_in_html(index, uni_keys)
+
+    # 2. Şimdi Zorunlu Dersleri Çek (Ama Yasaklıları Hariç Tut!)
+    req_keys = ["Required Courses", "Major Required", "Zorunlu Dersler", "Program Requirements"]
+
+    # Eğer "Required" diye ararken bulduğu tabloda "AL 102" varsa, o tabloyu alma!
+    required = find_courses_in_html(
+        index, 
+        req_keys, 
+        forbidden_codes=["AL 102", "CIP 101N"] # Bu dersler varsa o tablo University tablosudur.
+    )
+    return {"university_courses": university, "required_courses": required}
+
+def parse_file_job(job):
+    """Havuz görevi: (bölüm, tür, yol) -> (bölüm, tür, {gereksinim: ders listesi})."""
+    major_code, kind, path = job
+    with open(path, "r", encoding="utf-8") as f:
+        soup = BeautifulSoup(f.read(), "html.parser")
+    if kind == "main":
+        return major_code, kind, parse_degree_detail(soup)
+    return major_code, kind, {ELECTIVE_KEYS[kind]: find_courses_in_html(soup)}
+
+def map_jobs(func, jobs, workers=None):
+    """İşleri sırayı koruyarak çalıştırır (workers <= 1 ise havuz açılmaz)."""
+    workers = min(workers or os.cpu_count() or 1, len(jobs))
+    if workers <= 1:
+        return list(map(func, jobs))
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        return list(pool.map(func, jobs))
+
+def major_files(subdir):
+    folder_path = os.path.join(RAW_HTML_DIR, subdir)
+    prefix = subdir.replace('_html', '')
+    return {
+        "main": os.path.join(folder_path, f"{prefix}_degree_detail.html"),
+        "core": os.path.join(folder_path, f"{prefix}_core.html"),
+        "area": os.path.join(folder_path, f"{prefix}_area.html"),
+        "free": os.path.join(folder_path, f"{prefix}_free.html")
+    }
+
+def main(workers=None, output_file=None):
+    output_file = output_file or OUTPUT_FILE
     print(f"🏭 FENS Veri Fabrikası (v4 - Anti-Overlap) Çalışıyor...\n")
     
     if not os.path.exists(RAW_HTML_DIR):
@@ -119,21 +218,21 @@ def main():
         return
 
     all_majors = {}
-    subdirs = [d for d in os.listdir(RAW_HTML_DIR) if os.path.isdir(os.path.join(RAW_HTML_DIR, d)) and d.endswith('_html')]
-    
-    for subdir in subdirs:
-        major_code = subdir.replace('_html', '').upper()
-        folder_path = os.path.join(RAW_HTML_DIR, subdir)
+    # Sıralı liste: os.listdir sırası dosya sistemine bağlıdır, çıktı her makinede aynı olsun
+    subdirs = sorted(d for d in os.listdir(RAW_HTML_DIR) if os.path.isdir(os.path.join(RAW_HTML_DIR, d)) and d.endswith('_html'))
+
+    files_by_major = {subdir.replace('_html', '').upper(): major_files(subdir) for subdir in subdirs}
+    jobs = [(major_code, kind, files[kind])
+            for major_code, files in files_by_major.items()
+            for kind in FILE_KINDS if os.path.exists(files[kind])]
+
+    results = {}
+    for major_code, kind, data in map_jobs(parse_file_job, jobs, workers):
+        results.setdefault(major_code, {})[kind] = data
+
+    for major_code, files in files_by_major.items():
         print(f"   ⚙️  İşleniyor: {major_code}...")
         
-        prefix = subdir.replace('_html', '')
-        files = {
-            "main": os.path.join(folder_path, f"{prefix}_degree_detail.html"),
-            "core": os.path.join(folder_path, f"{prefix}_core.html"),
-            "area": os.path.join(folder_path, f"{prefix}_area.html"),
-            "free": os.path.join(folder_path, f"{prefix}_free.html")
-        }
-        
         major_data = {
             "code": major_code,
             "requirements": {
@@ -144,43 +243,12 @@ def main():
                 "free_electives": []
             }
         }
-        
-        if os.path.exists(files["main"]):
-            with open(files["main"], "r", encoding="utf-8") as f:
-                soup = BeautifulSoup(f.read(), "html.parser")
-                
-            # 1. Önce Üniversite Derslerini Çek
-            uni_keys = ["University Courses", "Üniversite Dersleri"]
-            major_data["requirements"]["university_courses"] = find_courses_in_html(soup, uni_keys)
-            
-            # Üniversite ders kodlarını bir listeye al (Yasaklı Liste)
-            # Örn: AL 102, CIP 101N, HIST 191...
-            uni_codes = [c['code'] for c in major_data["requirements"]["university_courses"]]
-            
-            # 2. Şimdi Zorunlu Dersleri Çek (Ama Yasaklıları Hariç Tut!)
-            req_keys = ["Required Courses", "Major Required", "Zorunlu Dersler", "Program Requirements"]
-            
-            # Eğer "Required" diye ararken bulduğu tabloda "AL 102" varsa, o tabloyu alma!
-            major_data["requirements"]["required_courses"] = find_courses_in_html(
-                soup, 
-                req_keys, 
-                forbidden_codes=["AL 102", "CIP 101N"] # Bu dersler varsa o tablo University tablosudur.
-            )
-            
-        else:
-            print(f"      ⚠️ Ana dosya yok: {files['main']}")
 
-        if os.path.exists(files["core"]):
-            with open(files["core"], "r", encoding="utf-8") as f:
-                major_data["requirements"]["core_electives"] = find_courses_in_html(BeautifulSoup(f.read(), "html.parser"))
-        
-        if os.path.exists(files["area"]):
-            with open(files["area"], "r", encoding="utf-8") as f:
-                major_data["requirements"]["area_electives"] = find_courses_in_html(BeautifulSoup(f.read(), "html.parser"))
-                
-        if os.path.exists(files["free"]):
-            with open(files["free"], "r", encoding="utf-8") as f:
-                major_data["requirements"]["free_electives"] = find_courses_in_html(BeautifulSoup(f.read(), "html.parser"))
+        parsed = results.get(major_code, {})
+        if "main" not in parsed:
+            print(f"      ⚠️ Ana dosya yok: {files['main']}")
+        for kind in FILE_KINDS:
+            major_data["requirements"].update(parsed.get(kind, {}))
 
         # Özet
         c_req = len(major_data['requirements']['required_courses'])
@@ -189,10 +257,13 @@ def main():
         print(f"      📊 Uni: {c_uni} | Req: {c_req}")
         all_majors[major_code] = major_data
 
-    with open(OUTPUT_FILE, "w", encoding="utf-8") as f:
+    with open(output_file, "w", encoding="utf-8") as f:
         json.dump(all_majors, f, ensure_ascii=False, indent=4)
         
-    print(f"\n🎉 JSON DÜZELTİLDİ: {OUTPUT_FILE}")
+    print(f"\n🎉 JSON DÜZELTİLDİ: {output_file}")
 
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    import argparse
+    parser = argparse.ArgumentParser(description="FENS müfredat HTML -> JSON")
+    parser.add_argument("--workers", type=int, default=None, help="İşlem sayısı (1 = sıralı, varsayılan: CPU sayısı)")
+    main(parser.parse_args().workers)
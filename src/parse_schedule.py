@@ -2,6 +2,16 @@ from bs4 import BeautifulSoup
 import pandas as pd
 import os
 import re
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+# lxml opsiyonel: varsa hızlı backend, yoksa BeautifulSoup (html.parser)
+try:
+    from lxml import etree
+    HAS_LXML = True
+except ImportError:
+    HAS_LXML = False
 
 # ---------------------------------------------------------
 # AYARLAR VE DOSYA İSİMLERİ
@@ -20,9 +30,24 @@ FILES_TO_PROCESS = [
 OUTPUT_FILENAME = "active_schedule_master.csv"
 OUTPUT_PATH = os.path.join(OUTPUT_DIR, OUTPUT_FILENAME)
 
-def parse_html_file(file_path, term_label):
+# Parser backend: "lxml" (hızlı, C tabanlı) veya "bs4" (saf Python html.parser)
+DEFAULT_BACKEND = "lxml" if HAS_LXML else "bs4"
+
+MEETING_TABLE_SUMMARY = "This table lists the scheduled meeting times and assigned instructors for this class.."
+
+def parse_html_file(file_path, term_label, backend=None):
     """
     Tek bir HTML dosyasını okur ve ders listesini döndürür.
+    backend: "lxml" veya "bs4" (varsayılan: DEFAULT_BACKEND). İki backend aynı satırları üretir.
+    """
+    backend = backend or DEFAULT_BACKEND
+    if backend == "lxml":
+        return parse_html_file_lxml(file_path, term_label)
+    return parse_html_file_bs4(file_path, term_label)
+
+def parse_html_file_bs4(file_path, term_label):
+    """
+    BeautifulSoup (html.parser) backend'i.
     """
     if not os.path.exists(file_path):
         print(f"⚠️ UYARI: Dosya bulunamadı, atlanıyor -> {file_path}")
@@ -117,42 +142,206 @@ def parse_html_file(file_path, term_label):
 
     return schedule_data
 
-def main():
-    print("🚀 Schedule Parsing Başlıyor (Master)...")
-    
+# ---------------------------------------------------------
+# LXML BACKEND (XPATH)
+# ---------------------------------------------------------
+# Tek geçişte C parser ile ağaç kurulur; her th.ddlabel için find_parent /
+# find_next_sibling / find zinciri yerine derlenmiş XPath ifadeleri kullanılır.
+# Metin çıkarımı BeautifulSoup get_text() ile birebir aynıdır (tüm alt metinler).
+_XP_LABELS = etree.XPath("//th[contains(concat(' ', normalize-space(@class), ' '), ' ddlabel ')]") if HAS_LXML else None
+_XP_LINK = etree.XPath("(.//a)[1]") if HAS_LXML else None
+_XP_PARENT_TR = etree.XPath("ancestor::tr[1]") if HAS_LXML else None
+_XP_NEXT_TR = etree.XPath("following-sibling::tr[1]") if HAS_LXML else None
+_XP_MEETING_TABLE = etree.XPath("(.//table[@summary=$s])[1]") if HAS_LXML else None
+_XP_ROWS = etree.XPath(".//tr") if HAS_LXML else None
+_XP_COLS = etree.XPath(".//td") if HAS_LXML else None
+
+def _text(el):
+    return "".join(el.itertext())
+
+def parse_html_file_lxml(file_path, term_label):
+    """
+    lxml backend'i (parse_html_file_bs4 ile aynı satırlar, çok daha hızlı).
+    """
+    if not HAS_LXML:
+        raise ImportError("lxml backend'i için 'lxml' paketi gerekli.")
+
+    if not os.path.exists(file_path):
+        print(f"⚠️ UYARI: Dosya bulunamadı, atlanıyor -> {file_path}")
+        return []
+
+    print(f"📂 İşleniyor ({term_label}): {file_path}")
+
+    parser = etree.HTMLParser(encoding="utf-8")
+    tree = etree.parse(file_path, parser)
+
+    schedule_data = []
+
+    for th in _XP_LABELS(tree):
+        try:
+            link = _XP_LINK(th)
+            if not link: continue
+
+            parts = _text(link[0]).strip().split(" - ")
+            if len(parts) >= 4:
+                section = parts[-1].strip()
+                course_code = parts[-2].strip()
+                crn = parts[-3].strip()
+                course_name = " - ".join(parts[:-3]).strip()
+            else:
+                continue
+
+            parent_tr = _XP_PARENT_TR(th)
+            if not parent_tr: continue
+
+            details_tr = _XP_NEXT_TR(parent_tr[0])
+            if not details_tr: continue
+
+            schedule_table = _XP_MEETING_TABLE(details_tr[0], s=MEETING_TABLE_SUMMARY)
+
+            if schedule_table:
+                for row in _XP_ROWS(schedule_table[0])[1:]:
+                    cols = _XP_COLS(row)
+                    if len(cols) < 7: continue
+
+                    instructor = re.sub(r'\s*\(.*?\)', '', _text(cols[6]).strip())
+                    instructor = instructor.split('(')[0].strip()
+
+                    schedule_data.append({
+                        "Term": term_label,
+                        "Course Code": course_code,
+                        "Section": section,
+                        "CRN": crn,
+                        "Course Name": course_name,
+                        "Time": _text(cols[1]).strip(),
+                        "Days": _text(cols[2]).strip(),
+                        "Location": _text(cols[3]).strip(),
+                        "Instructor": instructor
+                    })
+            else:
+                schedule_data.append({
+                    "Term": term_label,
+                    "Course Code": course_code,
+                    "Section": section,
+                    "CRN": crn,
+                    "Course Name": course_name,
+                    "Time": "TBA",
+                    "Days": "TBA",
+                    "Location": "TBA",
+                    "Instructor": "TBA"
+                })
+
+        except Exception as e:
+            continue
+
+    return schedule_data
+
+# ---------------------------------------------------------
+# PARİTE KONTROLÜ VE BENCHMARK
+# ---------------------------------------------------------
+def check_parity(files=FILES_TO_PROCESS, repeats=3):
+    """
+    İki backend'i her dosyada çalıştırır: satırlar birebir aynı mı ve
+    saniyede kaç MB / satır işleniyor? (python src/parse_schedule.py --check)
+    """
+    ok = True
+    for filename, term in files:
+        file_path = os.path.join(HTML_DIR, filename)
+        if not os.path.exists(file_path):
+            print(f"⚠️ {filename} yok, atlanıyor.")
+            continue
+        size_mb = os.path.getsize(file_path) / 1e6
+
+        results, timings = {}, {}
+        for backend in ("bs4", "lxml"):
+            best = float("inf")
+            for _ in range(repeats):
+                t0 = time.perf_counter()
+                results[backend] = parse_html_file(file_path, term, backend=backend)
+                best = min(best, time.perf_counter() - t0)
+            timings[backend] = best
+
+        same = results["bs4"] == results["lxml"]
+        ok = ok and same
+        print(f"\n{'✅' if same else '❌'} {filename}: {len(results['bs4'])} / {len(results['lxml'])} satır (bs4 / lxml)")
+        if not same:
+            for i, (a, b) in enumerate(zip(results["bs4"], results["lxml"])):
+                if a != b:
+                    print(f"   İlk fark (satır {i}):\n   bs4 : {a}\n   lxml: {b}")
+                    break
+        for backend, sec in timings.items():
+            print(f"   {backend:<5}: {sec:.3f} s  ({size_mb / sec:.1f} MB/s, {len(results[backend]) / sec:,.0f} satır/s)")
+        print(f"   ⚡ Hızlanma: {timings['bs4'] / timings['lxml']:.1f}x")
+    return ok
+
+def parse_term_job(job):
+    """Havuz görevi: (dosya adı, dönem) -> satır listesi."""
+    filename, term = job
+    return parse_html_file(os.path.join(HTML_DIR, filename), term)
+
+def parse_terms(files=FILES_TO_PROCESS, workers=None):
+    """
+    Dönem sayfalarını ayrıştırıp tek DataFrame döndürür (kodlar standart, boşsa boş DataFrame).
+    files: [(dosya adı veya tam yol, dönem etiketi)]
+    """
     all_data = []
     
-    # Listemideki her dosyayı sırayla işle
-    for filename, term in FILES_TO_PROCESS:
-        file_path = os.path.join(HTML_DIR, filename)
-        term_data = parse_html_file(file_path, term)
-        
+    # Dönem dosyaları paralel işlenir; sonuçlar listedeki sırayla birleştirilir (çıktı sıralı çalıştırmayla aynı)
+    files = list(files)
+    workers = min(workers or os.cpu_count() or 1, max(len(files), 1))
+    if workers <= 1:
+        results = list(map(parse_term_job, files))
+    else:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            results = list(pool.map(parse_term_job, files))
+
+    for (filename, term), term_data in zip(files, results):
         if term_data:
             print(f"   ✅ {term}: {len(term_data)} section bulundu.")
             all_data.extend(term_data)
         else:
             print(f"   ❌ {term}: Veri bulunamadı veya dosya yok.")
 
+    if not all_data:
+        return pd.DataFrame()
+    df = pd.DataFrame(all_data)
+    
+    # Kodları standartlaştır
+    df['Course Code'] = df['Course Code'].str.strip().str.upper()
+    return df
+
+def main(workers=None, output_path=None):
+    output_path = output_path or OUTPUT_PATH
+    print("🚀 Schedule Parsing Başlıyor (Master)...")
+    
+    df = parse_terms(FILES_TO_PROCESS, workers)
+
     # Sonuçları Kaydet
-    if all_data:
-        df = pd.DataFrame(all_data)
-        
-        # Kodları standartlaştır
-        df['Course Code'] = df['Course Code'].str.strip().str.upper()
-        
+    if not df.empty:
         # Klasör yoksa oluştur
-        os.makedirs(OUTPUT_DIR, exist_ok=True)
+        os.makedirs(os.path.dirname(output_path), exist_ok=True)
         
-        df.to_csv(OUTPUT_PATH, index=False, encoding='utf-8-sig')
+        df.to_csv(output_path, index=False, encoding='utf-8-sig')
         
         print("\n" + "="*40)
         print(f"🎉 İŞLEM TAMAMLANDI!")
         print(f"📊 Toplam Kayıt: {len(df)}")
-        print(f"💾 Dosya: {OUTPUT_PATH}")
+        print(f"💾 Dosya: {output_path}")
         print("="*40)
         print(df.head())
     else:
         print("\n❌ Hiçbir dosyadan veri çekilemedi.")
 
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    import argparse
+    parser = argparse.ArgumentParser(description="BannerWeb ders programı HTML -> CSV")
+    parser.add_argument("--check", action="store_true", help="bs4 / lxml parite kontrolü ve benchmark")
+    parser.add_argument("--workers", type=int, default=None, help="İşlem sayısı (1 = sıralı, varsayılan: CPU sayısı)")
+    args = parser.parse_args()
+
+    if args.check:
+        if not HAS_LXML:
+            print("❌ lxml kurulu değil, parite kontrolü yapılamaz.")
+            sys.exit(1)
+        sys.exit(0 if check_parity() else 1)
+    main(args.workers)
@@ -0,0 +1,433 @@
+"""
+=============================================================================
+PROJE: SABANCI UNIVERSITY SMART ADVISOR
+DOSYA: src/pipeline.py
+TANIM: Artımlı (Incremental) ETL Orkestratörü.
+       web_crawler -> clean_data, parse_fens ve parse_schedule adımlarını
+       tek komutta çalıştırır. Her adımın girdi dosyalarının içerik hash'i
+       (SHA-256) ve ürettiği çıktıların hash'i bir manifest dosyasında
+       tutulur; sadece girdisi (veya kodu) değişen adımlar yeniden çalışır.
+
+       Atomik yayın: Adımlar çıktılarını data/.etl_staging altına yazar,
+       başarılı olunca her dosya os.replace ile yerine taşınır. Çalışan
+       uygulama hiçbir zaman yarım yazılmış bir CSV/JSON okumaz.
+
+       Kullanım:
+           python src/pipeline.py                 # Değişen adımları çalıştır
+           python src/pipeline.py --dry-run       # Sadece ne çalışacağını göster
+           python src/pipeline.py --force fens    # Adımı zorla yeniden üret
+           python src/pipeline.py --crawl         # Ağ taramasını da dahil et
+
+YOL HARİTASI (ROADMAP):
+1. HASHING ................ Dosya içerik hash'i (boyut/mtime önbellekli)
+2. MANIFEST ............... Manifest okuma/yazma ve kirli (dirty) adım tespiti
+3. STAGES ................. Adım tanımları (crawl, clean, fens, schedule, history, snapshot)
+4. RUNNER ................. Staging, atomik yayın ve manifest güncelleme
+5. MAIN EXECUTION ......... Komut satırı arayüzü
+=============================================================================
+"""
+
+import os
+import sys
+import glob
+import json
+import time
+import shutil
+import hashlib
+import importlib.util
+
+# Path ayarı (src modüllerini bulabilmesi için)
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+# Snapshot'ın veri ve kod bağımlılıkları tek yerde (snapshot.py) tanımlıdır:
+# adımın girdileri ile snapshot'ın kendi tazelik parmak izi aynı listedir
+try:
+    from snapshot import SOURCE_FILES as SNAPSHOT_SOURCES, CODE_FILES as SNAPSHOT_CODE
+except ImportError:
+    from src.snapshot import SOURCE_FILES as SNAPSHOT_SOURCES, CODE_FILES as SNAPSHOT_CODE
+
+# --- AYARLAR ---
+SRC_DIR = os.path.dirname(os.path.abspath(__file__))
+BASE_DIR = os.path.dirname(SRC_DIR)
+DATA_DIR = os.path.join(BASE_DIR, 'data')
+MANIFEST_PATH = os.path.join(DATA_DIR, '.etl_manifest.json')
+STAGING_DIR = os.path.join(DATA_DIR, '.etl_staging')
+MANIFEST_VERSION = 1
+
+# pyarrow varsa clean/schedule adımları CSV'nin yanına tipli Parquet de yazar (src/columnar.py)
+HAS_PARQUET = importlib.util.find_spec("pyarrow") is not None
+
+# =============================================================================
+# 1. HASHING (İÇERİK HASH'İ)
+# =============================================================================
+
+def file_sha256(path, chunk_size=1 << 20):
+    h = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(chunk_size), b""):
+            h.update(chunk)
+    return h.hexdigest()
+
+def fingerprint(path, previous=None):
+    """
+    Dosyanın {sha256, size, mtime_ns} kaydı. Boyut ve mtime önceki kayıtla
+    aynıysa hash yeniden hesaplanmaz (değişmeyen MB'larca HTML okunmaz).
+    """
+    st = os.stat(path)
+    if previous and previous.get("size") == st.st_size and previous.get("mtime_ns") == st.st_mtime_ns:
+        return previous
+    return {"sha256": file_sha256(path), "size": st.st_size, "mtime_ns": st.st_mtime_ns}
+
+def rel(path):
+    return os.path.relpath(path, BASE_DIR).replace(os.sep, "/")
+
+def absolute(rel_path):
+    return os.path.join(BASE_DIR, *rel_path.split("/"))
+
+# =============================================================================
+# 2. MANIFEST
+# =============================================================================
+
+def load_manifest(path=MANIFEST_PATH):
+    if not os.path.exists(path):
+        return {"version": MANIFEST_VERSION, "stages": {}}
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            manifest = json.load(f)
+    except (OSError, ValueError):
+        return {"version": MANIFEST_VERSION, "stages": {}}
+    if manifest.get("version") != MANIFEST_VERSION:
+        return {"version": MANIFEST_VERSION, "stages": {}}
+    return manifest
+
+def save_manifest(manifest, path=MANIFEST_PATH):
+    """Manifest de atomik yazılır (geçici dosya + os.replace)."""
+    tmp = f"{path}.tmp"
+    with open(tmp, "w", encoding="utf-8") as f:
+        json.dump(manifest, f, ensure_ascii=False, indent=2, sort_keys=True)
+    os.replace(tmp, path)
+
+def snapshot_inputs(stage, previous):
+    """Adımın güncel girdi kayıtları {rel_path: fingerprint}."""
+    prev_inputs = (previous or {}).get("inputs", {})
+    return {rel(p): fingerprint(p, prev_inputs.get(rel(p))) for p in stage.input_paths()}
+
+def dirty_reason(stage, inputs, previous):
+    """Adım neden yeniden çalışmalı? None ise güncel."""
+    if not previous:
+        return "ilk çalıştırma"
+    old = {k: v["sha256"] for k, v in previous.get("inputs", {}).items()}
+    new = {k: v["sha256"] for k, v in inputs.items()}
+    if old != new:
+        changed = sorted(set(old) ^ set(new) | {k for k in new if k in old and old[k] != new[k]})
+        return f"{len(changed)} girdi değişti ({', '.join(changed[:3])}{', ...' if len(changed) > 3 else ''})"
+    for out in stage.outputs:
+        if rel(out) not in previous.get("outputs", {}):
+            return f"yeni çıktı ({rel(out)})"
+    for out_rel, rec in previous.get("outputs", {}).items():
+        out = absolute(out_rel)
+        if not os.path.exists(out):
+            return f"çıktı eksik ({out_rel})"
+        if fingerprint(out, rec)["sha256"] != rec["sha256"]:
+            return f"çıktı elle değiştirilmiş ({out_rel})"
+    return None
+
+# =============================================================================
+# 3. STAGES (ADIMLAR)
+# =============================================================================
+
+class Stage:
+    """
+    ETL adımı.
+    inputs: Girdi dosyaları / glob kalıpları (adımın kaynak kodu da dahil).
+    optional_inputs: Hash'e dahil edilen ama eşleşmesi şart olmayan kalıplar
+                     (örn. henüz hiç eklenmemiş eski yıl sayfaları).
+    outputs: Yayınlanan çıktı dosyaları.
+    output_dirs: İçeriği çalışmaya göre değişen çıktı dizinleri (örn. dönem
+                 bölümleri). run bu dizinlerin değişen dosyalarını staging'de
+                 aynı isimli alt dizine yazar (staged_dir); ana çıktılardan
+                 önce yayınlanır.
+    run(staged_outputs, workers): Çıktıları verilen staging yollarına yazar.
+    """
+
+    def __init__(self, name, inputs, outputs, run, optional=False, description="", unavailable=None, optional_inputs=(),
+                 output_dirs=()):
+        self.name = name
+        self.inputs = inputs
+        self.optional_inputs = list(optional_inputs)
+        self.outputs = outputs
+        self.output_dirs = list(output_dirs)
+        self.run = run
+        self.optional = optional
+        self.description = description
+        self.unavailable = unavailable  # Bağımlılık eksikse atlanma sebebi
+
+    def input_paths(self):
+        paths = set()
+        for pattern in self.inputs + self.optional_inputs:
+            paths.update(p for p in glob.glob(pattern) if os.path.isfile(p))
+        return sorted(paths)
+
+    def missing_inputs(self):
+        return [p for p in self.inputs if not glob.glob(p)]
+
+def _csv(name):
+    return os.path.join(DATA_DIR, 'csv', name)
+
+def staged_dir(staged, final_dir):
+    """Stage.output_dirs dizininin staging karşılığı (ana çıktılarla aynı staging dizininde)."""
+    return os.path.join(os.path.dirname(staged[0]), os.path.basename(final_dir))
+
+def _typed(name):
+    """CSV çıktısı + (pyarrow varsa) aynı isimli tipli Parquet kopyası."""
+    outputs = [_csv(name)]
+    if HAS_PARQUET:
+        outputs.append(_csv(os.path.splitext(name)[0] + '.parquet'))
+    return outputs
+
+def write_columnar(staged, writer):
+    """Staging'deki CSV'den Parquet kopyasını üretir (ikinci çıktı varsa)."""
+    if len(staged) > 1:
+        try:
+            import columnar
+        except ImportError:
+            from src import columnar
+        getattr(columnar, writer)(staged[0], staged[1])
+
+def run_crawl(staged, workers=None):
+    try:
+        import web_crawler
+    except ImportError:
+        from src import web_crawler
+    # Yarıda kalan tarama data/.crawl_checkpoint.jsonl'dan devam eder
+    # main() None: linkler okunamadı veya tarama başarısız (hiç sayfa yok ya da
+    # hata oranı eşiğin üstünde); aşama başarısız olur, önceki çıktı yerinde kalır
+    if web_crawler.main(output_path=staged[0]) is None:
+        raise RuntimeError("tarama başarısız (linkler okunamadı veya çok fazla sayfa alınamadı)")
+
+def run_clean(staged, workers=None):
+    try:
+        import clean_data
+    except ImportError:
+        from src import clean_data
+    clean_data.main(output_path=staged[0])
+    write_columnar(staged, "write_catalog_table")
+
+def run_fens(staged, workers=None):
+    try:
+        import parse_fens
+    except ImportError:
+        from src import parse_fens
+    parse_fens.main(workers, output_file=staged[0])
+
+def run_snapshot(staged, workers=None):
+    try:
+        import snapshot
+    except ImportError:
+        from src import snapshot
+    snapshot.build_snapshot(staged[0])
+
+def run_schedule(staged, workers=None):
+    try:
+        import schedule_delta
+    except ImportError:
+        from src import schedule_delta
+    # Yayındaki master'a CRN bazlı delta uygulanır; değişiklik raporu data/schedule_changes.json
+    delta = schedule_delta.ingest(master_path=_csv('active_schedule_master.csv'), output_path=staged[0], workers=workers)
+    if delta is None:
+        raise RuntimeError("ders programı sayfalarından veri çekilemedi")
+    print(schedule_delta.summarize(delta))
+    write_columnar(staged, "write_schedule_table")
+
+def run_history(staged, workers=None):
+    try:
+        import schedule_history
+    except ImportError:
+        from src import schedule_history
+    # Değişen dönem bölümleri (data/history/<term_code>.csv) staging'e yazılır, indeksle birlikte yayınlanır
+    report = schedule_history.ingest_pages(schedule_history.discover_pages(), index_path=staged[0],
+                                           out_dir=staged_dir(staged, schedule_history.HISTORY_DIR))
+    if not report:
+        raise RuntimeError("geçmiş için ders programı sayfası bulunamadı")
+    for code, counts in report.items():
+        print(f"   📅 {code}: +{counts['added']} -{counts['removed']} ~{counts['changed']}")
+
+STAGES = [
+    Stage(
+        "crawl",
+        inputs=[_csv('course_links_master.csv'), os.path.join(SRC_DIR, 'web_crawler.py')],
+        outputs=[_csv('course_full_data_v2.csv')],
+        run=run_crawl, optional=True,
+        description="Ders sayfalarını tara (ağ erişimi, sadece --crawl ile)",
+    ),
+    Stage(
+        "clean",
+        inputs=[_csv('course_full_data_v2.csv'), _csv('course_links_master.csv'), os.path.join(SRC_DIR, 'clean_data.py'), os.path.join(SRC_DIR, 'columnar.py')],
+        outputs=_typed('course_data_clean.csv'),
+        run=run_clean,
+        description="Ham ders verisini temizle",
+    ),
+    Stage(
+        "fens",
+        inputs=[os.path.join(DATA_DIR, 'raw_html', '*_html', '*.html'), os.path.join(SRC_DIR, 'parse_fens.py')],
+        outputs=[os.path.join(DATA_DIR, 'json', 'fens_data_raw.json')],
+        run=run_fens,
+        description="Müfredat HTML -> JSON",
+    ),
+    Stage(
+        "schedule",
+        inputs=[
+            os.path.join(DATA_DIR, 'raw_html', '*_schedule.html'),
+            *(os.path.join(SRC_DIR, f) for f in ('parse_schedule.py', 'schedule_delta.py', 'columnar.py')),
+        ],
+        outputs=_typed('active_schedule_master.csv'),
+        run=run_schedule,
+        description="Ders programı HTML -> CSV",
+    ),
+    Stage(
+        "history",
+        inputs=[
+            os.path.join(DATA_DIR, 'raw_html', '*_schedule.html'),
+            *(os.path.join(SRC_DIR, f) for f in ('parse_schedule.py', 'schedule_delta.py', 'schedule_history.py')),
+        ],
+        # Eski yıl sayfaları opsiyonel: yoksa geçmiş sadece aktif yıldan kurulur
+        optional_inputs=[os.path.join(DATA_DIR, 'raw_html', 'history', '*_schedule.html')],
+        outputs=[os.path.join(DATA_DIR, 'history', 'index.json')],
+        output_dirs=[os.path.join(DATA_DIR, 'history')],
+        run=run_history,
+        description="Çok dönemli ders programı geçmişi (dönem kodu bölümlü)",
+    ),
+    Stage(
+        "snapshot",
+        inputs=[*SNAPSHOT_SOURCES, *SNAPSHOT_CODE],
+        outputs=[os.path.join(DATA_DIR, 'app_snapshot.bin')],
+        run=run_snapshot, unavailable=None if HAS_PARQUET else "pyarrow kurulu değil",
+        description="Uygulama snapshot'ı (memory-map, pyarrow gerekir)",
+    ),
+]
+STAGE_NAMES = [s.name for s in STAGES]
+
+# =============================================================================
+# 4. RUNNER (ÇALIŞTIRICI)
+# =============================================================================
+
+def publish(staged_paths, final_paths, output_dirs=()):
+    """
+    Staging dosyalarını yerine taşır (aynı dosya sisteminde os.replace atomiktir).
+    output_dirs'in staging'deki dosyaları önce taşınır: ana çıktı (örn. indeks)
+    yayınlandığında işaret ettiği dosyalar zaten yerindedir.
+    """
+    for final_dir in output_dirs:
+        src_dir = staged_dir(staged_paths, final_dir)
+        if not os.path.isdir(src_dir):
+            continue
+        os.makedirs(final_dir, exist_ok=True)
+        for name in sorted(os.listdir(src_dir)):
+            os.replace(os.path.join(src_dir, name), os.path.join(final_dir, name))
+    for staged, final in zip(staged_paths, final_paths):
+        os.makedirs(os.path.dirname(final), exist_ok=True)
+        os.replace(staged, final)
+
+def run_pipeline(stages=None, force=(), crawl=False, dry_run=False, workers=None, manifest_path=MANIFEST_PATH):
+    """
+    Kirli adımları sırayla çalıştırır ve çıktılarını atomik yayınlar.
+    Bir adımın çıktısı sonraki adımın girdisiyse (crawl -> clean), yayından
+    sonra hash'lendiği için sonraki adım otomatik olarak kirli sayılır.
+
+    Returns:
+        list[dict]: Adım başına {stage, status, reason, seconds}.
+                    status: "ran" | "fresh" | "skipped" | "failed" | "dry-run"
+    """
+    manifest = load_manifest(manifest_path)
+    selected = set(stages or STAGE_NAMES)
+    force = set(STAGE_NAMES if "all" in force else force)
+    summary = []
+
+    for stage in STAGES:
+        if stage.name not in selected:
+            continue
+        if stage.unavailable:
+            summary.append({"stage": stage.name, "status": "skipped", "reason": stage.unavailable, "seconds": 0.0})
+            continue
+        if stage.optional and not crawl and stage.name not in force:
+            summary.append({"stage": stage.name, "status": "skipped", "reason": "--crawl verilmedi", "seconds": 0.0})
+            continue
+        missing = stage.missing_inputs()
+        if missing:
+            summary.append({"stage": stage.name, "status": "skipped", "reason": f"girdi yok ({rel(missing[0])})", "seconds": 0.0})
+            continue
+
+        previous = manifest["stages"].get(stage.name)
+        inputs = snapshot_inputs(stage, previous)
+        reason = "zorla (--force)" if stage.name in force else dirty_reason(stage, inputs, previous)
+        if reason is None:
+            if inputs != previous["inputs"]:
+                # İçerik aynı, sadece mtime değişmiş: bir sonraki kontrolde yeniden hash'lenmesin
+                previous["inputs"] = inputs
+                save_manifest(manifest, manifest_path)
+            summary.append({"stage": stage.name, "status": "fresh", "reason": "güncel", "seconds": 0.0})
+            continue
+        if dry_run:
+            summary.append({"stage": stage.name, "status": "dry-run", "reason": reason, "seconds": 0.0})
+            continue
+
+        print(f"\n▶️  [{stage.name}] {stage.description} — {reason}")
+        stage_dir = os.path.join(STAGING_DIR, f"{stage.name}-{os.getpid()}")
+        os.makedirs(stage_dir, exist_ok=True)
+        staged = [os.path.join(stage_dir, os.path.basename(p)) for p in stage.outputs]
+        t0 = time.perf_counter()
+        try:
+            stage.run(staged, workers)
+            not_written = [p for p in staged if not os.path.exists(p)]
+            if not_written:
+                raise RuntimeError(f"çıktı üretilmedi: {os.path.basename(not_written[0])}")
+            publish(staged, stage.outputs, stage.output_dirs)
+        except Exception as e:
+            summary.append({"stage": stage.name, "status": "failed", "reason": str(e), "seconds": time.perf_counter() - t0})
+            print(f"❌ [{stage.name}] başarısız, mevcut çıktılar korundu: {e}")
+            break
+        finally:
+            shutil.rmtree(stage_dir, ignore_errors=True)
+
+        manifest["stages"][stage.name] = {
+            "inputs": inputs,
+            "outputs": {rel(p): fingerprint(p) for p in stage.outputs},
+            "finished_at": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        }
+        save_manifest(manifest, manifest_path)
+        summary.append({"stage": stage.name, "status": "ran", "reason": reason, "seconds": time.perf_counter() - t0})
+
+    if os.path.isdir(STAGING_DIR) and not os.listdir(STAGING_DIR):
+        os.rmdir(STAGING_DIR)
+    return summary
+
+# =============================================================================
+# 5. MAIN EXECUTION (COMMAND LINE)
+# =============================================================================
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Artımlı ETL: sadece girdisi değişen adımları çalıştırır.")
+    parser.add_argument("stages", nargs="*", help=f"Çalıştırılacak adımlar: {', '.join(STAGE_NAMES)} (varsayılan: hepsi)")
+    parser.add_argument("--force", nargs="*", default=None, metavar="STAGE", help="Adımları zorla çalıştır (isim verilmezse seçili adımların hepsi)")
+    parser.add_argument("--crawl", action="store_true", help="Ağ taramasını (crawl) dahil et")
+    parser.add_argument("--dry-run", action="store_true", help="Sadece hangi adımların çalışacağını göster")
+    parser.add_argument("--workers", type=int, default=None, help="Paralel HTML ayrıştırma işlem sayısı")
+    args = parser.parse_args()
+    unknown = [s for s in args.stages + (args.force or []) if s not in STAGE_NAMES]
+    if unknown:
+        parser.error(f"bilinmeyen adım: {', '.join(unknown)} (geçerli: {', '.join(STAGE_NAMES)})")
+
+    force = () if args.force is None else (args.force or args.stages or ["all"])
+
+    t0 = time.perf_counter()
+    summary = run_pipeline(args.stages, force, args.crawl, args.dry_run, args.workers)
+
+    icons = {"ran": "✅", "fresh": "💤", "skipped": "⏭️", "failed": "❌", "dry-run": "📝"}
+    print("\n" + "=" * 60)
+    print("📦 ETL ÖZETİ")
+    for row in summary:
+        print(f"   {icons[row['status']]} {row['stage']:<9} {row['status']:<8} {row['seconds']:6.2f} s  {row['reason']}")
+    print(f"⏱️ Toplam: {time.perf_counter() - t0:.2f} s")
+    print("=" * 60)
+    sys.exit(1 if any(r["status"] == "failed" for r in summary) else 0)
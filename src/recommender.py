@@ -29,6 +29,12 @@ except ImportError:
             logger.warning("ML Engine bulunamadı, 0 score döndürülüyor")
             return np.zeros(len(df))
 
+# Eşdeğerlik İndeksi (CS 210 ≡ DSA 210 vb.)
+try:
+    from src.equivalence import canonical_code, canonical_set
+except ImportError:
+    from equivalence import canonical_code, canonical_set
+
 # --- KONFİGÜRASYON ---
 SCORING_WEIGHTS = {
     'graduation_urgency': 1.3,
@@ -103,6 +109,8 @@ def check_prerequisites(prereq_text: str, taken_courses: Set[str]) -> bool:
     """
     Satır bazlı çalışmak zorunda olan nadir fonksiyonlardan.
     Ancak sonucu boolean döner, hızdan tasarruf için apply içinde sadece bunu çağırırız.
+    taken_courses kanonik kodlarla verilirse (canonical_set) eşdeğer dersler
+    de ön koşulu sağlar (örn. DSA 210 alan öğrenci için CS 210 şartı).
     """
     if pd.isna(prereq_text) or str(prereq_text).lower() in ["nan", "none", "", " "]:
         return True
@@ -120,7 +128,7 @@ def check_prerequisites(prereq_text: str, taken_courses: Set[str]) -> bool:
             found = extract_codes(option)
             if not found: continue
             # Eğer opsiyondaki herhangi bir ders alındıysa bu blok tamamdır
-            if any(c in taken_courses for c in found):
+            if any(c in taken_courses or canonical_code(c) in taken_courses for c in found):
                 satisfied = True
                 break
         
@@ -301,11 +309,13 @@ def get_recommendations(
     
     # --- 2. ÖN KOŞUL (Tek Yavaş Kısım - Apply Mecbur) ---
     if 'Prerequisites' in df.columns:
+        # Eşdeğer dersler de ön koşulu sağlasın diye transkript bir kez kanonikleştirilir
+        prereq_taken = taken_set | canonical_set(taken_set)
         # Sadece dolu olanları kontrol et
         mask_has_prereq = df['Prerequisites'].notna() & (df['Prerequisites'] != "")
         # Vektörize edilemediği için apply kullanıyoruz ama sadece gerekli satırlara
         valid_prereqs = df.loc[mask_has_prereq, 'Prerequisites'].apply(
-            lambda x: check_prerequisites(x, taken_set)
+            lambda x: check_prerequisites(x, prereq_taken)
         )
         # Ön koşulu olmayanlar (True) + Ön koşulu sağlayanlar
         df = df[~mask_has_prereq | valid_prereqs].reset_index(drop=True)
@@ -393,8 +403,8 @@ def get_recommendations(
     )
     
     # 4. Scarcity Bonus (CSB)
-    # Sadece 1 dönem açılanlara bonus
-    scarcity_mask = (df['Opening_Terms'] == 1)
+    # Yılda en fazla 1 dönem açılanlara bonus (çok yıllık geçmişte oran kesirli olabilir)
+    scarcity_mask = (df['Opening_Terms'] <= 1)
     base_bonus = 5
     critical_bonus = np.where(is_critical, 10, 0)
     chain_bonus = np.where(df['Chain_Size'] > 0, 5, 0)
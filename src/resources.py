@@ -0,0 +1,322 @@
+"""
+=============================================================================
+PROJE: SABANCI UNIVERSITY SMART ADVISOR
+DOSYA: src/resources.py
+TANIM: Paylaşılan Salt-Okunur Kaynak Katmanı (Shared Resource Cache).
+       st.cache_data(ttl=3600) her erişimde DataFrame'leri pickle ile
+       kopyalıyor ve dosyalar değişmese de saatte bir yeniden yüklüyordu.
+       Bu katman her kaynağı süreç başına bir kez yükler ve tüm oturumlara
+       AYNI nesneyi döndürür (kopya yok). Nesneler salt-okunurdur: değiştirecek
+       kod önce .copy() alır.
+
+       Geçersiz kılma (ucuz parmak izi): Kaynağın bağlı olduğu dosyalar her
+       erişimde stat edilir (mtime_ns + boyut, mikro saniyeler). Sadece stat
+       değiştiyse SHA-256 hesaplanır; içerik aynıysa (touch, git checkout)
+       yeniden yükleme yapılmaz. Dosya yoksa parmak izi None'dır; dosya
+       oluşunca kaynak yeniden yüklenir.
+
+       Her kaynak için bellek kullanımı (heap: DataFrame deep memory_usage,
+       snapshot'ın çözülmüş bölümleri dahil; mmap: eşlenen dosya baytı, ayrı),
+       yükleme sayısı/süresi ve isabet oranı raporlanır (resource_stats).
+
+       Kullanım:
+           python src/resources.py --check   # Geçersiz kılma senaryoları
+           python src/resources.py --bench   # Paylaşılan nesne vs pickle kopyası
+
+YOL HARİTASI (ROADMAP):
+1. FINGERPRINT ............ Dosya parmak izi (stat -> gerekirse SHA-256)
+2. MEMORY ................. Nesne bellek tahmini
+3. REGISTRY ............... Süreç geneli kaynak kaydı ve istatistikler
+4. MAIN EXECUTION ......... Komut satırı (kontrol / benchmark)
+=============================================================================
+"""
+
+import os
+import sys
+import time
+import types
+import hashlib
+import logging
+import threading
+
+import pandas as pd
+
+logger = logging.getLogger(__name__)
+
+# =============================================================================
+# 1. FINGERPRINT (DOSYA PARMAK İZİ)
+# =============================================================================
+
+def file_sha256(path, chunk_size=1 << 20):
+    h = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(chunk_size), b""):
+            h.update(chunk)
+    return h.hexdigest()
+
+def file_fingerprint(path, previous=None):
+    """
+    Dosyanın {sha256, size, mtime_ns} kaydı (dosya yoksa None). Boyut ve
+    mtime önceki kayıtla aynıysa hash yeniden hesaplanmaz.
+    """
+    try:
+        st = os.stat(path)
+    except FileNotFoundError:
+        return None
+    if previous and previous["size"] == st.st_size and previous["mtime_ns"] == st.st_mtime_ns:
+        return previous
+    return {"sha256": file_sha256(path), "size": st.st_size, "mtime_ns": st.st_mtime_ns}
+
+def _stat_matches(path, record):
+    """Ucuz yol: sadece stat. Kayıt ve dosya durumu (var/yok, mtime, boyut) aynı mı?"""
+    try:
+        st = os.stat(path)
+    except FileNotFoundError:
+        return record is None
+    return record is not None and record["size"] == st.st_size and record["mtime_ns"] == st.st_mtime_ns
+
+# =============================================================================
+# 2. MEMORY (BELLEK TAHMİNİ)
+# =============================================================================
+
+def estimate_nbytes(obj):
+    """
+    Nesnenin bellek kullanımı (bayt): (heap, mmap).
+    DataFrame/Series deep memory_usage; nbytes() metodu olan nesneler
+    (Snapshot) için mmap eşlenen dosya boyutu, heap ise decoded() ile
+    verilen çözülmüş bölümler (to_pandas kopyaları); diğerleri iç içe
+    sys.getsizeof toplamı (konteynerler ve sınıf örneklerinin __dict__ /
+    __slots__ alanları dahil).
+    """
+    if isinstance(obj, pd.DataFrame):
+        return int(obj.memory_usage(index=True, deep=True).sum()), 0
+    if isinstance(obj, pd.Series):
+        return int(obj.memory_usage(index=True, deep=True)), 0
+    if callable(getattr(obj, "nbytes", None)):
+        decoded = obj.decoded() if callable(getattr(obj, "decoded", None)) else {}
+        return estimate_nbytes(decoded)[0], int(obj.nbytes())
+
+    total, seen, stack = 0, set(), [obj]
+    while stack:
+        item = stack.pop()
+        if id(item) in seen:
+            continue
+        seen.add(id(item))
+        if isinstance(item, (pd.DataFrame, pd.Series)):
+            total += estimate_nbytes(item)[0]
+            continue
+        total += sys.getsizeof(item)
+        if isinstance(item, dict):
+            stack.extend(item.keys())
+            stack.extend(item.values())
+        elif isinstance(item, (list, tuple, set, frozenset)):
+            stack.extend(item)
+        elif not isinstance(item, (type, types.ModuleType, types.FunctionType, types.MethodType)):
+            if hasattr(item, "__dict__"):
+                stack.append(vars(item))
+            for slot in getattr(type(item), "__slots__", ()):
+                if hasattr(item, slot):
+                    stack.append(getattr(item, slot))
+    return total, 0
+
+# =============================================================================
+# 3. REGISTRY (KAYNAK KAYDI)
+# =============================================================================
+
+# Streamlit betiği her etkileşimde baştan çalışır ama src modülleri süreçte bir
+# kez import edilir: kayıt tüm oturumlar (thread'ler) arasında paylaşılır.
+_RESOURCES = {}
+_RESOURCES_LOCK = threading.Lock()  # Kayıt sözlüğü için; yükleme kaynak başına kilitlenir
+
+class _Entry:
+    __slots__ = ("name", "paths", "lock", "value", "loaded", "fingerprints",
+                 "nbytes", "mmap_nbytes", "loads", "hits", "load_ms", "loaded_at")
+
+    def __init__(self, name, paths):
+        self.name = name
+        self.paths = tuple(paths)
+        self.lock = threading.Lock()
+        self.value = None
+        self.loaded = False
+        self.fingerprints = ()
+        self.nbytes = self.mmap_nbytes = 0
+        self.loads = self.hits = 0
+        self.load_ms = 0.0
+        self.loaded_at = None
+
+    def is_current(self):
+        """Ucuz kontrol (stat); stat değiştiyse içerik hash'i ile doğrulanır."""
+        if all(_stat_matches(p, fp) for p, fp in zip(self.paths, self.fingerprints)):
+            return True
+        current = tuple(file_fingerprint(p, fp) for p, fp in zip(self.paths, self.fingerprints))
+        same = [(a and a["sha256"]) for a in current] == [(b and b["sha256"]) for b in self.fingerprints]
+        if same:
+            self.fingerprints = current  # touch: içerik aynı, yeni stat kaydedilir
+        return same
+
+def get_resource(name, paths, loader):
+    """
+    Paylaşılan kaynağı döndürür; dosyalardan biri değiştiyse loader() ile yeniden yükler.
+    paths: Kaynağın bağlı olduğu dosyalar (yok olanlar da parmak izine dahildir).
+
+    Yeniden yükleme hata verirse ve önceki değer varsa o sunulmaya devam eder
+    (yeni parmak izi kaydedilir; dosya tekrar değişince yeniden denenir).
+    """
+    with _RESOURCES_LOCK:
+        entry = _RESOURCES.get(name)
+        if entry is None or entry.paths != tuple(paths):
+            entry = _RESOURCES[name] = _Entry(name, paths)
+
+    with entry.lock:
+        if entry.loaded and entry.is_current():
+            entry.hits += 1
+            return entry.value
+
+        fingerprints = tuple(file_fingerprint(p) for p in entry.paths)
+        t0 = time.perf_counter()
+        try:
+            value = loader()
+        except Exception as e:
+            if not entry.loaded:
+                raise
+            logger.warning(f"Kaynak '{name}' yeniden yüklenemedi, önceki sürüm kullanılıyor: {e}")
+            entry.fingerprints = fingerprints
+            return entry.value
+
+        entry.value, entry.loaded, entry.fingerprints = value, True, fingerprints
+        entry.load_ms = (time.perf_counter() - t0) * 1000
+        entry.loaded_at = time.strftime("%H:%M:%S")
+        entry.loads += 1
+        entry.nbytes, entry.mmap_nbytes = estimate_nbytes(value)
+        logger.info(f"Kaynak yüklendi: {name} ({entry.nbytes / 1e6:.2f} MB heap + {entry.mmap_nbytes / 1e6:.2f} MB mmap, "
+                    f"{entry.load_ms:.0f} ms, yükleme #{entry.loads})")
+        return value
+
+def resource_stats():
+    """
+    Kaynak başına: nbytes (heap) / mmap_nbytes / loads / hits / load_ms / loaded_at / fingerprint.
+    Memory-map'li kaynaklar (snapshot) bölümlerini ilk erişimde çözdüğü için
+    heap boyutları her raporda yeniden ölçülür.
+    """
+    with _RESOURCES_LOCK:
+        entries = list(_RESOURCES.values())
+    sizes = [estimate_nbytes(e.value) if e.mmap_nbytes else (e.nbytes, 0) for e in entries]
+    return [
+        {
+            "name": e.name,
+            "nbytes": heap,
+            "mmap_nbytes": mmap,
+            "loads": e.loads,
+            "hits": e.hits,
+            "load_ms": round(e.load_ms, 1),
+            "loaded_at": e.loaded_at,
+            "fingerprint": "".join((fp["sha256"][:4] if fp else "----") for fp in e.fingerprints),
+        }
+        for e, (heap, mmap) in zip(entries, sizes)
+    ]
+
+def clear_resources(name=None):
+    """Kaydı (veya tek kaynağı) boşaltır; sonraki erişim yeniden yükler."""
+    with _RESOURCES_LOCK:
+        if name is None:
+            _RESOURCES.clear()
+        else:
+            _RESOURCES.pop(name, None)
+
+# =============================================================================
+# 4. MAIN EXECUTION (COMMAND LINE)
+# =============================================================================
+
+def check_invalidation():
+    """Geçersiz kılma senaryoları (geçici dosya üzerinde)."""
+    import json
+    import tempfile
+
+    ok = True
+    def expect(label, cond):
+        nonlocal ok
+        ok &= bool(cond)
+        print(f"{'✅' if cond else '❌'} {label}")
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "data.json")
+        missing = os.path.join(tmp, "optional.json")
+        def write(obj):
+            with open(path, "w", encoding="utf-8") as f:
+                json.dump(obj, f)
+        def loader():
+            with open(path, "r", encoding="utf-8") as f:
+                return json.load(f)
+        def stats():
+            return next(s for s in resource_stats() if s["name"] == "demo")
+
+        write({"a": [1, 2, 3]})
+        first = get_resource("demo", [path, missing], loader)
+        expect("ilk erişim yükler", stats()["loads"] == 1)
+        expect("ikinci erişim aynı nesne (kopya yok)", get_resource("demo", [path, missing], loader) is first)
+
+        st = os.stat(path)
+        os.utime(path, ns=(st.st_atime_ns, st.st_mtime_ns + 10**9))
+        expect("touch (içerik aynı) yeniden yüklemez",
+               get_resource("demo", [path, missing], loader) is first and stats()["loads"] == 1)
+
+        write({"a": [1, 2, 3, 4]})
+        os.utime(path, ns=(st.st_atime_ns, st.st_mtime_ns + 2 * 10**9))
+        second = get_resource("demo", [path, missing], loader)
+        expect("içerik değişince yeniden yükler", second == {"a": [1, 2, 3, 4]} and stats()["loads"] == 2)
+
+        with open(missing, "w") as f:
+            f.write("{}")
+        get_resource("demo", [path, missing], loader)
+        expect("eksik dosya oluşunca yeniden yükler", stats()["loads"] == 3)
+
+        with open(path, "w") as f:
+            f.write("{bozuk")
+        os.utime(path, ns=(st.st_atime_ns, st.st_mtime_ns + 3 * 10**9))
+        expect("bozuk güncellemede önceki sürüm sunulur", get_resource("demo", [path, missing], loader) == second)
+        expect("bellek raporu", stats()["nbytes"] > 0)
+    clear_resources("demo")
+    return ok
+
+def bench_access(repeats=200):
+    """Uygulama kaynaklarına erişim: paylaşılan nesne vs st.cache_data'nın pickle kopyası."""
+    import pickle
+    try:
+        from columnar import load_schedule, load_catalog, SCHEDULE_CSV, CATALOG_CSV, parquet_path
+    except ImportError:
+        from src.columnar import load_schedule, load_catalog, SCHEDULE_CSV, CATALOG_CSV, parquet_path
+
+    resources = {
+        "schedule": ([SCHEDULE_CSV, parquet_path(SCHEDULE_CSV)], load_schedule),
+        "catalog": ([CATALOG_CSV, parquet_path(CATALOG_CSV)], load_catalog),
+    }
+    for name, (paths, loader) in resources.items():
+        value = get_resource(name, paths, loader)
+        t0 = time.perf_counter()
+        for _ in range(repeats):
+            get_resource(name, paths, loader)
+        shared_us = (time.perf_counter() - t0) / repeats * 1e6
+        blob = pickle.dumps(value, protocol=pickle.HIGHEST_PROTOCOL)
+        t0 = time.perf_counter()
+        for _ in range(max(repeats // 10, 1)):
+            pickle.loads(blob)
+        copy_us = (time.perf_counter() - t0) / max(repeats // 10, 1) * 1e6
+        print(f"   {name:<10} paylaşılan {shared_us:8.1f} µs | pickle kopyası {copy_us:9.1f} µs "
+              f"({copy_us / shared_us:5.0f}x) | ek bellek/erişim {len(blob) / 1e6:.2f} MB")
+    for s in resource_stats():
+        print(f"   📦 {s['name']:<10} {s['nbytes'] / 1e6:6.2f} MB heap + {s['mmap_nbytes'] / 1e6:.2f} MB mmap | "
+              f"{s['loads']} yükleme, {s['hits']} isabet")
+
+if __name__ == "__main__":
+    import argparse
+
+    logging.basicConfig(level=logging.WARNING)
+    parser = argparse.ArgumentParser(description="Paylaşılan kaynak katmanı: geçersiz kılma kontrolü ve benchmark.")
+    parser.add_argument("--check", action="store_true", help="Geçersiz kılma senaryolarını çalıştır")
+    parser.add_argument("--bench", action="store_true", help="Erişim maliyeti: paylaşılan nesne vs pickle kopyası")
+    args = parser.parse_args()
+
+    if args.bench:
+        bench_access()
+    if args.check or not args.bench:
+        sys.exit(0 if check_invalidation() else 1)
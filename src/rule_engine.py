@@ -0,0 +1,316 @@
+"""
+=============================================================================
+PROJE: SABANCI UNIVERSITY SMART ADVISOR
+DOSYA: src/rule_engine.py
+TANIM: Bildirimsel (Declarative) Kural Motoru.
+       major_rules.FENS_RULES içindeki kısıt tanımlarını modül yüklenirken
+       doğrular ve değerlendirici fonksiyonlara (closure) derler. Denetim
+       sırasında kural tipleri üzerinden string karşılaştırması yapılmaz;
+       her kural önceden hazırlanmış kümeler ve regex'lerle birkaç küme
+       işlemine iner. Yeni bir bölüm eklemek sadece veri (FENS_RULES +
+       müfredat JSON) gerektirir; audit_engine'de bölüm adına göre dal yoktur.
+
+       Kural Dili (constraints anahtarı -> izin verilen tipler):
+         math_logic ............ ONE_OF_DISCARD, BUNDLE_OR_DISCARD
+         core_sub_rule ......... MIN_CREDITS, MIN_COURSE_COUNT, FACULTY_DISTRIBUTION
+         core_distribution ..... (aynı) - varsa core_sub_rule sonucunu ezer
+         area_sub_rule ......... MIN_CREDITS, MIN_COURSE_COUNT, FACULTY_DISTRIBUTION
+         faculty_requirement ... GLOBAL_FACULTY_CHECK
+         <herhangi bir isim> ... ONE_OF_OVERFLOW_TO_CORE, ONE_OF_TARGET (Zorunlu kapıları)
+         hum_restriction ....... "ONLY_2XX" (string)
+         overflow_chain ........ ["core", "area", "free"] (liste)
+
+YOL HARİTASI (ROADMAP):
+1. SCHEMA ................. Kural tipleri, zorunlu alanlar ve doğrulama
+2. COMPILERS .............. Kural tipi -> değerlendirici fonksiyon
+3. MAJOR COMPILER ......... Bölüm kural setini tek yapıya derleme
+4. LOAD TIME .............. FENS_RULES'un yükleme anında derlenmesi
+=============================================================================
+"""
+
+import re
+import sys
+import os
+
+# Path ayarı (src modüllerini bulabilmesi için)
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+try:
+    from major_rules import FENS_RULES
+except ImportError:
+    from src.major_rules import FENS_RULES
+
+FACULTIES = ("FENS", "FASS", "SBS")
+
+# =============================================================================
+# 1. SCHEMA (DOĞRULAMA)
+# =============================================================================
+
+class RuleError(ValueError):
+    """Geçersiz kural tanımı (yükleme anında fırlatılır)."""
+
+# Kural tipi -> zorunlu alanlar
+RULE_FIELDS = {
+    "ONE_OF_DISCARD": ("options", "message"),
+    "BUNDLE_OR_DISCARD": ("options", "message"),
+    "ONE_OF_OVERFLOW_TO_CORE": ("options", "priority", "overflow_course"),
+    "ONE_OF_TARGET": ("options",),
+    "MIN_CREDITS": ("filter_regex", "min_value", "message"),
+    "MIN_COURSE_COUNT": ("min_value", "message"),
+    "FACULTY_DISTRIBUTION": ("pools", "min_each"),
+    "GLOBAL_FACULTY_CHECK": ("pools", "min_total", "min_each"),
+}
+
+MATH_TYPES = ("ONE_OF_DISCARD", "BUNDLE_OR_DISCARD")
+SUB_RULE_TYPES = ("MIN_CREDITS", "MIN_COURSE_COUNT", "FACULTY_DISTRIBUTION")
+GATE_TYPES = ("ONE_OF_OVERFLOW_TO_CORE", "ONE_OF_TARGET")
+
+# Sabit isimli kısıt anahtarlarının kabul ettiği tipler
+SLOT_TYPES = {
+    "math_logic": MATH_TYPES,
+    "core_sub_rule": SUB_RULE_TYPES,
+    "core_distribution": SUB_RULE_TYPES,
+    "area_sub_rule": SUB_RULE_TYPES,
+    "faculty_requirement": ("GLOBAL_FACULTY_CHECK",),
+}
+
+HUM_RESTRICTIONS = ("ONLY_2XX",)
+CHAIN_STEPS = ("core", "area", "free")
+
+def validate_rule(where, rule):
+    """Tek bir kural sözlüğünü doğrular. Hata varsa RuleError fırlatır."""
+    if not isinstance(rule, dict) or "type" not in rule:
+        raise RuleError(f"{where}: 'type' alanı olan bir sözlük olmalı.")
+    rtype = rule["type"]
+    if rtype not in RULE_FIELDS:
+        raise RuleError(f"{where}: Bilinmeyen kural tipi '{rtype}'.")
+    missing = [f for f in RULE_FIELDS[rtype] if f not in rule]
+    if missing:
+        raise RuleError(f"{where}: {rtype} için eksik alan(lar): {', '.join(missing)}")
+
+    if rtype == "MIN_COURSE_COUNT" and not (rule.get("valid_list") or rule.get("valid_regex")):
+        raise RuleError(f"{where}: MIN_COURSE_COUNT için valid_list veya valid_regex gerekli.")
+    if rtype in ("FACULTY_DISTRIBUTION", "GLOBAL_FACULTY_CHECK") and set(rule["pools"]) - set(FACULTIES):
+        raise RuleError(f"{where}: Havuzlar sadece {', '.join(FACULTIES)} olabilir.")
+    if rtype == "ONE_OF_OVERFLOW_TO_CORE":
+        for field in ("priority", "overflow_course"):
+            if rule[field] not in rule["options"]:
+                raise RuleError(f"{where}: {field} ({rule[field]}) options içinde olmalı.")
+    for field in ("filter_regex", "valid_regex"):
+        if rule.get(field):
+            try: re.compile(rule[field])
+            except re.error as e: raise RuleError(f"{where}: Geçersiz regex ({field}): {e}")
+
+def validate_constraints(major_code, constraints):
+    """Bir bölümün tüm kısıtlarını doğrular."""
+    for key, rule in constraints.items():
+        where = f"{major_code}.{key}"
+        if key == "hum_restriction":
+            if rule not in HUM_RESTRICTIONS:
+                raise RuleError(f"{where}: Bilinmeyen HUM kısıtı '{rule}'.")
+        elif key == "overflow_chain":
+            if not rule or any(step not in CHAIN_STEPS for step in rule):
+                raise RuleError(f"{where}: Sadece {CHAIN_STEPS} adımları kullanılabilir.")
+        else:
+            validate_rule(where, rule)
+            allowed = SLOT_TYPES.get(key, GATE_TYPES)
+            if rule["type"] not in allowed:
+                raise RuleError(f"{where}: Bu anahtarda {rule['type']} kullanılamaz (izinli: {', '.join(allowed)}).")
+
+# =============================================================================
+# 2. COMPILERS (KURAL -> DEĞERLENDİRİCİ)
+# =============================================================================
+
+# --- Math Kapısı: fn(taken_set) -> (ok, sayılan, atılan) ---
+
+def _compile_one_of_discard(rule):
+    options = tuple(rule["options"])
+    def check(taken_set):
+        found = [opt for opt in options if opt in taken_set]
+        if found: return True, [found[0]], found[1:]
+        return False, [], []
+    return check
+
+def _compile_bundle_or_discard(rule):
+    bundles = [list(b["courses"]) for b in rule["options"]]
+    # Tek dersli paketler öncelikli; diğer paketlerdeki dersler atılır
+    singles = []
+    for i, courses in enumerate(bundles):
+        if len(courses) == 1:
+            others = [c for j, b in enumerate(bundles) if j != i for c in b]
+            singles.append((courses[0], courses, others))
+    full = [(frozenset(courses), courses) for courses in bundles]
+    def check(taken_set):
+        for code, courses, others in singles:
+            if code in taken_set:
+                return True, courses, [c for c in others if c in taken_set]
+        for required, courses in full:
+            if required <= taken_set:
+                return True, courses, []
+        return False, [], []
+    return check
+
+# --- Alt Kurallar: fn(ders_listesi) -> (durum, mesaj) ---
+
+def _compile_min_credits(rule):
+    rx = re.compile(rule["filter_regex"])
+    min_value, message = rule["min_value"], rule["message"]
+    def check(taken_subset):
+        total_cr = sum(1 for c in taken_subset if rx.match(c)) * 3  # ders başına 3 kredi sayılır
+        if total_cr >= min_value: return True, "✅ Kural Sağlandı"
+        return False, f"⚠️ {message} (Şu an: {total_cr} kr)"
+    return check
+
+def _compile_min_course_count(rule):
+    valid = frozenset(rule.get("valid_list", []))
+    rx = re.compile(rule["valid_regex"]) if rule.get("valid_regex") else None
+    min_value, message = rule["min_value"], rule["message"]
+    def check(taken_subset):
+        count = sum(1 for c in taken_subset if c in valid or (rx and rx.match(c)))
+        if count >= min_value: return True, "✅ Kural Sağlandı"
+        return False, f"⚠️ {message}"
+    return check
+
+def compile_faculty_counter(pools):
+    """Ders listesini fakülte sayaçlarına çeviren fonksiyon (ilk eşleşen havuz: FENS > FASS > SBS)."""
+    sets = [(fac, frozenset(pools.get(fac, []))) for fac in FACULTIES]
+    def count(taken):
+        counts = {fac: 0 for fac in FACULTIES}
+        for course in taken:
+            for fac, pool in sets:
+                if course in pool:
+                    counts[fac] += 1
+                    break
+        return counts
+    return count
+
+def _compile_faculty_distribution(rule):
+    count, min_req = compile_faculty_counter(rule["pools"]), rule["min_each"]
+    def check(taken_subset):
+        missing = [f"{fac} ({n}/{min_req})" for fac, n in count(taken_subset).items() if n < min_req]
+        if missing: return False, f"⚠️ Dağılım Eksik: {', '.join(missing)}"
+        return True, "✅ Fakülte Dağılımı Tamam"
+    return check
+
+# --- Global Fakülte Kuralı: fn(tüm_dersler) -> rapor sözlüğü ---
+
+def _compile_global_faculty_check(rule):
+    count = compile_faculty_counter(rule["pools"])
+    min_total, min_each = rule["min_total"], rule["min_each"]
+    def check(all_taken):
+        counts = count(all_taken)
+        total = sum(counts.values())
+        status_msg = []
+        if total < min_total:
+            status_msg.append(f"Toplam Eksik ({total}/{min_total})")
+        status_msg.extend(f"{fac} Eksik" for fac, n in counts.items() if n < min_each)
+        return {
+            "status": "Eksik" if status_msg else "OK",
+            "message": ", ".join(status_msg) if status_msg else "Tamamlandı",
+            "detail": f"{counts} (Top: {total})"
+        }
+    return check
+
+# --- Zorunlu Kapıları: fn(taken_set, pure_reqs, taken_r, missing_r) -> taşan ders / None ---
+
+def _compile_one_of_overflow_to_core(rule):
+    priority, overflow = rule["priority"], rule["overflow_course"]
+    others = [c for c in rule["options"] if c != priority]
+    def gate(taken_set, pure_reqs, taken_r, missing_r):
+        # Öncelikli ders alındıysa Zorunlu'yu o karşılar; diğer seçenek(ler) Zorunlu'dan çıkar.
+        # Taşan ders de alındıysa Core'a sayılmak üzere serbest bırakılır.
+        if priority not in taken_set: return None
+        for c in others:
+            if c in pure_reqs: pure_reqs.remove(c)
+        taken_r.append(priority)
+        return overflow if overflow in taken_set else None
+    return gate
+
+def _compile_one_of_target(rule):
+    options = tuple(rule["options"])
+    label = " / ".join(options)
+    def gate(taken_set, pure_reqs, taken_r, missing_r):
+        for c in options:
+            if c in pure_reqs: pure_reqs.remove(c)
+        hit = next((c for c in options if c in taken_set), None)
+        if hit: taken_r.append(hit)
+        else: missing_r.append(label)
+        return None
+    return gate
+
+COMPILERS = {
+    "ONE_OF_DISCARD": _compile_one_of_discard,
+    "BUNDLE_OR_DISCARD": _compile_bundle_or_discard,
+    "MIN_CREDITS": _compile_min_credits,
+    "MIN_COURSE_COUNT": _compile_min_course_count,
+    "FACULTY_DISTRIBUTION": _compile_faculty_distribution,
+    "GLOBAL_FACULTY_CHECK": _compile_global_faculty_check,
+    "ONE_OF_OVERFLOW_TO_CORE": _compile_one_of_overflow_to_core,
+    "ONE_OF_TARGET": _compile_one_of_target,
+}
+
+def _always_ok(taken_subset):
+    return True, ""
+
+# =============================================================================
+# 3. MAJOR COMPILER (BÖLÜM KURAL SETİ)
+# =============================================================================
+
+def compile_major_rules(major_code, rules):
+    """
+    Bir bölümün kural setini doğrulayıp derler.
+
+    Returns:
+        dict: math / math_courses / math_message, gates, core_check, area_check,
+              faculty_check, hum_excluded, overflow_courses, overflow_options.
+    """
+    constraints = rules.get("constraints", {})
+    validate_constraints(major_code, constraints)
+
+    math_rule = constraints.get("math_logic")
+    math_courses = set()
+    if math_rule:
+        for opt in math_rule["options"]:
+            math_courses.update(opt["courses"] if isinstance(opt, dict) else [opt])
+
+    gates, overflow_courses, overflow_options = [], set(), []
+    for key, rule in constraints.items():
+        if isinstance(rule, dict) and rule.get("type") in GATE_TYPES:
+            gates.append(COMPILERS[rule["type"]](rule))
+            if rule["type"] == "ONE_OF_OVERFLOW_TO_CORE":
+                overflow_courses.add(rule["overflow_course"])
+                overflow_options.append(frozenset(rule["options"]))
+
+    # core_distribution varsa core_sub_rule sonucunu ezer (eski davranış)
+    core_rule = constraints.get("core_distribution") or constraints.get("core_sub_rule")
+    area_rule = constraints.get("area_sub_rule")
+    faculty_rule = constraints.get("faculty_requirement")
+
+    if constraints.get("hum_restriction") == "ONLY_2XX":
+        hum_excluded = lambda c: c.startswith("HUM") and not c.startswith("HUM 2")
+    else:
+        hum_excluded = lambda c: False
+
+    return {
+        "math": COMPILERS[math_rule["type"]](math_rule) if math_rule else None,
+        "math_courses": frozenset(math_courses),
+        "math_message": math_rule["message"] if math_rule else "",
+        "gates": gates,
+        "core_check": COMPILERS[core_rule["type"]](core_rule) if core_rule else _always_ok,
+        "area_check": COMPILERS[area_rule["type"]](area_rule) if area_rule else _always_ok,
+        "faculty_check": COMPILERS[faculty_rule["type"]](faculty_rule) if faculty_rule else None,
+        "hum_excluded": hum_excluded,
+        "overflow_courses": frozenset(overflow_courses),
+        "overflow_options": overflow_options,
+    }
+
+# =============================================================================
+# 4. LOAD TIME (YÜKLEME ANINDA DERLEME)
+# =============================================================================
+
+# Hatalı bir kural tanımı uygulama açılırken RuleError ile yakalanır.
+COMPILED_RULES = {major: compile_major_rules(major, rules) for major, rules in FENS_RULES.items()}
+
+def get_compiled_rules(major_code):
+    """Derlenmiş kural seti (bölüm yoksa None)."""
+    return COMPILED_RULES.get(major_code)
@@ -0,0 +1,297 @@
+"""
+=============================================================================
+PROJE: SABANCI UNIVERSITY SMART ADVISOR
+DOSYA: src/schedule_delta.py
+TANIM: CRN Bazlı Artımlı Ders Programı Güncellemesi (Delta Ingest).
+       Yeni kaydedilen BannerWeb sayfası ayrıştırılır ve kayıtlı
+       active_schedule_master.csv ile (Term, CRN) anahtarıyla karşılaştırılır.
+       Master dosya baştan yazılmak yerine sadece eklenen / silinen / değişen
+       şubeler uygulanır (upsert + delete); değişmeyen satırların sırası ve
+       baytları korunur.
+
+       Değişiklik raporu (data/schedule_changes.json):
+           added / removed  : Şube listesi (term, crn, course, section)
+           changed          : Şube başına sadece değişen alanlar
+                              (time, room, instructor, course) eski/yeni
+           affected_courses : Etkilenen ders kodları. Ders bazlı önbellekler
+                              (zaman maskeleri, arama indeksi, recommender
+                              özellikleri) sadece bunları geçersiz kılabilir.
+
+       Sadece yeni sayfalarda bulunan dönemler karşılaştırılır; başka
+       dönemin satırlarına dokunulmaz (tek dönem sayfası eklemek güvenlidir).
+
+       Kullanım:
+           python src/schedule_delta.py                       # FILES_TO_PROCESS
+           python src/schedule_delta.py --page yeni.html Spring
+           python src/schedule_delta.py --dry-run             # Sadece rapor
+
+YOL HARİTASI (ROADMAP):
+1. SECTION INDEX .......... Satırları (Term, CRN) şubelerine gruplama
+2. DIFF ................... Eklenen / silinen / değişen şubeler
+3. APPLY .................. Delta'nın master tabloya uygulanması
+4. INGEST ................. Ayrıştır -> karşılaştır -> uygula -> raporla
+5. MAIN EXECUTION ......... Komut satırı arayüzü
+=============================================================================
+"""
+
+import os
+import sys
+import json
+import time
+import shutil
+
+import pandas as pd
+
+# Path ayarı (src modüllerini bulabilmesi için)
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+try:
+    from parse_schedule import parse_terms, FILES_TO_PROCESS, OUTPUT_PATH
+except ImportError:
+    from src.parse_schedule import parse_terms, FILES_TO_PROCESS, OUTPUT_PATH
+
+# --- AYARLAR ---
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+CHANGES_PATH = os.path.join(BASE_DIR, 'data', 'schedule_changes.json')
+
+COLUMNS = ['Term', 'Course Code', 'Section', 'CRN', 'Course Name', 'Time', 'Days', 'Location', 'Instructor']
+
+# Rapor alanı -> karşılaştırılan kolonlar (toplantı başına)
+FIELDS = {
+    "time": ('Days', 'Time'),
+    "room": ('Location',),  # Toplantı (Days, Time) başına karşılaştırılır, bkz. room_changes
+    "instructor": ('Instructor',),
+    "course": ('Course Code', 'Section', 'Course Name'),
+}
+
+# =============================================================================
+# 1. SECTION INDEX (ŞUBE İNDEKSİ)
+# =============================================================================
+
+_COL = {c: i for i, c in enumerate(COLUMNS)}
+
+def to_rows(df):
+    """Karşılaştırma için satır tuple'ları: tüm kolonlar string, eksikler ''."""
+    if df is None or df.empty:
+        return []
+    return list(df[COLUMNS].fillna('').astype(str).itertuples(index=False, name=None))
+
+def section_index(rows):
+    """
+    {(term, crn): [satır tuple'ları]} (ilk görülme sırası korunur).
+    Bir şubenin her toplantısı (gün/saat/derslik) ayrı satırdır.
+    """
+    index = {}
+    term_i, crn_i = _COL['Term'], _COL['CRN']
+    for row in rows:
+        index.setdefault((row[term_i], row[crn_i]), []).append(row)
+    return index
+
+def field_values(rows, cols):
+    """Şubenin bir alanındaki değerler: toplantıların sıralı, tekrarsız listesi."""
+    idx = [_COL[c] for c in cols]
+    return sorted({" ".join(row[i] for i in idx if row[i]) for row in rows})
+
+def meeting_slots(rows):
+    """{(gün, saat): sıralı derslikler} (aynı saatte birden çok derslik olabilir)."""
+    day_i, time_i, loc_i = _COL['Days'], _COL['Time'], _COL['Location']
+    slots = {}
+    for row in rows:
+        slots.setdefault((row[day_i], row[time_i]), set()).add(row[loc_i])
+    return {slot: sorted(locs) for slot, locs in slots.items()}
+
+# =============================================================================
+# 2. DIFF (KARŞILAŞTIRMA)
+# =============================================================================
+
+def _meeting_label(slot, locations):
+    return " ".join(v for v in (*slot, ", ".join(l for l in locations if l)) if v)
+
+def room_changes(old_rows, new_rows):
+    """
+    Derslik değişimi toplantı başına: aynı (gün, saat) toplantısının dersliği
+    farklıysa. Sadece saati değişen şube derslik değişimi sayılmaz. Saati
+    değişen toplantılar (toplantı sayısı aynıysa) sıralı eşlenir; böylece
+    hem saati hem dersliği değişen toplantı da yakalanır.
+
+    Returns:
+        {"old": [...], "new": [...]} (derslik değişmediyse None)
+    """
+    old_slots, new_slots = meeting_slots(old_rows), meeting_slots(new_rows)
+    pairs = [(slot, slot) for slot in old_slots if slot in new_slots]
+    only_old = sorted(s for s in old_slots if s not in new_slots)
+    only_new = sorted(s for s in new_slots if s not in old_slots)
+    if len(only_old) == len(only_new):
+        pairs.extend(zip(only_old, only_new))
+
+    old_v, new_v = [], []
+    for o, n in sorted(pairs):
+        if old_slots[o] != new_slots[n]:
+            old_v.append(_meeting_label(o, old_slots[o]))
+            new_v.append(_meeting_label(n, new_slots[n]))
+    return {"old": old_v, "new": new_v} if old_v else None
+
+def _section_ref(key, rows):
+    first = rows[0]
+    return {"term": key[0], "crn": key[1], "course": first[_COL['Course Code']], "section": first[_COL['Section']]}
+
+def diff_schedules(old_df, new_df):
+    """
+    Eski master ile yeni ayrıştırmayı karşılaştırır.
+    Sadece yeni ayrıştırmada bulunan dönemler dikkate alınır.
+
+    Returns:
+        dict: {terms, added, removed, changed, unchanged, affected_courses}
+    """
+    new_index = section_index(to_rows(new_df))
+    terms = sorted({term for term, _ in new_index})
+    old_index = {k: v for k, v in section_index(to_rows(old_df)).items() if k[0] in terms}
+
+    added = [_section_ref(k, rows) for k, rows in new_index.items() if k not in old_index]
+    removed = [_section_ref(k, rows) for k, rows in old_index.items() if k not in new_index]
+    changed, unchanged = [], 0
+    affected = {e["course"] for e in added + removed}
+    for key, new_rows in new_index.items():
+        old_rows = old_index.get(key)
+        if old_rows is None:
+            continue
+        if old_rows == new_rows:
+            unchanged += 1
+            continue
+        fields = {}
+        for name, cols in FIELDS.items():
+            if name == "room":
+                change = room_changes(old_rows, new_rows)
+                if change:
+                    fields[name] = change
+                continue
+            old_v, new_v = field_values(old_rows, cols), field_values(new_rows, cols)
+            if old_v != new_v:
+                fields[name] = {"old": old_v, "new": new_v}
+        if not fields:
+            # Aynı toplantılar, farklı satır sırası/tekrar sayısı
+            fields["meetings"] = {"old": len(old_rows), "new": len(new_rows)}
+        entry = _section_ref(key, new_rows)
+        entry["fields"] = fields
+        changed.append(entry)
+        # Şube başka derse taşındıysa eski ders de etkilenir
+        affected.update((entry["course"], old_rows[0][_COL['Course Code']]))
+
+    return {
+        "terms": terms,
+        "added": added,
+        "removed": removed,
+        "changed": changed,
+        "unchanged": unchanged,
+        "affected_courses": sorted(affected),
+    }
+
+def is_empty(delta):
+    return not (delta["added"] or delta["removed"] or delta["changed"])
+
+# =============================================================================
+# 3. APPLY (UYGULAMA)
+# =============================================================================
+
+def apply_delta(old_df, new_df, delta):
+    """
+    Delta'yı master tabloya uygular.
+    - Değişmeyen şubeler: eski satırlar aynı yerde kalır.
+    - Değişen şubeler: yeni satırlar eski şubenin ilk satırının yerine girer.
+    - Silinen şubeler: satırları atılır.
+    - Eklenen şubeler: yeni ayrıştırmadaki sırayla sona eklenir.
+    """
+    new_index = section_index(to_rows(new_df))
+    removed = {(e["term"], e["crn"]) for e in delta["removed"]}
+    changed = {(e["term"], e["crn"]) for e in delta["changed"]}
+
+    rows = []
+    for key, old_rows in section_index(to_rows(old_df)).items():
+        if key in removed:
+            continue
+        rows.extend(new_index[key] if key in changed else old_rows)
+    for e in delta["added"]:
+        rows.extend(new_index[(e["term"], e["crn"])])
+    return pd.DataFrame(rows, columns=COLUMNS)
+
+# =============================================================================
+# 4. INGEST (İÇE ALMA)
+# =============================================================================
+
+def read_master(path):
+    if not os.path.exists(path):
+        return pd.DataFrame(columns=COLUMNS)
+    return pd.read_csv(path, dtype=str, keep_default_na=False, encoding='utf-8-sig')
+
+def ingest(files=FILES_TO_PROCESS, master_path=OUTPUT_PATH, output_path=None,
+           report_path=CHANGES_PATH, workers=None, dry_run=False):
+    """
+    Sayfaları ayrıştırır, master ile karşılaştırır ve delta'yı uygular.
+    output_path: Güncellenen master'ın yazılacağı yol (varsayılan: master_path).
+                 Değişiklik yoksa master baytları aynen kopyalanır.
+
+    Returns:
+        dict: Değişiklik raporu (ayrıştırma boşsa None).
+    """
+    output_path = output_path or master_path
+    new_df = parse_terms(files, workers)
+    if new_df.empty:
+        print("❌ Hiçbir dosyadan veri çekilemedi, master değiştirilmedi.")
+        return None
+
+    old_df = read_master(master_path)
+    delta = diff_schedules(old_df, new_df)
+    delta["generated_at"] = time.strftime("%Y-%m-%dT%H:%M:%S")
+    if dry_run:
+        return delta
+
+    os.makedirs(os.path.dirname(output_path), exist_ok=True)
+    if is_empty(delta) and os.path.exists(master_path):
+        if os.path.abspath(output_path) != os.path.abspath(master_path):
+            shutil.copyfile(master_path, output_path)
+    else:
+        merged = apply_delta(old_df, new_df, delta)
+        tmp = f"{output_path}.tmp"
+        merged.to_csv(tmp, index=False, encoding='utf-8-sig')
+        os.replace(tmp, output_path)
+
+    if report_path:
+        os.makedirs(os.path.dirname(report_path), exist_ok=True)
+        with open(report_path, "w", encoding="utf-8") as f:
+            json.dump(delta, f, ensure_ascii=False, indent=1)
+    return delta
+
+def summarize(delta):
+    lines = [f"📊 Dönemler: {', '.join(delta['terms'])} | "
+             f"+{len(delta['added'])} eklenen, -{len(delta['removed'])} silinen, "
+             f"~{len(delta['changed'])} değişen, {delta['unchanged']} aynı şube"]
+    for e in delta["changed"][:10]:
+        lines.append(f"   ~ {e['term']} {e['course']} {e['section']} (CRN {e['crn']}): {', '.join(e['fields'])}")
+    if len(delta["changed"]) > 10:
+        lines.append(f"   ... +{len(delta['changed']) - 10} değişen şube")
+    lines.append(f"🎯 Etkilenen ders: {len(delta['affected_courses'])}")
+    return "\n".join(lines)
+
+# =============================================================================
+# 5. MAIN EXECUTION (COMMAND LINE)
+# =============================================================================
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Ders programı sayfalarını master CSV'ye CRN bazlı delta olarak uygular.")
+    parser.add_argument("--page", nargs=2, action="append", metavar=("HTML", "TERM"),
+                        help="Ayrıştırılacak sayfa ve dönem etiketi (tekrarlanabilir; varsayılan: FILES_TO_PROCESS)")
+    parser.add_argument("--master", default=OUTPUT_PATH, help="Master schedule CSV")
+    parser.add_argument("--report", default=CHANGES_PATH, help="Değişiklik raporu (JSON)")
+    parser.add_argument("--dry-run", action="store_true", help="Master'ı değiştirme, sadece raporu göster")
+    parser.add_argument("--workers", type=int, default=None)
+    args = parser.parse_args()
+
+    files = [tuple(p) for p in args.page] if args.page else FILES_TO_PROCESS
+    t0 = time.perf_counter()
+    delta = ingest(files, args.master, report_path=None if args.dry_run else args.report,
+                   workers=args.workers, dry_run=args.dry_run)
+    if delta is None:
+        sys.exit(1)
+    print(summarize(delta))
+    print(f"⏱️ {time.perf_counter() - t0:.2f} s" + ("" if args.dry_run else f" | 💾 {args.master}"))
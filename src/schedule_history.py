@@ -0,0 +1,279 @@
+"""
+=============================================================================
+PROJE: SABANCI UNIVERSITY SMART ADVISOR
+DOSYA: src/schedule_history.py
+TANIM: Çok Dönemli Ders Programı Geçmişi (Term Code Bölümlü).
+       parse_schedule sadece tek akademik yılı (Fall/Spring etiketleri)
+       işler; recommender'ın "nadir ders" sinyali (Opening_Terms) bu yüzden
+       tek yılın groupby(...).nunique() sonucundan geliyordu. Bu modül
+       birçok yılın BannerWeb sayfalarını dönem koduna (SU formatı:
+       202401 = 2024-2025 Fall, 202402 = Spring, 202403 = Summer) göre
+       bölümlenmiş bir depoya alır.
+
+       Depo (data/history/):
+           <term_code>.csv  : Dönemin şube satırları (schedule master ile aynı kolonlar)
+           index.json       : Dönem başına ders listesi + bölüm hash'i
+
+       Dönem bölümü schedule_delta ile CRN bazlı güncellenir; değişmeyen
+       bölüm yeniden yazılmaz ve indeksi yeniden okunmaz. Uygulama sadece
+       index.json'u okur: ders başına açılma sayısı, yıllık açılma sıklığı
+       ve son açıldığı dönem yükleme anında sözlüklere hesaplanır (O(1)
+       sorgu), geçmiş istek başına taranmaz.
+
+       Kullanım:
+           python src/schedule_history.py                     # raw_html + raw_html/history
+           python src/schedule_history.py --page eski.html 202302
+           python src/schedule_history.py --course "CS 201"   # Sorgu
+
+YOL HARİTASI (ROADMAP):
+1. TERM CODES ............. Dönem kodu <-> dosya adı / etiket
+2. INGEST ................. Sayfa -> dönem bölümü (CRN delta) -> indeks
+3. INDEX .................. Ders başına sıklık / son açılma (O(1) sorgu)
+4. MAIN EXECUTION ......... Komut satırı arayüzü
+=============================================================================
+"""
+
+import os
+import re
+import sys
+import glob
+import json
+import time
+import hashlib
+
+import pandas as pd
+
+# Path ayarı (src modüllerini bulabilmesi için)
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+# Not: parse_schedule / schedule_delta (bs4, lxml) sadece içe alma sırasında
+# import edilir; uygulama bu modülü yalnızca indeksi okumak için yükler.
+
+# --- AYARLAR ---
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+HTML_DIR = os.path.join(BASE_DIR, 'data', 'raw_html')
+HISTORY_DIR = os.path.join(BASE_DIR, 'data', 'history')
+INDEX_PATH = os.path.join(HISTORY_DIR, 'index.json')
+# Aktif yılın sayfaları raw_html'de, eski yıllarınki raw_html/history altında durur
+PAGE_PATTERNS = (
+    os.path.join(HTML_DIR, '*_schedule.html'),
+    os.path.join(HTML_DIR, 'history', '*_schedule.html'),
+)
+INDEX_VERSION = 1
+
+SEASONS = {"fall": "01", "spring": "02", "summer": "03"}
+SEASON_NAMES = {v: k.capitalize() for k, v in SEASONS.items()}
+REGULAR_SEASONS = ("01", "02")  # Yıllık açılma sıklığında yaz okulu sayılmaz
+
+PAGE_NAME_RE = re.compile(r"(\d{4})-(\d{4})_(fall|spring|summer)_schedule\.html$", re.IGNORECASE)
+
+# =============================================================================
+# 1. TERM CODES (DÖNEM KODLARI)
+# =============================================================================
+
+def term_code(year, season):
+    """(2024, "fall") -> "202401". year: akademik yılın başladığı yıl."""
+    return f"{int(year)}{SEASONS[season.lower()]}"
+
+def term_code_from_filename(path):
+    """"2024-2025_spring_schedule.html" -> "202402" (kalıba uymuyorsa None)."""
+    m = PAGE_NAME_RE.search(os.path.basename(path))
+    return term_code(m.group(1), m.group(3)) if m else None
+
+def term_label(code):
+    """"202402" -> "Spring 2024-2025"."""
+    year = int(code[:4])
+    return f"{SEASON_NAMES.get(code[4:], code[4:])} {year}-{year + 1}"
+
+def discover_pages(patterns=PAGE_PATTERNS):
+    """Dosya adından dönem kodu çıkan tüm sayfalar: [(yol, dönem kodu)] (koda göre sıralı)."""
+    pages = {}
+    for pattern in patterns:
+        for path in glob.glob(pattern):
+            code = term_code_from_filename(path)
+            if code:
+                pages[code] = path
+    return [(pages[c], c) for c in sorted(pages)]
+
+# =============================================================================
+# 2. INGEST (İÇE ALMA)
+# =============================================================================
+
+def partition_path(code, history_dir=HISTORY_DIR):
+    return os.path.join(history_dir, f"{code}.csv")
+
+def file_sha256(path):
+    with open(path, "rb") as f:
+        return hashlib.sha256(f.read()).hexdigest()
+
+def load_index_file(path=INDEX_PATH):
+    if not os.path.exists(path):
+        return {"version": INDEX_VERSION, "terms": {}}
+    with open(path, "r", encoding="utf-8") as f:
+        data = json.load(f)
+    if data.get("version") != INDEX_VERSION:
+        return {"version": INDEX_VERSION, "terms": {}}
+    return data
+
+def partition_entry(path):
+    """Bölümün indeks kaydı: ders kodları (sıralı, tekrarsız), şube sayısı, hash."""
+    df = pd.read_csv(path, dtype=str, keep_default_na=False, encoding='utf-8-sig')
+    return {
+        "courses": sorted(set(df['Course Code'])),
+        "sections": int(df['CRN'].nunique()),
+        "sha256": file_sha256(path),
+    }
+
+def ingest_pages(pages, history_dir=HISTORY_DIR, index_path=None, out_dir=None):
+    """
+    Sayfaları dönem bölümlerine CRN delta'sı olarak uygular ve indeksi günceller.
+    Aynı dönemin sayfası tekrar gelirse bölüm güncellenir (upsert/delete).
+    index_path: İndeksin yazılacağı yol (varsayılan: history_dir/index.json;
+                önceki indeks her zaman history_dir'den okunur).
+    out_dir: Değişen bölümlerin yazılacağı dizin (varsayılan: history_dir,
+             yerinde). Pipeline staging dizini verir; bölümler indeksle
+             birlikte yayınlanır. İndeks out_dir'deki yeni bölümlerle kurulur.
+
+    Returns:
+        dict: {term_code: delta özeti} (sayfası ayrıştırılamayan dönem atlanır)
+    """
+    try:
+        from parse_schedule import parse_terms
+        from schedule_delta import diff_schedules, apply_delta, read_master, is_empty
+    except ImportError:
+        from src.parse_schedule import parse_terms
+        from src.schedule_delta import diff_schedules, apply_delta, read_master, is_empty
+
+    index_path = index_path or os.path.join(history_dir, 'index.json')
+    out_dir = out_dir or history_dir
+    os.makedirs(out_dir, exist_ok=True)
+    index = load_index_file(os.path.join(history_dir, 'index.json'))
+    report = {}
+
+    for path, code in pages:
+        new_df = parse_terms([(path, code)], workers=1)
+        if new_df.empty:
+            continue
+        part = partition_path(code, history_dir)
+        old_df = read_master(part)
+        delta = diff_schedules(old_df, new_df)
+        if not is_empty(delta) or not os.path.exists(part):
+            out = partition_path(code, out_dir)
+            tmp = f"{out}.tmp"
+            apply_delta(old_df, new_df, delta).to_csv(tmp, index=False, encoding='utf-8-sig')
+            os.replace(tmp, out)
+        report[code] = {k: len(delta[k]) for k in ("added", "removed", "changed")}
+
+    # İndeks: hash'i değişmeyen bölümün kaydı yeniden kullanılır
+    parts = {}
+    for folder in (history_dir, out_dir):  # out_dir'deki yeni bölüm eskisinin yerine geçer
+        for part in glob.glob(os.path.join(folder, '[0-9]' * 6 + '.csv')):
+            parts[os.path.basename(part)[:6]] = part
+    terms = {}
+    for code, part in sorted(parts.items()):
+        previous = index["terms"].get(code)
+        if previous and previous.get("sha256") == file_sha256(part):
+            terms[code] = previous
+        else:
+            terms[code] = partition_entry(part)
+    index = {"version": INDEX_VERSION, "generated_at": time.strftime("%Y-%m-%dT%H:%M:%S"), "terms": terms}
+
+    tmp = f"{index_path}.tmp"
+    with open(tmp, "w", encoding="utf-8") as f:
+        json.dump(index, f, ensure_ascii=False, separators=(",", ":"))
+    os.replace(tmp, index_path)
+    return report
+
+# =============================================================================
+# 3. INDEX (SORGULAR)
+# =============================================================================
+
+class HistoryIndex:
+    """
+    index.json'dan kurulan salt-okunur sorgu yapısı. Tüm sorgular sözlük
+    erişimidir; yükleme maliyeti (dönem x ders) bir kez ödenir.
+    """
+
+    def __init__(self, index):
+        self.terms = sorted(index.get("terms", {}))
+        self.offering_count = {}   # Ders -> açıldığı dönem sayısı (yaz dahil)
+        self.first_offered = {}
+        self.last_offered = {}
+        regular = {}               # Ders -> açıldığı Fall/Spring dönem sayısı
+        for code in self.terms:    # Kronolojik: son yazılan en son dönemdir
+            is_regular = code[4:] in REGULAR_SEASONS
+            for course in index["terms"][code]["courses"]:
+                self.offering_count[course] = self.offering_count.get(course, 0) + 1
+                self.first_offered.setdefault(course, code)
+                self.last_offered[course] = code
+                if is_regular:
+                    regular[course] = regular.get(course, 0) + 1
+
+        # Yıllık açılma sıklığı: dersin ilk açıldığı yıldan bu yana kapsanan
+        # akademik yıl başına Fall/Spring açılma sayısı (yeni dersler cezalanmaz)
+        years = sorted({int(c[:4]) for c in self.terms if c[4:] in REGULAR_SEASONS})
+        self.openings_per_year = {}
+        for course, n in regular.items():
+            first_year = int(self.first_offered[course][:4])
+            covered = sum(1 for y in years if y >= first_year) or 1
+            self.openings_per_year[course] = n / covered
+
+    def __len__(self):
+        return len(self.terms)
+
+    def __contains__(self, course):
+        return course in self.offering_count
+
+    def lookup(self, course):
+        """Tek ders özeti (hiç açılmadıysa None)."""
+        if course not in self.offering_count:
+            return None
+        return {
+            "offerings": self.offering_count[course],
+            "openings_per_year": self.openings_per_year.get(course, 0.0),
+            "first_offered": self.first_offered[course],
+            "last_offered": self.last_offered[course],
+        }
+
+    def opening_terms(self, codes):
+        """Recommender'ın Opening_Terms kolonu: yıllık açılma sıklığı (geçmişte yoksa NaN)."""
+        return pd.Series(codes).map(self.openings_per_year)
+
+def load_history_index(path=INDEX_PATH):
+    """İndeks yoksa veya boşsa None (çağıran tek yıllık schedule'a düşer)."""
+    index = load_index_file(path)
+    if not index["terms"]:
+        return None
+    return HistoryIndex(index)
+
+# =============================================================================
+# 4. MAIN EXECUTION (COMMAND LINE)
+# =============================================================================
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Çok dönemli ders programı geçmişi (dönem kodu bölümlü).")
+    parser.add_argument("--page", nargs=2, action="append", metavar=("HTML", "TERM_CODE"),
+                        help="Sayfa ve dönem kodu, örn. 2023-2024_fall.html 202301 (varsayılan: raw_html'deki sayfalar)")
+    parser.add_argument("--course", action="append", help="Ders geçmişi sorgusu (örn. \"CS 201\")")
+    args = parser.parse_args()
+
+    if not args.course or args.page:
+        pages = [(os.path.abspath(p[0]), p[1]) for p in args.page] if args.page else discover_pages()
+        bad = [c for _, c in pages if not re.fullmatch(r"\d{4}0[123]", c)]
+        if bad:
+            parser.error(f"geçersiz dönem kodu: {', '.join(bad)} (örn. 202401, 202402, 202403)")
+        t0 = time.perf_counter()
+        report = ingest_pages(pages)
+        for code, counts in report.items():
+            print(f"   📅 {code} ({term_label(code)}): +{counts['added']} -{counts['removed']} ~{counts['changed']}")
+        print(f"✅ {len(report)} sayfa işlendi ({time.perf_counter() - t0:.2f} s) | 💾 {INDEX_PATH}")
+
+    history = load_history_index()
+    if history is None:
+        print("⚠️ Geçmiş deposu boş.")
+        sys.exit(0)
+    print(f"📚 {len(history)} dönem: {', '.join(history.terms)} | {len(history.offering_count)} ders")
+    for course in args.course or []:
+        info = history.lookup(" ".join(course.upper().split()))
+        print(f"   🔎 {course}: {info if info else 'geçmişte açılmamış'}")
@@ -0,0 +1,457 @@
+"""
+=============================================================================
+PROJE: SABANCI UNIVERSITY SMART ADVISOR
+DOSYA: src/snapshot.py
+TANIM: Önceden Derlenmiş Uygulama Snapshot'ı (Memory-Mapped).
+       Her Streamlit süreci açılışta aynı türetilmiş yapıları yeniden
+       kuruyordu: fens_data_raw.json'dan katalog DataFrame'i, keyword
+       haritası, hoca/gün temizliği, Is_Main bayrakları ve ön koşul ters
+       indeksi. Bu modül hepsini çevrimdışı tek bir versiyonlu dosyaya yazar;
+       uygulama dosyayı pyarrow.memory_map ile açar.
+
+       Bellek: Eşlenen dosya sayfaları (Arrow IPC tamponları) N süreç
+       arasında işletim sistemi önbelleğinden paylaşılır. Ancak uygulama
+       pandas DataFrame'i kullandığı için bölüm ilk erişimde to_pandas() ile
+       çözülür; bu, süreç başına bir heap kopyasıdır (özellikle string
+       kolonları). Kazanç bellek değil, açılışta JSON/CSV ayrıştırma ve
+       türetme süresidir. --check eşlenen ve çözülmüş boyutları ayrı raporlar.
+
+       Tutarlılık: Başlıkta tek bir parmak izi (fingerprint) vardır: format
+       versiyonu + kaynak veri dosyalarının + türetme kodunun SHA-256'sı.
+       Kaynaklardan biri değiştiyse snapshot bayat sayılır ve uygulama
+       normal yükleyicilere döner.
+
+       Dosya düzeni:
+           MAGIC (8 bayt) | başlık uzunluğu (uint64 LE) | başlık JSON |
+           64 bayt hizalı bölümler (Arrow IPC stream veya JSON)
+
+       Kullanım:
+           python src/snapshot.py            # data/app_snapshot.bin üret
+           python src/snapshot.py --check    # Snapshot vs normal yükleme
+
+YOL HARİTASI (ROADMAP):
+1. DERIVATIONS ............ Uygulamanın türettiği yapılar (tek kaynak)
+2. FINGERPRINT ............ Kaynak dosyalar ve tek parmak izi
+3. FORMAT ................. Bölüm yazma (Arrow IPC / JSON, hizalı)
+4. BUILD .................. Snapshot üretimi (çevrimdışı adım)
+5. OPEN ................... Memory-map ile açma ve tazelik kontrolü
+6. MAIN EXECUTION ......... Komut satırı (üretim / karşılaştırma)
+=============================================================================
+"""
+
+import os
+import re
+import sys
+import json
+import struct
+import hashlib
+
+import pandas as pd
+
+# Path ayarı (src modüllerini bulabilmesi için)
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+try:
+    from columnar import load_schedule, load_catalog, load_catalog_text, map_categories, SCHEDULE_CSV, CATALOG_CSV
+    from utils import build_dependents_index
+except ImportError:
+    from src.columnar import load_schedule, load_catalog, load_catalog_text, map_categories, SCHEDULE_CSV, CATALOG_CSV
+    from src.utils import build_dependents_index
+
+# pyarrow opsiyonel: yoksa snapshot üretilemez/açılamaz, uygulama normal yükler
+try:
+    import pyarrow as pa
+    HAS_ARROW = True
+except ImportError:
+    HAS_ARROW = False
+
+# --- AYARLAR ---
+SRC_DIR = os.path.dirname(os.path.abspath(__file__))
+BASE_DIR = os.path.dirname(SRC_DIR)
+JSON_DIR = os.path.join(BASE_DIR, 'data', 'json')
+FENS_JSON = os.path.join(JSON_DIR, 'fens_data_raw.json')
+MAJORS_JSON = os.path.join(JSON_DIR, 'undergrad_majors.json')
+MINORS_JSON = os.path.join(JSON_DIR, 'undergrad_minors.json')
+SNAPSHOT_PATH = os.path.join(BASE_DIR, 'data', 'app_snapshot.bin')
+
+MAGIC = b"SASNAP\x00\x01"
+SNAPSHOT_VERSION = 1
+ALIGN = 64
+
+# Snapshot içeriğini belirleyen dosyalar (veri + türetme kodu). Tek kaynak:
+# pipeline'ın snapshot adımı da girdilerini buradan alır. Türetme kodu,
+# türetmelerin import ettiği tüm src modülleridir (dependents bölümü
+# equivalence -> major_rules.COURSE_EQUIVALENCES tablosunu kullanır);
+# --check eksik modülü raporlar.
+SOURCE_FILES = (FENS_JSON, SCHEDULE_CSV, CATALOG_CSV, MAJORS_JSON, MINORS_JSON)
+CODE_MODULES = ('snapshot.py', 'columnar.py', 'utils.py', 'equivalence.py', 'major_rules.py')
+CODE_FILES = tuple(os.path.join(SRC_DIR, f) for f in CODE_MODULES)
+
+# Tab 2/3'ün schedule'dan okuduğu kolonlar
+SCHEDULE_COLUMNS = ['Term', 'Course Code', 'Section', 'CRN', 'Course Name', 'Time', 'Days', 'Location', 'Instructor']
+
+DAY_NAMES = {'M': 'Pazartesi', 'T': 'Salı', 'W': 'Çarşamba', 'R': 'Perşembe', 'F': 'Cuma'}
+
+# =============================================================================
+# 1. DERIVATIONS (TÜRETİLMİŞ YAPILAR)
+# =============================================================================
+# app.py ve snapshot aynı fonksiyonları kullanır; snapshot'tan gelen yapı ile
+# normal yükleyicinin ürettiği yapı birebir aynıdır.
+
+def clean_instructor_name(name_str):
+    """
+    Hoca isimlerini Regex ile temizler.
+    Her türlü boşluğu (tab, non-breaking space) tek boşluğa indirir.
+    """
+    if pd.isna(name_str) or str(name_str).strip() == "":
+        return "Unknown"
+
+    text = str(name_str).replace('"', '').replace("'", "")
+
+    parts = text.split(',')
+
+    cleaned_parts = []
+    for p in parts:
+        clean_name = re.sub(r'\s+', ' ', p).strip()
+
+        if clean_name:
+            cleaned_parts.append(clean_name)
+
+    return ", ".join(cleaned_parts)
+
+def extract_program_keywords(data):
+    """
+    JSON verisinden program anahtar kelimelerini (keywords) çıkarır.
+    Hiyerarşik (Faculties -> Programs) yapıyı destekler.
+    """
+    keywords = {}
+
+    # 1. Durum: Eski Düz Format (Backup)
+    # { "Program Adı": { "keywords": [...] } }
+    if isinstance(data, dict) and "faculties" not in data:
+        for prog, info in data.items():
+            if isinstance(info, dict) and "keywords" in info:
+                keywords[prog] = info["keywords"]
+
+    # 2. Durum: Yeni Hiyerarşik Format (undergrad_majors.json)
+    # { "faculties": [ { "programs": [ ... ] } ] }
+    elif isinstance(data, dict) and "faculties" in data:
+        for faculty in data["faculties"]:
+            for program in faculty.get("programs", []):
+                p_name = program.get("name")
+                p_kws = program.get("keywords")
+
+                if p_name and p_kws:
+                    keywords[p_name] = p_kws
+
+    return keywords
+
+def load_keyword_map(paths=(MAJORS_JSON, MINORS_JSON)):
+    """Anadal + yandal keyword haritası (dosya yoksa boş)."""
+    kws = {}
+    for path in paths:
+        if os.path.exists(path):
+            with open(path, 'r', encoding='utf-8') as f:
+                kws.update(extract_program_keywords(json.load(f)))
+    return kws
+
+def catalog_from_fens(data):
+    """fens_data_raw.json -> recommender/dropdown katalog DataFrame'i (ders başına tek satır)."""
+    courses_list = []
+    for major, info in data.items():
+        reqs = info.get("requirements", {})
+        for cat, clist in reqs.items():
+            for c in clist:
+                try:
+                    lvl = int(c['code'].split()[1][0]) * 100
+                except:
+                    lvl = 0
+
+                courses_list.append({
+                    "Course Code": c.get("code"),
+                    "Course Name": c.get("name", ""),
+                    "ECTS": c.get("ects", 0),
+                    "Term": "Unknown",
+                    "Level": lvl,
+                    "Description": c.get("name", ""),
+                    "Prerequisites": ""
+                })
+
+    return pd.DataFrame(courses_list).drop_duplicates(subset=["Course Code"])
+
+def translate_days(day):
+    """Gün harflerini Türkçe isimlere çevirir ("MW" -> "PazartesiÇarşamba"); eksik değer aynen döner."""
+    if pd.isna(day): return day
+    for code, name in DAY_NAMES.items():
+        day = day.replace(code, name)
+    return day
+
+def prepare_schedule(sched_df):
+    """Tipli schedule tablosuna uygulama düzeltmelerini uygular (kategori başına)."""
+    # --- OPTİMİZASYON 1: Hoca Temizliği (kategori başına, satır başına değil) ---
+    sched_df['Instructor'] = map_categories(sched_df['Instructor'], clean_instructor_name)
+    # --- OPTİMİZASYON 2: Gün Düzeltme ve Türkçeleştirme ---
+    sched_df = sched_df.rename(columns={'Days': 'Day'})
+    sched_df['Day'] = map_categories(sched_df['Day'], translate_days)
+    # --- OPTİMİZASYON 3: Ana Ders İşareti ---
+    sched_df['Is_Main'] = ~sched_df['Course Code'].astype(str).str.endswith(('R', 'L', 'D'))
+    return sched_df
+
+# =============================================================================
+# 2. FINGERPRINT (PARMAK İZİ)
+# =============================================================================
+
+def file_sha256(path):
+    h = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(1 << 20), b""):
+            h.update(chunk)
+    return h.hexdigest()
+
+def source_records(paths=SOURCE_FILES + CODE_FILES):
+    """{rel_path: sha256 | None (dosya yok)}."""
+    return {
+        os.path.relpath(p, BASE_DIR).replace(os.sep, "/"): file_sha256(p) if os.path.exists(p) else None
+        for p in paths
+    }
+
+def combine_fingerprint(records):
+    """Format versiyonu + tüm kaynak hash'lerinden tek parmak izi."""
+    h = hashlib.sha256(f"v{SNAPSHOT_VERSION}".encode())
+    for name in sorted(records):
+        h.update(f"\n{name}={records[name]}".encode())
+    return h.hexdigest()
+
+def current_fingerprint():
+    return combine_fingerprint(source_records())
+
+# =============================================================================
+# 3. FORMAT (DOSYA DÜZENİ)
+# =============================================================================
+
+def _arrow_bytes(df):
+    table = pa.Table.from_pandas(df)
+    sink = pa.BufferOutputStream()
+    with pa.ipc.new_stream(sink, table.schema) as writer:
+        writer.write_table(table)
+    return sink.getvalue().to_pybytes()
+
+def _json_bytes(obj):
+    return json.dumps(obj, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+
+def _pad(n):
+    return (-n) % ALIGN
+
+def write_snapshot(path, sections, fingerprint, sources):
+    """
+    sections: {isim: ("arrow", DataFrame) | ("json", obj) | ("raw-json", bytes)}
+    Bölüm ofsetleri başlık uzunluğuna bağlı olduğu için başlık iki geçişte kurulur.
+    """
+    blobs = []
+    for name, (kind, value) in sections.items():
+        if kind == "arrow": data = _arrow_bytes(value)
+        elif kind == "json": data = _json_bytes(value)
+        else: data = bytes(value)
+        blobs.append((name, "json" if kind == "raw-json" else kind, data))
+
+    header = {"version": SNAPSHOT_VERSION, "fingerprint": fingerprint, "sources": sources, "sections": {}}
+    for _ in range(2):
+        header_bytes = _json_bytes(header)
+        offset = len(MAGIC) + 8 + len(header_bytes)
+        offset += _pad(offset)
+        sections_meta = {}
+        for name, kind, data in blobs:
+            sections_meta[name] = {"kind": kind, "offset": offset, "length": len(data)}
+            offset += len(data) + _pad(len(data))
+        header["sections"] = sections_meta
+    header_bytes = _json_bytes(header)
+
+    tmp = f"{path}.tmp"
+    with open(tmp, "wb") as f:
+        f.write(MAGIC + struct.pack("<Q", len(header_bytes)) + header_bytes)
+        f.write(b"\0" * _pad(f.tell()))
+        for name, kind, data in blobs:
+            assert f.tell() == header["sections"][name]["offset"]
+            f.write(data)
+            f.write(b"\0" * _pad(len(data)))
+    os.replace(tmp, path)
+    return header
+
+def read_header(path):
+    with open(path, "rb") as f:
+        if f.read(len(MAGIC)) != MAGIC:
+            raise ValueError("snapshot değil (magic uyuşmuyor)")
+        (length,) = struct.unpack("<Q", f.read(8))
+        return json.loads(f.read(length))
+
+# =============================================================================
+# 4. BUILD (ÜRETİM)
+# =============================================================================
+
+def build_snapshot(path=SNAPSHOT_PATH):
+    """Kaynak dosyalardan tüm türetilmiş yapıları hesaplayıp snapshot'a yazar."""
+    if not HAS_ARROW:
+        raise RuntimeError("pyarrow kurulu değil (pip install pyarrow)")
+    sources = source_records()
+    fingerprint = combine_fingerprint(sources)
+
+    with open(FENS_JSON, "rb") as f:
+        raw_json = f.read()
+    catalog_df = catalog_from_fens(json.loads(raw_json))
+    prereq_df = load_catalog()
+    sections = {
+        "raw_data": ("raw-json", raw_json),
+        "catalog": ("arrow", catalog_df),
+        "schedule": ("arrow", prepare_schedule(load_schedule(SCHEDULE_COLUMNS))),
+        "prereq": ("arrow", prereq_df),
+        "descriptions": ("arrow", load_catalog_text()),
+        "keywords": ("json", load_keyword_map()),
+        "dependents": ("json", build_dependents_index(prereq_df)),
+    }
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    return write_snapshot(path, sections, fingerprint, sources)
+
+# =============================================================================
+# 5. OPEN (AÇMA)
+# =============================================================================
+
+class Snapshot:
+    """
+    Memory-map edilmiş snapshot. Bölümler ilk erişimde çözülür ve saklanır:
+    Arrow tamponları dosya sayfalarına işaret eder, ancak to_pandas() /
+    json.loads sonucu süreç heap'inde ayrı bir kopyadır (bkz. decoded()).
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self.header = read_header(path)
+        self.fingerprint = self.header["fingerprint"]
+        self._map = pa.memory_map(path, "r")
+        self._buffer = self._map.read_buffer(self._map.size())
+        self._cache = {}
+
+    def __contains__(self, name):
+        return name in self.header["sections"]
+
+    def section(self, name):
+        meta = self.header["sections"][name]
+        return self._buffer.slice(meta["offset"], meta["length"])
+
+    def get(self, name):
+        if name not in self._cache:
+            meta = self.header["sections"][name]
+            buf = self.section(name)
+            if meta["kind"] == "arrow":
+                self._cache[name] = pa.ipc.open_stream(buf).read_all().to_pandas()
+            else:
+                self._cache[name] = json.loads(buf.to_pybytes())
+        return self._cache[name]
+
+    def table(self, name):
+        """Arrow bölümünü DataFrame olarak döndürür (çağıran değiştirecekse .copy() almalı)."""
+        return self.get(name)
+
+    def is_fresh(self):
+        """Kaynak dosyalar snapshot üretildiğinden beri değişmemiş mi?"""
+        return current_fingerprint() == self.fingerprint
+
+    def nbytes(self):
+        """Eşlenen dosya boyutu (süreçler arası paylaşılan sayfalar)."""
+        return self._map.size()
+
+    def decoded(self):
+        """Şimdiye kadar çözülmüş bölümler {isim: nesne} (süreç başına heap kopyaları)."""
+        return dict(self._cache)
+
+def open_snapshot(path=SNAPSHOT_PATH, verify=True):
+    """
+    Snapshot'ı açar. Yoksa, versiyonu eskiyse veya (verify=True iken) kaynaklar
+    değiştiyse None döner; çağıran normal yükleyicilere düşer.
+    """
+    if not HAS_ARROW or not os.path.exists(path):
+        return None
+    try:
+        snap = Snapshot(path)
+    except (OSError, ValueError, KeyError):
+        return None
+    if snap.header.get("version") != SNAPSHOT_VERSION:
+        return None
+    if verify and not snap.is_fresh():
+        return None
+    return snap
+
+# =============================================================================
+# 6. MAIN EXECUTION (COMMAND LINE)
+# =============================================================================
+
+def check_snapshot(path=SNAPSHOT_PATH):
+    """Snapshot'tan gelen yapılar normal yükleme ile birebir aynı mı? Süreleri de ölçer."""
+    import time
+    t0 = time.perf_counter()
+    with open(FENS_JSON, "r", encoding="utf-8") as f:
+        raw_data = json.load(f)
+    expected = {
+        "raw_data": raw_data,
+        "catalog": catalog_from_fens(raw_data),
+        "schedule": prepare_schedule(load_schedule(SCHEDULE_COLUMNS)),
+        "prereq": load_catalog(),
+        "descriptions": load_catalog_text(),
+        "keywords": load_keyword_map(),
+        "dependents": build_dependents_index(load_catalog()),
+    }
+    cold = time.perf_counter() - t0
+
+    t0 = time.perf_counter()
+    snap = open_snapshot(path)
+    if snap is None:
+        print("❌ Snapshot yok veya bayat, önce: python src/snapshot.py")
+        return False
+    got = {name: snap.get(name) for name in expected}
+    warm = time.perf_counter() - t0
+
+    ok = True
+    # Türetmelerin yüklediği src modülleri parmak izinde mi? (eksikse değişiklik fark edilmez)
+    loaded = {os.path.basename(m.__file__) for m in list(sys.modules.values())
+              if os.path.dirname(os.path.abspath(getattr(m, "__file__", None) or "")) == SRC_DIR}
+    untracked = sorted(loaded - set(CODE_MODULES))
+    if untracked:
+        ok = False
+        print(f"❌ parmak izinde olmayan türetme kodu: {', '.join(untracked)} (CODE_MODULES)")
+    else:
+        print("✅ türetme kodu parmak izinde")
+    for name, value in expected.items():
+        if isinstance(value, pd.DataFrame):
+            try: pd.testing.assert_frame_equal(value, got[name])
+            except AssertionError as e:
+                ok = False
+                print(f"❌ {name}: {str(e).splitlines()[0]}")
+                continue
+        elif value != got[name]:
+            ok = False
+            print(f"❌ {name}: içerik farklı")
+            continue
+        print(f"✅ {name}")
+    print(f"⏱️ Normal yükleme {cold * 1000:.1f} ms | snapshot (açma + doğrulama + çözme) {warm * 1000:.1f} ms")
+    frames = sum(int(v.memory_usage(index=True, deep=True).sum()) for v in got.values() if isinstance(v, pd.DataFrame))
+    print(f"📦 Eşlenen dosya {snap.nbytes() / 1e6:.2f} MB (süreçler arası paylaşılır) | "
+          f"çözülmüş DataFrame'ler {frames / 1e6:.2f} MB heap (süreç başına kopya)")
+    return ok
+
+if __name__ == "__main__":
+    import time
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Uygulama snapshot'ını üretir (memory-map ile açılır).")
+    parser.add_argument("--output", default=SNAPSHOT_PATH, help="Snapshot dosyası")
+    parser.add_argument("--check", action="store_true", help="Snapshot ile normal yüklemeyi karşılaştır")
+    args = parser.parse_args()
+
+    if args.check:
+        sys.exit(0 if check_snapshot(args.output) else 1)
+
+    t0 = time.perf_counter()
+    header = build_snapshot(args.output)
+    print(f"📦 Snapshot yazıldı: {args.output} ({os.path.getsize(args.output) / 1e6:.2f} MB, {time.perf_counter() - t0:.2f} s)")
+    print(f"🔑 Fingerprint: {header['fingerprint'][:16]}")
+    for name, meta in header["sections"].items():
+        print(f"   {name:<13} {meta['kind']:<5} {meta['length'] / 1e3:9.1f} KB")
@@ -0,0 +1,301 @@
+"""
+=============================================================================
+PROJE: SABANCI UNIVERSITY SMART ADVISOR
+DOSYA: src/startup_profile.py
+TANIM: Uygulama Açılış (Cold Start) Profili ve Bütçe Kontrolü.
+       app.py'nin modül seviyesindeki import'ları (ilk boyamadan önce
+       çalışan her şey) AST'den okunur ve her ölçümde temiz bir Python
+       sürecinde `python -X importtime` ile import edilir. Ardından
+       uygulamanın ilk boyama için yüklediği veri (snapshot veya kaynak
+       dosyalar) aynı süreçte ölçülür.
+
+       Korumalar:
+           1. Yasaklı modüller: torch, sentence_transformers, graphviz, bs4 ...
+              açılış sırasında import edilmeye ÇALIŞILIRSA kontrol başarısız
+              olur. Denemeler sys.meta_path'e eklenen bir kayıt bulucusuyla
+              (finder) izlenir; paket bu ortamda kurulu olmasa da yakalanır
+              (süreden bağımsız, deterministik).
+           2. Eksik import: app.py'nin açılış import'larından biri kurulu
+              değilse ölçüm eksiktir ve kontrol başarısız olur
+              (--allow-missing ile bilerek kabul edilebilir).
+           3. Süre bütçesi: import + ilk boyama verisi (ms, medyan).
+
+       Rapor IMPORT_PROFILE.MD olarak repoda tutulur; import eklendiğinde
+       yeniden üretilip diff'te görünür.
+
+       Kullanım:
+           python src/startup_profile.py            # Profili yazdır
+           python src/startup_profile.py --write    # IMPORT_PROFILE.MD güncelle
+           python src/startup_profile.py --check    # Bütçe aşılırsa çıkış kodu 1
+           python src/startup_profile.py --check --allow-missing   # Eksik paketle
+
+YOL HARİTASI (ROADMAP):
+1. STARTUP IMPORTS ........ app.py modül seviyesi import'ları (AST)
+2. MEASURE ................ Temiz süreçte -X importtime + ilk boyama verisi
+3. REPORT ................. Paket bazlı özet ve Markdown raporu
+4. BUDGET ................. Yasaklı modül, eksik import ve süre kontrolü
+5. MAIN EXECUTION ......... Komut satırı arayüzü
+=============================================================================
+"""
+
+import os
+import re
+import sys
+import ast
+import json
+import subprocess
+import statistics
+
+# --- AYARLAR ---
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+APP_PATH = os.path.join(BASE_DIR, 'app.py')
+REPORT_PATH = os.path.join(BASE_DIR, 'IMPORT_PROFILE.MD')
+
+# İlk boyamadan önce asla yüklenmemesi gerekenler (ilgili özellik içinde import edilir)
+HEAVY_MODULES = (
+    "torch", "sentence_transformers", "transformers", "sklearn",
+    "graphviz", "bs4", "lxml", "requests", "aiohttp",
+)
+
+# Bütçeler (ms, soğuk süreç medyanı).
+IMPORT_BUDGET_MS = 2000
+FIRST_PAINT_BUDGET_MS = 3000
+
+IMPORTTIME_RE = re.compile(r"^import time:\s+(\d+) \|\s+(\d+) \| ( *)(\S+)")
+
+# =============================================================================
+# 1. STARTUP IMPORTS (AÇILIŞ IMPORT'LARI)
+# =============================================================================
+
+def startup_imports(path=APP_PATH):
+    """
+    app.py'nin modül seviyesinde (fonksiyon / with / if blokları dışında,
+    try blokları dahil) çalışan import ifadeleri, kaynak koddaki haliyle.
+    """
+    with open(path, "r", encoding="utf-8") as f:
+        source = f.read()
+    tree = ast.parse(source)
+
+    statements = []
+    def visit(body):
+        for node in body:
+            if isinstance(node, (ast.Import, ast.ImportFrom)):
+                statements.append(ast.get_source_segment(source, node))
+            elif isinstance(node, ast.Try):
+                visit(node.body)
+    visit(tree.body)
+    return statements
+
+# =============================================================================
+# 2. MEASURE (ÖLÇÜM)
+# =============================================================================
+
+# Alt süreçte çalışan ölçüm kodu: import'lar tek tek (eksik paket raporlanır),
+# sonra app.py'nin ilk boyama için yüklediği veri. sys.meta_path'in başındaki
+# kayıt bulucusu her import denemesini (başarısız olanlar dahil) not eder ve
+# aramayı normal buluculara bırakır. importlib.util.find_spec sorguları
+# (ml_engine'in "kurulu mu?" kontrolü gibi) import sayılmaz: sadece import
+# makinesinin kendisinden (_find_and_load_unlocked) gelen aramalar kaydedilir.
+_PROBE = r'''
+import sys, json, time
+sys.path.insert(0, {base!r})
+sys.path.append({src!r})
+
+attempted = set()
+class _ImportRecorder:
+    @staticmethod
+    def find_spec(name, path=None, target=None):
+        # Çağıran zinciri: import -> _find_and_load_unlocked -> _find_spec -> bu bulucu
+        if sys._getframe(2).f_code.co_name == "_find_and_load_unlocked":
+            attempted.add(name)
+        return None
+sys.meta_path.insert(0, _ImportRecorder)
+
+t0 = time.perf_counter()
+missing = []
+for stmt in {statements!r}:
+    try:
+        exec(stmt, {{}})
+    except ImportError as e:
+        missing.append(str(e))
+t_imports = time.perf_counter() - t0
+
+t0 = time.perf_counter()
+source = "none"
+try:
+    from src.snapshot import open_snapshot, catalog_from_fens, prepare_schedule, load_keyword_map, SCHEDULE_COLUMNS
+    from src.columnar import load_schedule, load_catalog
+    snap = open_snapshot()
+    if snap is not None:
+        for name in ("raw_data", "catalog", "schedule", "prereq", "keywords", "dependents"):
+            snap.get(name)
+        source = "snapshot"
+    else:
+        with open({fens!r}, "r", encoding="utf-8") as f:
+            catalog_from_fens(json.load(f))
+        prepare_schedule(load_schedule(SCHEDULE_COLUMNS))
+        load_catalog()
+        load_keyword_map()
+        source = "kaynak dosyalar"
+except Exception as e:
+    source = "hata: " + str(e)
+t_data = time.perf_counter() - t0
+
+print(json.dumps({{"imports": t_imports, "data": t_data, "source": source,
+                   "missing": missing, "modules": sorted(sys.modules),
+                   "attempted": sorted(attempted)}}))
+'''
+
+def parse_importtime(stderr):
+    """-X importtime çıktısı: [(modül, self_us, cumulative_us, derinlik)]."""
+    rows = []
+    for line in stderr.splitlines():
+        m = IMPORTTIME_RE.match(line)
+        if m:
+            rows.append((m.group(4), int(m.group(1)), int(m.group(2)), len(m.group(3)) // 2))
+    return rows
+
+def measure_once(statements):
+    """Temiz bir süreçte açılışı bir kez ölçer."""
+    code = _PROBE.format(
+        base=BASE_DIR, src=os.path.join(BASE_DIR, 'src'), statements=statements,
+        fens=os.path.join(BASE_DIR, 'data', 'json', 'fens_data_raw.json'),
+    )
+    proc = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", code],
+        cwd=BASE_DIR, capture_output=True, text=True,
+    )
+    if proc.returncode != 0:
+        raise RuntimeError(proc.stderr.strip().splitlines()[-1] if proc.stderr.strip() else "ölçüm süreci başarısız")
+    result = json.loads(proc.stdout.strip().splitlines()[-1])
+    result["importtime"] = parse_importtime(proc.stderr)
+    return result
+
+def measure(repeats=5, path=APP_PATH):
+    """
+    Açılışı `repeats` kez soğuk süreçte ölçer.
+
+    Returns:
+        dict: {statements, imports_ms, data_ms, total_ms (medyanlar), source,
+               missing, heavy (import edilen veya edilmeye çalışılan yasaklı
+               modüller), importtime (medyan süreç)}
+    """
+    statements = startup_imports(path)
+    runs = [measure_once(statements) for _ in range(repeats)]
+    totals = [r["imports"] + r["data"] for r in runs]
+    median_run = sorted(runs, key=lambda r: r["imports"] + r["data"])[len(runs) // 2]
+    # Yüklenen + denenen (kurulu olmasa da) modüllerin kök paketleri
+    roots = {m.split(".")[0] for m in median_run["modules"] + median_run["attempted"]}
+    return {
+        "statements": statements,
+        "imports_ms": statistics.median(r["imports"] for r in runs) * 1000,
+        "data_ms": statistics.median(r["data"] for r in runs) * 1000,
+        "total_ms": statistics.median(totals) * 1000,
+        "source": median_run["source"],
+        "missing": median_run["missing"],
+        "heavy": sorted(m for m in HEAVY_MODULES if m in roots),
+        "importtime": median_run["importtime"],
+    }
+
+# =============================================================================
+# 3. REPORT (RAPOR)
+# =============================================================================
+
+def package_totals(importtime):
+    """Kök paket başına toplam self süresi (ms) ve modül sayısı, büyükten küçüğe."""
+    totals = {}
+    for name, self_us, _, _ in importtime:
+        root = name.split(".")[0]
+        if root == "src" and "." in name:
+            root = name  # Uygulama modülleri ayrı ayrı gösterilir
+        ms, count = totals.get(root, (0.0, 0))
+        totals[root] = (ms + self_us / 1000, count + 1)
+    return sorted(totals.items(), key=lambda kv: -kv[1][0])
+
+def render_report(profile, top=20):
+    """Markdown raporu (IMPORT_PROFILE.MD)."""
+    lines = [
+        "# Açılış (Cold Start) Import Profili",
+        "",
+        "`python src/startup_profile.py --write` ile üretilir; `--check` bütçeyi doğrular.",
+        f"Ölçüm: Python {sys.version.split()[0]}, soğuk süreç medyanı.",
+        "",
+        "| Aşama | Süre (ms) | Bütçe (ms) |",
+        "|---|---:|---:|",
+        f"| Modül seviyesi import'lar | {profile['imports_ms']:.0f} | {IMPORT_BUDGET_MS} |",
+        f"| İlk boyama verisi ({profile['source']}) | {profile['data_ms']:.0f} | |",
+        f"| **Toplam** | **{profile['total_ms']:.0f}** | {FIRST_PAINT_BUDGET_MS} |",
+        "",
+        f"Açılışta import edilen (veya denenen) ağır modüller: {', '.join(profile['heavy']) or 'yok'} "
+        f"(yasaklı: {', '.join(HEAVY_MODULES)})",
+        "",
+    ]
+    if profile["missing"]:
+        lines += ["⚠️ **Eksik ölçüm:** Bu ortamda kurulu olmadığı için ölçüme dahil "
+                  "edilemeyenler (süreler gerçek açılıştan düşüktür; `--check` başarısız olur):", ""]
+        lines += [f"- `{m}`" for m in profile["missing"]]
+        lines.append("")
+
+    lines += ["## Paket bazlı import süresi", "", "| Paket | Self (ms) | Modül |", "|---|---:|---:|"]
+    for root, (ms, count) in package_totals(profile["importtime"])[:top]:
+        lines.append(f"| `{root}` | {ms:.1f} | {count} |")
+
+    lines += ["", "## app.py modül seviyesi import'ları", "", "```python"]
+    lines += profile["statements"]
+    lines += ["```", ""]
+    return "\n".join(lines)
+
+# =============================================================================
+# 4. BUDGET (BÜTÇE KONTROLÜ)
+# =============================================================================
+
+def check_budget(profile, import_budget_ms=IMPORT_BUDGET_MS, total_budget_ms=FIRST_PAINT_BUDGET_MS, allow_missing=False):
+    """Bütçe ihlalleri listesi (boşsa geçti). allow_missing: eksik import'lar ihlal sayılmaz."""
+    problems = []
+    if profile["heavy"]:
+        problems.append(f"açılışta ağır modül import edildi (veya denendi): {', '.join(profile['heavy'])}")
+    if profile["missing"] and not allow_missing:
+        problems.append(f"açılış import'ları kurulu değil, ölçüm eksik: {'; '.join(profile['missing'])}")
+    if profile["imports_ms"] > import_budget_ms:
+        problems.append(f"import süresi {profile['imports_ms']:.0f} ms > {import_budget_ms} ms")
+    if profile["total_ms"] > total_budget_ms:
+        problems.append(f"ilk boyama {profile['total_ms']:.0f} ms > {total_budget_ms} ms")
+    if profile["source"].startswith("hata"):
+        problems.append(f"ilk boyama verisi yüklenemedi ({profile['source']})")
+    return problems
+
+# =============================================================================
+# 5. MAIN EXECUTION (COMMAND LINE)
+# =============================================================================
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Uygulama açılış import profili ve cold start bütçe kontrolü.")
+    parser.add_argument("--write", action="store_true", help=f"Raporu {os.path.basename(REPORT_PATH)} dosyasına yaz")
+    parser.add_argument("--check", action="store_true", help="Bütçe aşılırsa çıkış kodu 1")
+    parser.add_argument("--repeats", type=int, default=5, help="Soğuk süreç ölçüm sayısı")
+    parser.add_argument("--import-budget-ms", type=float, default=IMPORT_BUDGET_MS)
+    parser.add_argument("--budget-ms", type=float, default=FIRST_PAINT_BUDGET_MS, help="Import + ilk boyama verisi bütçesi")
+    parser.add_argument("--allow-missing", action="store_true", help="Kurulu olmayan açılış import'larına rağmen kontrolü geçir")
+    args = parser.parse_args()
+
+    profile = measure(args.repeats)
+    print(f"⏱️ Import {profile['imports_ms']:.0f} ms + veri ({profile['source']}) {profile['data_ms']:.0f} ms "
+          f"= {profile['total_ms']:.0f} ms (medyan, {args.repeats} soğuk süreç)")
+    for root, (ms, count) in package_totals(profile["importtime"])[:10]:
+        print(f"   {root:<28} {ms:8.1f} ms  ({count} modül)")
+    for m in profile["missing"]:
+        print(f"   ⚠️ ölçülemedi: {m}")
+
+    if args.write:
+        with open(REPORT_PATH, "w", encoding="utf-8") as f:
+            f.write(render_report(profile))
+        print(f"💾 Rapor: {REPORT_PATH}")
+
+    if args.check:
+        problems = check_budget(profile, args.import_budget_ms, args.budget_ms, args.allow_missing)
+        for p in problems:
+            print(f"❌ {p}")
+        if problems:
+            sys.exit(1)
+        print("✅ Cold start bütçesi içinde.")
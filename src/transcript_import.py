@@ -0,0 +1,144 @@
+"""
+=============================================================================
+PROJE: SABANCI UNIVERSITY SMART ADVISOR
+DOSYA: src/transcript_import.py
+TANIM: Toplu Transkript İçe Aktarma (SUIS metninden).
+       SUIS transkript sayfasından kopyalanan metindeki tüm geçerli ders
+       kodlarını tek geçişte çıkarır. Katalogdaki ders ön eklerinden
+       (CS, MATH, ...) yükleme anında tek bir regex otomatı derlenir;
+       bulunan aday kodlar katalog kümesinde O(1) doğrulanır.
+
+       Desteklenen yazımlar: "CS 201", "CS201", "cs-201", "cs201", "MATH  101",
+       "BIO 301L" (Lab/Recitation/Discussion eki ana derse katlanır).
+       Ön ek SUIS'teki gibi büyük harfle yazılmalıdır; küçük/karışık harf
+       sadece bitişik yazımda ("cs201", "cs-201") kabul edilir. Böylece
+       düz metindeki "it 101", "is 2023" gibi ifadeler ders sayılmaz.
+
+YOL HARİTASI (ROADMAP):
+1. AUTOMATON .............. Katalog ön eklerinden derlenen kod otomatı
+2. EXTRACTION ............. Metinden sıralı, tekrarsız ders listesi
+3. CATALOG LOADER ......... CSV/JSON katalog kodlarının toplanması
+4. MAIN EXECUTION ......... Komut satırı testi
+=============================================================================
+"""
+
+import os
+import re
+import csv
+import json
+
+# --- AYARLAR ---
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+CATALOG_CSV = os.path.join(BASE_DIR, 'data', 'csv', 'course_data_clean.csv')
+CATALOG_JSON = os.path.join(BASE_DIR, 'data', 'json', 'fens_data_raw.json')
+
+# Ana derse katlanan bileşen ekleri (Recitation, Lab, Discussion)
+COMPONENT_SUFFIXES = ("R", "L", "D")
+
+# =============================================================================
+# 1. AUTOMATON (KOD OTOMATI)
+# =============================================================================
+
+class CodeAutomaton:
+    """
+    Katalog kodları üzerinde derlenmiş çoklu kalıp eşleyici.
+
+    Kullanım:
+        automaton = CodeAutomaton(["CS 201", "MATH 101", ...])
+        automaton.extract("CS201 Intro... A  3.000\\nmath-101 ...")
+    """
+
+    def __init__(self, codes):
+        self.codes = {" ".join(str(c).upper().split()) for c in codes if str(c).strip()}
+        subjects = sorted({c.split()[0] for c in self.codes if " " in c}, key=lambda s: (-len(s), s))
+        # En uzun ön ek önce denenir (MATH, MAT'tan önce); önce/sonra harf-rakam olmamalı (ECS 201 != CS 201).
+        # Ön ek harf duyarsız yakalanır, ayraç ayrı grupta tutulur: küçük harfli ön ekin
+        # bitişik yazılıp yazılmadığına extract karar verir.
+        self.pattern = re.compile(
+            r"(?<![A-Za-z0-9])((?i:" + "|".join(map(re.escape, subjects)) + r"))"
+            r"([^\S\n]*[-_.]?[^\S\n]*)(\d{3,4})([A-Za-z]?)(?![0-9A-Za-z])"
+        ) if subjects else None
+
+    def resolve(self, subject, number, suffix=""):
+        """Eşleşmeyi katalog koduna çevirir; katalogda yoksa None."""
+        main = f"{subject} {number}"
+        if suffix in COMPONENT_SUFFIXES and main in self.codes:
+            return main
+        code = main + suffix
+        if code in self.codes:
+            return code
+        return None
+
+    # =========================================================================
+    # 2. EXTRACTION (ÇIKARMA)
+    # =========================================================================
+
+    def extract(self, text):
+        """
+        Metindeki tüm ders kodlarını tek geçişte bulur.
+
+        Returns:
+            dict: {
+                "courses": [...],  # Katalogda olan kodlar (ilk görülme sırası, tekrarsız)
+                "unknown": [...]   # Ön eki bilinen ama katalogda olmayan kodlar
+            }
+        """
+        courses, unknown = {}, {}
+        if not text or self.pattern is None:
+            return {"courses": [], "unknown": []}
+        for subject, sep, number, suffix in self.pattern.findall(str(text)):
+            # Küçük/karışık harfli ön ek sadece bitişik yazımda kod sayılır ("cs201", "cs-201");
+            # "it 101" gibi boşluklu düz metin atlanır
+            if not subject.isupper() and sep.strip() != sep: continue
+            subject, suffix = subject.upper(), suffix.upper()
+            code = self.resolve(subject, number, suffix)
+            if code: courses.setdefault(code, None)
+            else: unknown.setdefault(f"{subject} {number}{suffix}", None)
+        return {"courses": list(courses), "unknown": list(unknown)}
+
+# =============================================================================
+# 3. CATALOG LOADER (KATALOG)
+# =============================================================================
+
+def load_catalog_codes(csv_path=CATALOG_CSV, json_path=CATALOG_JSON):
+    """Ders kataloğu CSV'si ve müfredat JSON'undaki tüm ders kodları."""
+    codes = set()
+    if os.path.exists(csv_path):
+        with open(csv_path, "r", encoding="utf-8-sig", newline="") as f:
+            codes.update(row["Course Code"] for row in csv.DictReader(f) if row.get("Course Code"))
+    if os.path.exists(json_path):
+        with open(json_path, "r", encoding="utf-8") as f:
+            data = json.load(f)
+        for info in data.values():
+            for clist in info.get("requirements", {}).values():
+                codes.update(c["code"] for c in clist if c.get("code"))
+    return codes
+
+def build_catalog_automaton(csv_path=CATALOG_CSV, json_path=CATALOG_JSON, extra_codes=()):
+    """Katalogdan otomatı derler (uygulama açılışında bir kez)."""
+    codes = load_catalog_codes(csv_path, json_path)
+    codes.update(extra_codes)
+    return CodeAutomaton(codes)
+
+# =============================================================================
+# 4. MAIN EXECUTION (STANDALONE TEST MODE)
+# =============================================================================
+if __name__ == "__main__":
+    import sys
+    import time
+
+    t0 = time.perf_counter()
+    automaton = build_catalog_automaton()
+    print(f"🔧 Otomat derlendi: {len(automaton.codes)} kod ({(time.perf_counter() - t0) * 1000:.1f} ms)")
+
+    text = open(sys.argv[1], encoding="utf-8").read() if len(sys.argv) > 1 else (
+        "Fall 2023-2024\nCS201 Introduction to Computing  A  3.000\n"
+        "math-101 Calculus I B+ 3.000\nMATH 101R Recitation\nENS-205  Intro to Optimization\n"
+        "HUM 202 Major Works A-\nXYZ 999 Unknown\nCS 999 Not In Catalog\n"
+        "Notes: it 101 ways to study, is 2023 the year?\n"
+    )
+    t0 = time.perf_counter()
+    result = automaton.extract(text)
+    print(f"✅ {len(result['courses'])} ders bulundu ({(time.perf_counter() - t0) * 1000:.2f} ms): {', '.join(result['courses'])}")
+    if result["unknown"]:
+        print(f"⚠️ Katalogda olmayan: {', '.join(result['unknown'])}")
@@ -7,11 +7,15 @@ TANIM: Karmaşık JSON veri yapılarından (Majors/Minors) anahtar kelime
 =============================================================================
 """
 
-import graphviz
 import pandas as pd
 import re
 import logging
 
+try:
+    from src.equivalence import canonical_code
+except ImportError:
+    from equivalence import canonical_code
+
 def extract_program_keywords(json_data):
     """
     undergrad_majors.json veya minors.json dosyasını tarar.
@@ -60,12 +64,33 @@ def extract_codes(text):
     if not isinstance(text, str): return []
     return re.findall(r"([A-Z]{2,5}\s+\d{3,4})", text)
 
-def generate_prereq_graph(course_code, catalog_df):
+def build_dependents_index(catalog_df):
+    """
+    Tek geçişte ters ön koşul indeksi: {kanonik_önkoşul: [bu dersi şart koşan dersler]}.
+    Eşdeğer dersler (CS 210 ≡ DSA 210) aynı anahtara düşer.
+    Recitation (R), Lab (L), Discussion (D) dersleri indekse alınmaz.
+    """
+    dependents = {}
+    codes = catalog_df['Course Code'] if 'Course Code' in catalog_df.columns else []
+    prereqs = catalog_df['Prerequisites'] if 'Prerequisites' in catalog_df.columns else [''] * len(codes)
+    for target_code, prereq_text in zip(codes, prereqs):
+        if str(target_code).endswith(('R', 'L', 'D')):
+            continue
+        for p in dict.fromkeys(canonical_code(c) for c in extract_codes(str(prereq_text).upper())):
+            dependents.setdefault(p, []).append(target_code)
+    return dependents
+
+def generate_prereq_graph(course_code, catalog_df, dependents=None):
     """
     Seçilen dersin (Kök) ve onun açtığı derslerin (Hedef) grafiğini çizer.
     Recitation (R), Lab (L), Discussion (D) derslerini GÖSTERMEZ.
+    Ön koşulda çapraz listeli kodu geçen dersler de bağlanır (örn. CS 210 şartı DSA 210 ile).
+    dependents: Önceden kurulmuş build_dependents_index çıktısı (snapshot'tan); yoksa burada kurulur.
     """
     try:
+        # graphviz sadece grafik çizerken gerekir (indeks fonksiyonları onsuz da import edilebilir)
+        import graphviz
+
         # Graphviz objesi
         dot = graphviz.Digraph(comment='Prerequisite Chain')
         dot.attr(rankdir='LR') 
@@ -83,41 +108,22 @@ def generate_prereq_graph(course_code, catalog_df):
 
         dot.node(clean_root, clean_root, fillcolor='gold', penwidth='2')
         
-        connections_found = False
+        # Ters indeks bir kez kurulur; katalog satırları tekrar taranmaz
+        if dependents is None:
+            dependents = build_dependents_index(catalog_df)
+        targets = dependents.get(canonical_code(clean_root), [])
+        connections_found = bool(targets)
         
-        # 2. Doğrudan Bağlantıları Bul
-        for _, row in catalog_df.iterrows():
-            target_code = row['Course Code']
-            
-            # --- [DEĞİŞİKLİK BURADA] ---
-            # Hedef ders R/L/D ise grafiğe ekleme, pas geç
-            if str(target_code).endswith(('R', 'L', 'D')):
-                continue
-
-            prereq_text = str(row.get('Prerequisites', ''))
+        # 2. Doğrudan Bağlantılar
+        for target_code in targets:
+            # Hedef Düğüm
+            dot.node(target_code, target_code)
+            dot.edge(clean_root, target_code)
             
-            # Eğer hedef dersin ön koşulunda bizim dersimiz varsa
-            if clean_root in extract_codes(prereq_text.upper()):
-                connections_found = True
-                
-                # Hedef Düğüm
-                dot.node(target_code, target_code)
-                dot.edge(clean_root, target_code)
-                
-                # 3. İkinci Seviye (Derinlik 2)
-                for _, sub_row in catalog_df.iterrows():
-                    sub_target = sub_row['Course Code']
-                    
-                    # --- [DEĞİŞİKLİK BURADA] ---
-                    # Alt hedef R/L/D ise grafiğe ekleme
-                    if str(sub_target).endswith(('R', 'L', 'D')):
-                        continue
-                        
-                    sub_prereq = str(sub_row.get('Prerequisites', ''))
-                    
-                    if target_code in extract_codes(sub_prereq.upper()):
-                        dot.node(sub_target, sub_target, fillcolor='mistyrose') 
-                        dot.edge(target_code, sub_target)
+            # 3. İkinci Seviye (Derinlik 2)
+            for sub_target in dependents.get(canonical_code(target_code), []):
+                dot.node(sub_target, sub_target, fillcolor='mistyrose') 
+                dot.edge(target_code, sub_target)
 
         if not connections_found:
             note_id = f"note_{clean_root}"
@@ -1,22 +1,55 @@
-import pandas as pd
-import requests
+import os
+import sys
+import json
 import time
-from bs4 import BeautifulSoup
+import random
+import asyncio
+import hashlib
+import urllib.request
+import urllib.error
+import http.server
+import re
+from html.parser import HTMLParser
+from concurrent.futures import ProcessPoolExecutor
+import pandas as pd
+from html.entities import html5 as HTML5_ENTITIES
+from bs4 import BeautifulSoup, UnicodeDammit
+
+# Optional async HTTP client; falls back to urllib in worker threads
+try:
+    import aiohttp
+    HAS_AIOHTTP = True
+except ImportError:
+    HAS_AIOHTTP = False
 
 # ---------------------------------------------------------
 # CONFIGURATION
 # ---------------------------------------------------------
-INPUT_FILE = "course_links_master.csv"
-OUTPUT_FILE = "course_full_data_v2.csv" 
-SLEEP_INTERVAL = 0.5 
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+INPUT_FILE = os.path.join(BASE_DIR, 'data', 'csv', 'course_links_master.csv')
+OUTPUT_FILE = os.path.join(BASE_DIR, 'data', 'csv', 'course_full_data_v2.csv')
+CHECKPOINT_FILE = os.path.join(BASE_DIR, 'data', '.crawl_checkpoint.jsonl')
+CACHE_DIR = os.path.join(BASE_DIR, 'data', '.http_cache')
+
+CONCURRENCY = 8          # Max requests in flight
+RATE_LIMIT = 4.0         # Requests per second (token bucket refill rate)
+BURST = 4                # Token bucket capacity
+MAX_RETRIES = 4          # Attempts after the first one
+BACKOFF_BASE = 0.5       # Seconds; delay = base * 2^attempt + jitter
+REQUEST_TIMEOUT = 10     # Seconds
+RETRY_STATUSES = {429, 500, 502, 503, 504}
+PARSE_WORKERS = min(4, os.cpu_count() or 1)  # Parser processes; 0 parses inside the fetch loop
+CACHE_TTL = 7 * 24 * 3600  # Seconds; reuse without any request when the server sent no ETag/Last-Modified
+MAX_FAILURE_RATE = 0.05  # More failed (non-terminal) courses than this and no output is written
 
 # ---------------------------------------------------------
-# HELPER FUNCTION: PARSER
+# HELPER FUNCTION: PARSER (REFERENCE, BEAUTIFULSOUP)
 # ---------------------------------------------------------
-def parse_course_page(html_content):
+def parse_course_page_bs4(html_content):
     """
     Extracts Description, Restrictions, Prerequisites, and Corequisites.
     Uses 'split' logic to handle multi-line blocks effectively.
+    Reference implementation; parse_course_page must return the same tuple.
     """
     soup = BeautifulSoup(html_content, 'html.parser')
     
@@ -84,60 +117,832 @@ def parse_course_page(html_content):
     return description, restrictions, prerequisites, corequisites
 
 # ---------------------------------------------------------
-# MAIN CRAWLING LOOP
+# HELPER FUNCTION: PARSER (SINGLE PASS)
 # ---------------------------------------------------------
-try:
-    df_links = pd.read_csv(INPUT_FILE)
-    print(f"Loaded {len(df_links)} courses. Crawler v2.1 (Restrictions) starting...")
-except FileNotFoundError:
-    print(f"ERROR: '{INPUT_FILE}' not found.")
-    exit()
-
-results = []
-total = len(df_links)
-
-for index, row in df_links.iterrows():
-    code = row['Course Code']
-    url = row['URL']
-    
-    print(f"[{index+1}/{total}] {code}...", end=" ")
-    
-    try:
-        response = requests.get(url, timeout=10)
-        
-        if response.status_code == 200:
-            desc, rest, pre, cor = parse_course_page(response.content)
-            
-            # Console Feedback
-            # Show 'R' if restrictions exist, 'P' if prereqs exist
-            info_flags = []
-            if rest != "None": info_flags.append("Restr")
-            if pre != "None": info_flags.append("Prereq")
-            
-            flag_str = ", ".join(info_flags) if info_flags else "Clean"
-            print(f"✅ ({flag_str})")
-            
-            results.append({
-                "Course Code": code,
-                "Course Name": row['Course Name'],
-                "Description": desc,
-                "Restrictions": rest,     
-                "Prerequisites": pre,
-                "Corequisites": cor,
-                "Term": row['Term']
-            })
-            
+# Same tokenizer as BeautifulSoup's 'html.parser' builder, but no tree: text
+# runs are joined directly. The rules below reproduce soup.get_text('\n'):
+#   - a text run ends at any tag, comment, declaration or PI
+#   - whitespace-only runs collapse to "\n" / " " (except inside pre/textarea)
+#   - text under script/style/template/rt/rp is not page text
+#   - a redundant end tag of a void element (<br>...</br>) is ignored
+#   - entities are resolved as the HTML spec says (same result as bs4)
+# The tag and entity tables are defined here, not imported from bs4
+# internals, so a bs4 upgrade cannot silently change them; `--check` is the
+# parity guard against the installed bs4.
+_EMPTY_TAGS = frozenset({
+    "area", "base", "basefont", "bgsound", "br", "col", "command", "embed", "frame", "hr", "image",
+    "img", "input", "isindex", "keygen", "link", "menuitem", "meta", "nextid", "param", "source",
+    "spacer", "track", "wbr",
+})
+_PRESERVE_WS_TAGS = frozenset({"pre", "textarea"})
+_HIDDEN_TEXT_TAGS = frozenset({"script", "style", "template", "rt", "rp"})
+_ENTITY_TO_CHARACTER = {}
+for _name, _char in HTML5_ENTITIES.items():
+    _ENTITY_TO_CHARACTER.setdefault(_name.rstrip(";"), _char)
+_ASCII_SPACES = "\x20\x0a\x09\x0c\x0d"
+_DEC_REF = re.compile("^([0-9]+)(.*)")
+_HEX_REF = re.compile("^([0-9a-f]+)(.*)")
+
+def _numeric_reference(number):
+    """HTML spec "numeric character reference end state": &#150; -> '–', &#0; -> U+FFFD."""
+    if number == 0 or number > 0x10FFFF or 0xD800 <= number <= 0xDFFF:
+        return "\ufffd"
+    if 0x80 <= number <= 0x9F:
+        # C1 controls: references written with their Windows-1252 byte
+        try:
+            return bytes([number]).decode("cp1252")
+        except UnicodeDecodeError:
+            pass
+    return chr(number)
+
+class _PageTextCollector(HTMLParser):
+    def __init__(self):
+        super().__init__(convert_charrefs=False)
+        self.strings = []
+        self.current = []
+        self.stack = []
+        self.closed_empty = []
+        self.preserve_depth = 0   # open pre/textarea tags
+        self.hidden_depth = 0     # open script/style/template/rt/rp tags
+
+    def flush(self):
+        if not self.current:
+            return
+        data = "".join(self.current)
+        self.current = []
+        if not self.preserve_depth and not data.strip(_ASCII_SPACES):
+            data = "\n" if "\n" in data else " "
+        if not self.hidden_depth:
+            self.strings.append(data)
+
+    def handle_starttag(self, tag, attrs):
+        self.flush()
+        if tag in _EMPTY_TAGS:
+            self.closed_empty.append(tag)
         else:
-            print(f"❌ HTTP {response.status_code}")
-            
-    except Exception as e:
-        print(f"⚠️ Err: {e}")
+            self._push(tag)
+
+    def handle_startendtag(self, tag, attrs):
+        self.flush()
+        if tag not in _EMPTY_TAGS:
+            self._push(tag)
+            self._pop_to(tag)
+
+    def handle_endtag(self, tag):
+        if tag in self.closed_empty:
+            self.closed_empty.remove(tag)
+            return
+        self.flush()
+        self._pop_to(tag)
+
+    def _push(self, tag):
+        self.stack.append(tag)
+        if tag in _PRESERVE_WS_TAGS: self.preserve_depth += 1
+        if tag in _HIDDEN_TEXT_TAGS: self.hidden_depth += 1
+
+    def _pop_to(self, tag):
+        for i in range(len(self.stack) - 1, -1, -1):
+            if self.stack[i] == tag:
+                for t in self.stack[i:]:
+                    if t in _PRESERVE_WS_TAGS: self.preserve_depth -= 1
+                    if t in _HIDDEN_TEXT_TAGS: self.hidden_depth -= 1
+                del self.stack[i:]
+                return
+
+    def handle_data(self, data):
+        self.current.append(data)
+
+    def handle_charref(self, name):
+        base, reg = (16, _HEX_REF) if name[:1] in "xX" else (10, _DEC_REF)
+        digits = name[1:] if base == 16 else name
+        extra = ""
+        try:
+            number = int(digits, base)
+        except ValueError:
+            match = reg.search(digits)
+            number, extra = (int(match.group(1), base), match.group(2)) if match else (None, digits)
+        if number is not None:
+            self.current.append(_numeric_reference(number))
+        self.current.append(extra)
+
+    def handle_entityref(self, name):
+        self.current.append(_ENTITY_TO_CHARACTER.get(name, "&" + name))
+
+    def handle_comment(self, data):
+        self.flush()
+
+    def handle_decl(self, decl):
+        self.flush()
+
+    def handle_pi(self, data):
+        self.flush()
+
+    def unknown_decl(self, data):
+        self.flush()
+        if data.upper().startswith("CDATA["):
+            self.strings.append(data[len("CDATA["):])
+
+def page_text(html_content):
+    """soup.get_text(separator='\n') without building the tree."""
+    if isinstance(html_content, bytes):
+        html_content = UnicodeDammit(html_content, is_html=True).unicode_markup
+    collector = _PageTextCollector()
+    collector.feed(html_content)
+    collector.close()
+    collector.flush()
+    return "\n".join(collector.strings)
+
+_MARKERS = ("Credit hours", "Restrictions:", "Prerequisites:", "Corequisites:", "General Requirements:")
+_MARKER_RE = re.compile("|".join(map(re.escape, _MARKERS)))
+
+def _block(text, positions, start_marker, stop_markers):
+    """Text after the first start marker, up to its next occurrence or the first stop marker."""
+    starts = positions.get(start_marker)
+    if not starts:
+        return "None"
+    begin = starts[0] + len(start_marker)
+    end = limit = starts[1] if len(starts) > 1 else len(text)
+    for marker in stop_markers:
+        for pos in positions.get(marker, ()):
+            if pos >= begin:
+                if pos + len(marker) <= limit and pos < end:
+                    end = pos
+                break
+    return text[begin:end].strip()
+
+def parse_course_page(html_content):
+    """
+    Extracts Description, Restrictions, Prerequisites, and Corequisites.
+    One tokenizer pass builds the page text, one regex pass finds every
+    marker; blocks are then sliced by position (same result as
+    parse_course_page_bs4).
+    """
+    full_text = page_text(html_content)
+
+    positions = {}
+    for match in _MARKER_RE.finditer(full_text):
+        positions.setdefault(match.group(), []).append(match.start())
+
+    description = "None"
+    if "Credit hours" in positions:
+        top_part = full_text[:positions["Credit hours"][0]]
+        lines = [line.strip() for line in top_part.split('\n') if line.strip()]
+        desc_lines = [line for line in lines if " - " not in line or not any(c.isdigit() for c in line)]
+        if desc_lines:
+            description = " ".join(desc_lines).strip()
+
+    restrictions = _block(full_text, positions, "Restrictions:", ["Prerequisites:", "Corequisites:"])
+    prerequisites = _block(full_text, positions, "Prerequisites:", ["Corequisites:"])
+    corequisites = _block(full_text, positions, "Corequisites:", ["General Requirements:"])
+    return description, restrictions, prerequisites, corequisites
+
+# ---------------------------------------------------------
+# RATE LIMITING
+# ---------------------------------------------------------
+class TokenBucket:
+    """
+    Async token bucket: `rate` tokens per second, at most `capacity` stored.
+    Each request takes one token, so the long-run request rate never exceeds
+    `rate` no matter how many workers are running.
+    """
+
+    def __init__(self, rate, capacity):
+        self.rate = rate
+        self.capacity = capacity
+        self.tokens = capacity
+        self.updated = time.monotonic()
+        self.lock = asyncio.Lock()
+
+    async def acquire(self):
+        async with self.lock:
+            while True:
+                now = time.monotonic()
+                self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+                self.updated = now
+                if self.tokens >= 1:
+                    self.tokens -= 1
+                    return
+                await asyncio.sleep((1 - self.tokens) / self.rate)
+
+# ---------------------------------------------------------
+# HTTP FETCHERS
+# ---------------------------------------------------------
+# Both return (status, headers with lower-case names, body) and never raise for HTTP error codes;
+# network errors and timeouts do raise and are retried by fetch_with_retries.
+class AiohttpFetcher:
+    def __init__(self, timeout=REQUEST_TIMEOUT):
+        self.timeout = timeout
+        self.session = None
+
+    async def __aenter__(self):
+        self.session = aiohttp.ClientSession(timeout=aiohttp.ClientTimeout(total=self.timeout))
+        return self
+
+    async def __aexit__(self, *exc):
+        await self.session.close()
+
+    async def get(self, url, headers=None):
+        async with self.session.get(url, headers=headers or {}) as response:
+            return response.status, {k.lower(): v for k, v in response.headers.items()}, await response.read()
+
+class UrllibFetcher:
+    """Blocking urllib calls moved off the event loop with asyncio.to_thread."""
+
+    def __init__(self, timeout=REQUEST_TIMEOUT):
+        self.timeout = timeout
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc):
+        pass
+
+    def _get(self, url, headers):
+        request = urllib.request.Request(url, headers=headers or {})
+        try:
+            with urllib.request.urlopen(request, timeout=self.timeout) as response:
+                return response.status, {k.lower(): v for k, v in response.headers.items()}, response.read()
+        except urllib.error.HTTPError as e:
+            return e.code, {k.lower(): v for k, v in (e.headers or {}).items()}, e.read()
+
+    async def get(self, url, headers=None):
+        return await asyncio.to_thread(self._get, url, headers)
+
+def make_fetcher(timeout=REQUEST_TIMEOUT):
+    return AiohttpFetcher(timeout) if HAS_AIOHTTP else UrllibFetcher(timeout)
+
+async def fetch_with_retries(fetcher, bucket, url, headers=None, retries=MAX_RETRIES, backoff=BACKOFF_BASE):
+    """
+    GET with exponential backoff. Retries network errors and RETRY_STATUSES
+    (honouring Retry-After); any other status is returned as-is.
+    """
+    attempt = 0
+    while True:
+        await bucket.acquire()
+        try:
+            status, resp_headers, body = await fetcher.get(url, headers)
+            if status not in RETRY_STATUSES or attempt >= retries:
+                return status, resp_headers, body
+            retry_after = resp_headers.get("retry-after", "")
+            delay = float(retry_after) if retry_after.isdigit() else backoff * 2 ** attempt
+        except Exception:
+            if attempt >= retries:
+                raise
+            delay = backoff * 2 ** attempt
+        attempt += 1
+        await asyncio.sleep(delay + random.uniform(0, backoff))
+
+# ---------------------------------------------------------
+# RESPONSE CACHE (CONDITIONAL REVALIDATION)
+# ---------------------------------------------------------
+class ResponseCache:
+    """
+    On-disk cache, one JSON file per URL (named by the SHA-1 of the URL).
+    An entry stores the validators (ETag, Last-Modified), the SHA-256 of the
+    last body and the parsed fields, not the raw HTML.
+
+    Policy:
+      - Entry with validators: always revalidate with If-None-Match /
+        If-Modified-Since; a 304 reuses the parsed fields.
+      - Entry without validators: reused with no request until `ttl` expires.
+      - 200 whose body hash equals the cached hash: parsed fields are reused
+        (the page is not parsed again).
+    """
+
+    def __init__(self, cache_dir=CACHE_DIR, ttl=CACHE_TTL):
+        self.cache_dir = cache_dir
+        self.ttl = ttl
+        self.stats = {"revalidated": 0, "ttl": 0, "same_body": 0, "parsed": 0}
+        os.makedirs(cache_dir, exist_ok=True)
+
+    def _path(self, url):
+        return os.path.join(self.cache_dir, hashlib.sha1(url.encode("utf-8")).hexdigest() + ".json")
+
+    def get(self, url):
+        try:
+            with open(self._path(url), "r", encoding="utf-8") as f:
+                entry = json.load(f)
+        except (OSError, ValueError):
+            return None
+        return entry if entry.get("url") == url else None
+
+    def put(self, url, headers, body_hash, parsed):
+        entry = {
+            "url": url,
+            "etag": headers.get("etag"),
+            "last_modified": headers.get("last-modified"),
+            "body_sha256": body_hash,
+            "parsed": list(parsed),
+            "fetched_at": time.time(),
+        }
+        path = self._path(url)
+        tmp = f"{path}.{os.getpid()}.tmp"
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump(entry, f, ensure_ascii=False)
+        os.replace(tmp, path)
+
+    def touch(self, url, entry):
+        """304 received: restart the entry's TTL clock."""
+        entry["fetched_at"] = time.time()
+        self.put(url, {"etag": entry.get("etag"), "last-modified": entry.get("last_modified")},
+                 entry["body_sha256"], entry["parsed"])
+
+    def is_fresh(self, entry):
+        has_validators = entry.get("etag") or entry.get("last_modified")
+        return not has_validators and time.time() - entry.get("fetched_at", 0) < self.ttl
 
-    time.sleep(SLEEP_INTERVAL)
+    @staticmethod
+    def conditional_headers(entry):
+        headers = {}
+        if entry.get("etag"): headers["If-None-Match"] = entry["etag"]
+        if entry.get("last_modified"): headers["If-Modified-Since"] = entry["last_modified"]
+        return headers
+
+async def parse_off_loop(body, parse_pool=None):
+    """Parses in the worker pool so CPU work never blocks the fetch loop."""
+    if parse_pool is None:
+        return parse_course_page(body)
+    return await asyncio.get_running_loop().run_in_executor(parse_pool, parse_course_page, body)
+
+async def fetch_course(fetcher, bucket, url, cache=None, retries=MAX_RETRIES, backoff=BACKOFF_BASE, parse_pool=None):
+    """
+    Returns (status, parsed fields or None, source). source: "network",
+    "304", "ttl" or "same-body" (the last three skip parsing).
+    """
+    entry = cache.get(url) if cache else None
+    if entry and cache.is_fresh(entry):
+        cache.stats["ttl"] += 1
+        return 200, tuple(entry["parsed"]), "ttl"
+
+    headers = cache.conditional_headers(entry) if entry else None
+    status, resp_headers, body = await fetch_with_retries(fetcher, bucket, url, headers, retries, backoff)
+
+    if status == 304 and entry:
+        cache.stats["revalidated"] += 1
+        cache.touch(url, entry)
+        return 200, tuple(entry["parsed"]), "304"
+    if status != 200:
+        return status, None, "network"
+
+    body_hash = hashlib.sha256(body).hexdigest()
+    if entry and entry.get("body_sha256") == body_hash:
+        cache.stats["same_body"] += 1
+        parsed, source = tuple(entry["parsed"]), "same-body"
+    else:
+        parsed, source = await parse_off_loop(body, parse_pool), "network"
+        if cache: cache.stats["parsed"] += 1
+    if cache:
+        cache.put(url, resp_headers, body_hash, parsed)
+    return status, parsed, source
+
+# ---------------------------------------------------------
+# CHECKPOINT (APPEND-ONLY JSONL)
+# ---------------------------------------------------------
+# Resumes an interrupted crawl only. The first line is a header with the
+# SHA-256 of the link list; a checkpoint written for other links is ignored.
+# Then one line per finished course: on resume, courses whose last record is
+# terminal ("ok", or "gone" for a permanent 4xx) are skipped and failed ones
+# are tried again. A half-written last line (crash mid-write) is ignored.
+# main() deletes the checkpoint after every run it accepts, so the next run
+# revalidates every page. A rejected run (too many failures) keeps it: the
+# retry then only fetches the courses that failed.
+TERMINAL_STATUSES = ("ok", "gone")
+
+def is_permanent_failure(http_status):
+    """4xx other than 408/429: retrying later will not help (e.g. 404, 410)."""
+    return http_status is not None and 400 <= http_status < 500 and http_status not in (408, 429)
+
+def links_key(rows):
+    """SHA-256 of the link list the checkpoint belongs to."""
+    blob = json.dumps([[r['Course Code'], r['URL'], r['Term']] for r in rows], ensure_ascii=False)
+    return hashlib.sha256(blob.encode("utf-8")).hexdigest()
+
+def load_checkpoint(path, key=None):
+    """Terminal records {URL: record} from a checkpoint written for `key` (empty if none or stale)."""
+    done = {}
+    if not os.path.exists(path):
+        return done
+    with open(path, "r", encoding="utf-8") as f:
+        for i, line in enumerate(f):
+            try:
+                record = json.loads(line)
+            except ValueError:
+                continue
+            if i == 0:
+                if record.get("links") != key:
+                    return {}
+                continue
+            done[record["URL"]] = record
+    return {url: r for url, r in done.items() if r.get("status") in TERMINAL_STATUSES}
+
+def result_record(row, status, http_status=None, parsed=None, error=""):
+    record = {
+        "Course Code": row['Course Code'],
+        "Course Name": row['Course Name'],
+        "URL": row['URL'],
+        "Term": row['Term'],
+        "status": status,
+        "http": http_status,
+    }
+    if parsed:
+        record.update(zip(("Description", "Restrictions", "Prerequisites", "Corequisites"), parsed))
+    if error:
+        record["error"] = error
+    return record
+
+# ---------------------------------------------------------
+# ASYNC CRAWL LOOP
+# ---------------------------------------------------------
+async def crawl(rows, checkpoint_path=CHECKPOINT_FILE, concurrency=CONCURRENCY, rate=RATE_LIMIT,
+                burst=BURST, retries=MAX_RETRIES, backoff=BACKOFF_BASE, timeout=REQUEST_TIMEOUT, cache=None,
+                parse_workers=PARSE_WORKERS):
+    """
+    Fetches and parses every row (dicts with Course Code, Course Name, URL,
+    Term) not already in the checkpoint. Returns {URL: record} for all
+    terminal courses ("ok" and permanently "gone"), including the ones
+    resumed from the checkpoint.
+    cache: Optional ResponseCache (conditional requests, skipped re-parsing).
+    parse_workers: Size of the parser process pool (0 = parse in the loop).
+    """
+    key = links_key(rows)
+    done = load_checkpoint(checkpoint_path, key)
+    if not done and os.path.exists(checkpoint_path):
+        os.remove(checkpoint_path)  # Stale (other links) or nothing to resume
+    todo = [row for row in rows if row['URL'] not in done]
+    total = len(rows)
+    print(f"Loaded {total} courses ({len(done)} from checkpoint, {len(todo)} to fetch). Async crawler starting...")
+
+    bucket = TokenBucket(rate, burst)
+    queue = asyncio.Queue()
+    for row in todo:
+        queue.put_nowait(row)
+    counter = {"n": len(done)}
+
+    os.makedirs(os.path.dirname(os.path.abspath(checkpoint_path)), exist_ok=True)
+    parse_pool = ProcessPoolExecutor(parse_workers) if parse_workers > 0 and todo else None
+    with open(checkpoint_path, "a", encoding="utf-8") as checkpoint:
+        if not done:
+            checkpoint.write(json.dumps({"links": key}) + "\n")
+            checkpoint.flush()
+        async with make_fetcher(timeout) as fetcher:
+
+            async def worker():
+                while True:
+                    try:
+                        row = queue.get_nowait()
+                    except asyncio.QueueEmpty:
+                        return
+                    code = row['Course Code']
+                    try:
+                        status, parsed, source = await fetch_course(fetcher, bucket, row['URL'], cache, retries, backoff, parse_pool)
+                        if status == 200:
+                            record = result_record(row, "ok", status, parsed)
+                            flags = [name for name, key in (("Restr", "Restrictions"), ("Prereq", "Prerequisites")) if record[key] != "None"]
+                            message = f"✅ ({', '.join(flags) if flags else 'Clean'})" + (f" [{source}]" if source != "network" else "")
+                        elif is_permanent_failure(status):
+                            record = result_record(row, "gone", status, error=f"HTTP {status}")
+                            message = f"❌ HTTP {status} (permanent)"
+                        else:
+                            record = result_record(row, "error", status, error=f"HTTP {status}")
+                            message = f"❌ HTTP {status}"
+                    except Exception as e:
+                        record = result_record(row, "error", error=str(e) or type(e).__name__)
+                        message = f"⚠️ Err: {record['error']}"
+
+                    checkpoint.write(json.dumps(record, ensure_ascii=False) + "\n")
+                    checkpoint.flush()
+                    if record["status"] in TERMINAL_STATUSES:
+                        done[row['URL']] = record
+                    counter["n"] += 1
+                    print(f"[{counter['n']}/{total}] {code}... {message}")
+
+            try:
+                await asyncio.gather(*(worker() for _ in range(max(1, min(concurrency, len(todo))))))
+            finally:
+                if parse_pool is not None:
+                    parse_pool.shutdown()
+
+    if cache:
+        st = cache.stats
+        print(f"Cache: {st['revalidated']} not modified (304), {st['ttl']} within TTL, "
+              f"{st['same_body']} unchanged bodies, {st['parsed']} parsed")
+    return done
+
+def build_output(rows, done):
+    """Successful records in link-file order, with the original CSV columns."""
+    columns = ["Course Code", "Course Name", "Description", "Restrictions", "Prerequisites", "Corequisites", "Term"]
+    records = [done[row['URL']] for row in rows if done.get(row['URL'], {}).get("status") == "ok"]
+    return pd.DataFrame([{c: r.get(c) for c in columns} for r in records], columns=columns)
+
+# ---------------------------------------------------------
+# PARSER PARITY CHECK & BENCHMARK
+# ---------------------------------------------------------
+CLEAN_FILE = os.path.join(BASE_DIR, 'data', 'csv', 'course_data_clean.csv')
+
+FIXTURE_TEMPLATE = """<!DOCTYPE HTML PUBLIC "-//W3C//DTD HTML 4.01 Transitional//EN">
+<HTML lang="en"><HEAD><TITLE>Detailed Course Information</TITLE>
+<script type="text/javascript">var x = 1 < 2 && "Prerequisites:";</script>
+<style>td.ntdefault {{ color: #000; }}</style></HEAD>
+<BODY><div class="pagetitlediv"><h2>Detailed Course Information</h2></div>
+<!-- Restrictions: comment text is not page text -->
+<div class="infotextdiv">Select the Class Schedule link to find available classes for the course.</div>
+<table class="datadisplaytable" summary="This table lists the course detail for the selected term." width="100%">
+<tr><td class="nttitle" scope="colgroup">{code} - {name}</td></tr>
+<tr><td class="ntdefault">{description}
+<br>
+<br>
+&nbsp;&nbsp;&nbsp;&nbsp;3.000 Credit hours
+<br>
+&nbsp;&nbsp;&nbsp;&nbsp;6.000 ECTS
+<br>
+<span class="fieldlabeltext">Levels: </span>Undergraduate
+<br>
+{blocks}
+</td></tr></table>
+<table class="plaintable"><tr><td><a href="javascript:history.go(-1)">Return to Previous</a></td></tr></table>
+<div class="footerlinksdiv"><a href="#top">Skip to top of page</a></div>
+<div class="banner_copyright">Release: 8.7.1</div></BODY></HTML>"""
+
+def _fixture_value(value):
+    return "" if pd.isna(value) else str(value).replace("&", "&amp;").replace("<", "&lt;")
+
+def fixture_pages(clean_path=CLEAN_FILE, limit=None):
+    """
+    BannerWeb-like course detail pages built from the cleaned catalog (real
+    descriptions and requisite texts), plus hand-written edge cases.
+    """
+    pages = []
+    df = pd.read_csv(clean_path)
+    for row in df.head(limit).itertuples(index=False):
+        blocks = []
+        for label, value in (("Restrictions:", row.Restrictions), ("Prerequisites:", row.Prerequisites),
+                             ("Corequisites:", row.Corequisites)):
+            if not pd.isna(value):
+                words = _fixture_value(value).split(" ")
+                middle = len(words) // 2
+                blocks.append(f'<span class="fieldlabeltext">{label}</span><br>\n&nbsp;&nbsp;'
+                              f'{" ".join(words[:middle])}<br/>\n<a href="#">{" ".join(words[middle:])}</a> <br>')
+        page = FIXTURE_TEMPLATE.format(code=row[0], name=_fixture_value(row[1]),
+                                       description=_fixture_value(row.Description), blocks="\n".join(blocks))
+        pages.append(page.encode("utf-8"))
+
+    edge_cases = [
+        "<html><body>No markers at all</body></html>",
+        "<p>CS 201 - X</p><p>Intro &amp; more</p><p>3 Credit hours</p><p>Credit hours again</p>",
+        "<b>Prerequisites:</b> A<br><b>Prerequisites:</b> B<b>Corequisites:</b> C",
+        "<b>Corequisites:</b> first <b>Restrictions:</b> R <b>Prerequisites:</b> P <b>Corequisites:</b> second",
+        "<pre>  </pre>\n<b>Restrictions:</b><textarea>\n\n</textarea> x<br>y</br>z &#150; &#x41z &bogus; <![CDATA[c]]>",
+        "<b>Restrictions:</b>Corequisites<b>General Requirements:</b> G <b>Corequisites:</b>  <b>General Requirements:</b>",
+        "Temel Bilgi Teknolojileri Çalışması – 3 Credit hours",
+    ]
+    pages.extend(html.encode("utf-8") for html in edge_cases)
+    return pages
+
+def bs4_version():
+    import bs4
+    return getattr(bs4, "__version__", "?")
+
+def check_parser(repeats=3, workers=PARSE_WORKERS):
+    """
+    Parity: parse_course_page == parse_course_page_bs4 on every fixture.
+    Benchmark: pages/s for both parsers and for the parser pool.
+    (python src/web_crawler.py --check)
+    """
+    pages = fixture_pages()
+    size_mb = sum(map(len, pages)) / 1e6
+
+    # Local tag/entity tables vs. the installed bs4 (only read here, never at crawl time)
+    try:
+        from bs4.builder import HTMLTreeBuilder
+        from bs4.dammit import EntitySubstitution
+        tables_ok = (_EMPTY_TAGS == set(HTMLTreeBuilder.DEFAULT_EMPTY_ELEMENT_TAGS)
+                     and _PRESERVE_WS_TAGS == set(HTMLTreeBuilder.DEFAULT_PRESERVE_WHITESPACE_TAGS)
+                     and _HIDDEN_TEXT_TAGS == set(HTMLTreeBuilder.DEFAULT_STRING_CONTAINERS)
+                     and _ENTITY_TO_CHARACTER == EntitySubstitution.HTML_ENTITY_TO_CHARACTER)
+        print(f"{'✅' if tables_ok else '⚠️'} Tag/entity tables {'match' if tables_ok else 'differ from'} bs4 {bs4_version()}")
+    except (ImportError, AttributeError):
+        print("⚠️ bs4 internals not found; relying on page parity only")
+
+    mismatches = [i for i, page in enumerate(pages) if parse_course_page(page) != parse_course_page_bs4(page)]
+    print(f"{'✅' if not mismatches else '❌'} Parity: {len(pages) - len(mismatches)}/{len(pages)} pages identical")
+    for i in mismatches[:3]:
+        print(f"   page {i}:\n   bs4 : {parse_course_page_bs4(pages[i])}\n   fast: {parse_course_page(pages[i])}")
+
+    def best_of(fn):
+        best = float("inf")
+        for _ in range(repeats):
+            t0 = time.perf_counter()
+            fn()
+            best = min(best, time.perf_counter() - t0)
+        return best
+
+    t_bs4 = best_of(lambda: [parse_course_page_bs4(p) for p in pages])
+    t_fast = best_of(lambda: [parse_course_page(p) for p in pages])
+    print(f"   {len(pages)} pages, {size_mb:.1f} MB")
+    print(f"   bs4 : {t_bs4:.2f} s ({len(pages) / t_bs4:,.0f} pages/s)")
+    print(f"   fast: {t_fast:.2f} s ({len(pages) / t_fast:,.0f} pages/s)  ⚡ {t_bs4 / t_fast:.1f}x")
+    if workers > 1:
+        with ProcessPoolExecutor(workers) as pool:
+            t_pool = best_of(lambda: list(pool.map(parse_course_page, pages, chunksize=32)))
+        print(f"   fast x{workers} processes: {t_pool:.2f} s ({len(pages) / t_pool:,.0f} pages/s)")
+    return not mismatches
 
 # ---------------------------------------------------------
-# EXPORT
+# SELF-TEST AGAINST A LOCAL STAND-IN SERVER
 # ---------------------------------------------------------
-df_final = pd.DataFrame(results)
-df_final.to_csv(OUTPUT_FILE, index=False)
-print(f"\nDONE! Dataset with RESTRICTIONS saved to '{OUTPUT_FILE}'")
\ No newline at end of file
+STUB_PAGE = b"<p>CS 0 - Stub</p><p>Stub description</p><p>3.000 Credit hours</p><b>Prerequisites:</b> CS 201"
+
+class _StubHandler(http.server.BaseHTTPRequestHandler):
+    """
+    /ok/<n>   : 200 with ETag "v1"; 304 when If-None-Match matches
+    /flaky    : 503 (Retry-After: 0) for the first `flaky_failures` requests, then like /ok
+    /missing  : 404
+    /down/<n> : always 503 (outage)
+    """
+
+    def log_message(self, *args):
+        pass
+
+    def _send(self, status, body=b"", headers=()):
+        self.server.log.append((self.path, status))
+        self.send_response(status)
+        for name, value in headers:
+            self.send_header(name, value)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def do_GET(self):
+        if self.path.startswith("/down"):
+            return self._send(503, headers=[("Retry-After", "0")])
+        if self.path == "/missing":
+            return self._send(404)
+        if self.path == "/flaky" and self.server.flaky_left > 0:
+            self.server.flaky_left -= 1
+            return self._send(503, headers=[("Retry-After", "0")])
+        if self.headers.get("If-None-Match") == '"v1"':
+            return self._send(304)
+        self._send(200, STUB_PAGE, [("ETag", '"v1"'), ("Content-Type", "text/html")])
+
+def selftest(flaky_failures=2):
+    """
+    Crawls a local http.server stand-in: 503 retry, permanent 404, ETag 304
+    revalidation, checkpoint resume and stale-checkpoint rejection.
+    (python src/web_crawler.py --selftest)
+    """
+    import tempfile
+    import threading
+
+    server = http.server.ThreadingHTTPServer(("127.0.0.1", 0), _StubHandler)
+    server.log, server.flaky_left = [], flaky_failures
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    base = f"http://127.0.0.1:{server.server_port}"
+    options = dict(rate=1000, burst=1000, backoff=0.01, parse_workers=0)
+
+    ok = True
+    def expect(label, cond):
+        nonlocal ok
+        ok &= bool(cond)
+        print(f"{'✅' if cond else '❌'} {label}")
+
+    def requests_to(path):
+        return [status for p, status in server.log if p == path]
+
+    try:
+        with tempfile.TemporaryDirectory() as tmp:
+            links = os.path.join(tmp, "links.csv")
+            output = os.path.join(tmp, "out.csv")
+            checkpoint = os.path.join(tmp, "checkpoint.jsonl")
+            cache_dir = os.path.join(tmp, "cache")
+            rows = [{"Course Code": f"CS {i}", "Course Name": "Stub", "URL": f"{base}{path}", "Term": "Fall"}
+                    for i, path in enumerate(["/ok/0", "/ok/1", "/flaky", "/missing"])]
+            pd.DataFrame(rows).to_csv(links, index=False)
+
+            # Run 1: cold cache
+            df = main(links, output, checkpoint, cache_dir=cache_dir, **options)
+            expect("503 retried until 200", requests_to("/flaky") == [503] * flaky_failures + [200])
+            expect("404 recorded once as permanent, not in output",
+                   requests_to("/missing") == [404] and len(df) == 3 and "CS 3" not in set(df["Course Code"]))
+            expect("parsed fields", df.iloc[0]["Prerequisites"] == "CS 201")
+            expect("finished run removes the checkpoint (even with a 404)", not os.path.exists(checkpoint))
+
+            # Run 2: every cached page is revalidated
+            server.log.clear()
+            df2 = main(links, output, checkpoint, cache_dir=cache_dir, **options)
+            expect("second run revalidates every page with ETag (304)",
+                   sorted(s for p, s in server.log if p != "/missing") == [304, 304, 304] and df2.equals(df))
+
+            # Resume: an interrupted run's checkpoint skips finished courses
+            key = links_key(rows)
+            def write_checkpoint(header_key):
+                with open(checkpoint, "w", encoding="utf-8") as f:
+                    f.write(json.dumps({"links": header_key}) + "\n")
+                    f.write(json.dumps(result_record(rows[0], "ok", 200, ("D", "None", "P", "None"))) + "\n")
+                    f.write(json.dumps(result_record(rows[3], "gone", 404, error="HTTP 404")) + "\n")
+                    f.write(json.dumps(result_record(rows[1], "error", error="timeout")) + "\n")
+                    f.write('{"URL": "half-writ')
+            write_checkpoint(key)
+            server.log.clear()
+            done = asyncio.run(crawl(rows, checkpoint, cache=None, **options))
+            fetched = sorted(p for p, _ in server.log)
+            expect("resume skips ok/gone records and retries failed ones", fetched == ["/flaky", "/ok/1"])
+            expect("resumed record kept", done[rows[0]["URL"]]["Description"] == "D")
+
+            write_checkpoint("other-links")
+            server.log.clear()
+            asyncio.run(crawl(rows, checkpoint, cache=None, **options))
+            expect("checkpoint for other links is ignored", sorted(p for p, _ in server.log) == ["/flaky", "/missing", "/ok/0", "/ok/1"])
+
+            # Outage: most pages fail -> no output, previous file kept, checkpoint kept for the retry
+            os.remove(checkpoint)
+            outage = rows[:1] + [dict(rows[0], **{"Course Code": f"CS {i}", "URL": f"{base}/down/{i}"}) for i in range(10, 13)]
+            pd.DataFrame(outage).to_csv(links, index=False)
+            before = os.path.getmtime(output), os.path.getsize(output)
+            result = main(links, output, checkpoint, cache_dir=None, **dict(options, retries=1))
+            expect("outage returns None and leaves the previous output",
+                   result is None and (os.path.getmtime(output), os.path.getsize(output)) == before)
+            expect("rejected run keeps the checkpoint to resume", os.path.exists(checkpoint))
+    finally:
+        server.shutdown()
+        server.server_close()
+    return ok
+
+# ---------------------------------------------------------
+# MAIN
+# ---------------------------------------------------------
+def main(input_path=None, output_path=None, checkpoint_path=None, fresh=False,
+         cache_dir=CACHE_DIR, cache_ttl=CACHE_TTL, max_failure_rate=MAX_FAILURE_RATE, **crawl_options):
+    """
+    Crawls every link and writes the output CSV. Returns the DataFrame, or
+    None when the links are missing or the run failed: no page succeeded, or
+    more than max_failure_rate of the courses failed (network outage, site
+    down). A failed run writes nothing, so the previous output stays in place.
+    """
+    input_path = input_path or INPUT_FILE
+    output_path = output_path or OUTPUT_FILE
+    checkpoint_path = checkpoint_path or CHECKPOINT_FILE
+
+    try:
+        df_links = pd.read_csv(input_path)
+    except FileNotFoundError:
+        print(f"ERROR: '{input_path}' not found.")
+        return None
+
+    if fresh and os.path.exists(checkpoint_path):
+        os.remove(checkpoint_path)
+
+    rows = df_links.to_dict("records")
+    cache = ResponseCache(cache_dir, cache_ttl) if cache_dir else None
+    done = asyncio.run(crawl(rows, checkpoint_path, cache=cache, **crawl_options))
+
+    # ---------------------------------------------------------
+    # EXPORT
+    # ---------------------------------------------------------
+    df_final = build_output(rows, done)
+    gone = sum(1 for r in done.values() if r["status"] == "gone")
+    failed = len(rows) - len(df_final) - gone
+    if df_final.empty or failed > max_failure_rate * len(rows):
+        print(f"\nERROR: {failed} of {len(rows)} courses failed ({len(df_final)} ok) - "
+              f"'{output_path}' left unchanged. Rerun to resume from the checkpoint.")
+        return None
+
+    df_final.to_csv(output_path, index=False)
+    print(f"\nDONE! {len(df_final)} courses saved to '{output_path}' ({gone} permanently gone, {failed} failed)")
+
+    # An accepted run consumes the checkpoint, failures included: it only exists
+    # to resume an interrupted or rejected run. The next run revalidates every
+    # page (the HTTP cache keeps that cheap) and retries the failed ones.
+    if os.path.exists(checkpoint_path):
+        os.remove(checkpoint_path)
+    return df_final
+
+if __name__ == "__main__":
+    import argparse
+    parser = argparse.ArgumentParser(description="Async BannerWeb course detail crawler")
+    parser.add_argument("--links", default=INPUT_FILE, help="CSV with Course Code, Course Name, URL, Term")
+    parser.add_argument("--output", default=OUTPUT_FILE)
+    parser.add_argument("--checkpoint", default=CHECKPOINT_FILE, help="Append-only JSONL resume file")
+    parser.add_argument("--fresh", action="store_true", help="Ignore and delete an existing checkpoint")
+    parser.add_argument("--concurrency", type=int, default=CONCURRENCY)
+    parser.add_argument("--rate", type=float, default=RATE_LIMIT, help="Requests per second")
+    parser.add_argument("--retries", type=int, default=MAX_RETRIES)
+    parser.add_argument("--cache-dir", default=CACHE_DIR, help="HTTP response cache directory")
+    parser.add_argument("--cache-ttl", type=float, default=CACHE_TTL, help="Seconds to trust pages served without ETag/Last-Modified")
+    parser.add_argument("--no-cache", action="store_true", help="Download and parse every page")
+    parser.add_argument("--parse-workers", type=int, default=PARSE_WORKERS, help="Parser processes (0 = parse in the fetch loop)")
+    parser.add_argument("--max-failure-rate", type=float, default=MAX_FAILURE_RATE,
+                        help="Fail without writing output when more courses than this fraction failed")
+    parser.add_argument("--check", action="store_true", help="Parser parity check and benchmark on fixture pages")
+    parser.add_argument("--selftest", action="store_true", help="Crawl a local stand-in server (503, 404, ETag 304, resume)")
+    args = parser.parse_args()
+
+    if args.check:
+        sys.exit(0 if check_parser(workers=args.parse_workers) else 1)
+    if args.selftest:
+        sys.exit(0 if selftest() else 1)
+
+    result = main(args.links, args.output, args.checkpoint, args.fresh,
+                  cache_dir=None if args.no_cache else args.cache_dir, cache_ttl=args.cache_ttl,
+                  concurrency=args.concurrency, rate=args.rate, retries=args.retries,
+                  parse_workers=args.parse_workers, max_failure_rate=args.max_failure_rate)
+    sys.exit(0 if result is not None else 1)